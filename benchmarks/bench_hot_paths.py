@@ -0,0 +1,44 @@
+"""
+Micro-benchmarks for the hot request paths (pytest-benchmark).
+
+    python -m pytest benchmarks                       # table in the terminal
+    python -m pytest benchmarks --benchmark-json=benchmarks/results/micro-$(git rev-parse --short HEAD).json
+    python benchmarks/results.py compare benchmarks/results/micro-<old>.json benchmarks/results/micro-<new>.json
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+
+def bench_generate_qr_code(benchmark):
+    from political_events.helpers import generate_qr_code
+    
+    image = benchmark(generate_qr_code, 'event-4242-political-events-platform')
+    assert image
+
+
+def bench_api_events(benchmark, app):
+    client = app.test_client()
+    response = benchmark(client.get, '/api/events')
+    assert response.status_code == 200 and response.get_json()
+
+
+def bench_api_event_registrations(benchmark, party_client, busiest_event):
+    response = benchmark(party_client.get, f'/api/event/{busiest_event.id}/registrations')
+    assert response.status_code == 200 and response.get_json()
+
+
+def bench_party_dashboard(benchmark, party_client):
+    response = benchmark(party_client.get, '/party/dashboard')
+    assert response.status_code == 200
+
+
+def bench_user_dashboard(benchmark, user_client):
+    response = benchmark(user_client.get, '/user/dashboard')
+    assert response.status_code == 200
+
+
+def bench_admin_dashboard(benchmark, admin_client):
+    response = benchmark(admin_client.get, '/admin/dashboard')
+    assert response.status_code == 200
@@ -0,0 +1,86 @@
+"""
+Fixtures for the pytest-benchmark micro-benchmarks.
+
+One in-memory database is filled by datagen.generate() per session; sizes
+come from BENCH_USERS, BENCH_EVENTS and BENCH_REGISTRATIONS.  Clients are
+signed in by writing the Flask-Login session directly, so no benchmark pays
+for password hashing.  No app context is held open between requests: it
+would carry flask.g (and the signed-in user) from one request to the next.
+"""
+
+import os
+
+import pytest
+
+import datagen
+
+
+@pytest.fixture(scope='session')
+def app():
+    from config import TestingConfig
+    from political_events import create_app
+    from political_events.extensions import db
+    
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        summary = datagen.generate(
+            users=int(os.getenv('BENCH_USERS', 5000)),
+            events=int(os.getenv('BENCH_EVENTS', 200)),
+            registrations=int(os.getenv('BENCH_REGISTRATIONS', 20000)),
+        )
+        app.config['BENCH_DATASET'] = summary
+    return app
+
+
+def _client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture(scope='session')
+def busiest_event(app):
+    """(event_id, party_id) of the event with the most registrations"""
+    from political_events.extensions import db
+    from political_events.models import Event, EventRegistration
+    
+    with app.app_context():
+        return db.session.execute(
+            db.select(Event.id, Event.party_id).join(EventRegistration)
+            .group_by(Event.id).order_by(db.func.count(EventRegistration.id).desc()).limit(1)
+        ).one()
+
+
+@pytest.fixture(scope='session')
+def party_client(app, busiest_event):
+    return _client(app, busiest_event.party_id)
+
+
+@pytest.fixture(scope='session')
+def user_client(app):
+    from political_events.extensions import db
+    from political_events.models import EventRegistration
+    
+    # The user with the most registrations, so the dashboard has something to render
+    with app.app_context():
+        user_id = db.session.execute(
+            db.select(EventRegistration.user_id).group_by(EventRegistration.user_id)
+            .order_by(db.func.count(EventRegistration.id).desc()).limit(1)
+        ).scalar()
+    return _client(app, user_id)
+
+
+@pytest.fixture(scope='session')
+def admin_client(app):
+    from political_events.extensions import db
+    from political_events.models import User
+    
+    with app.app_context():
+        admin = User(email='admin@bench.example', password_hash='x', role='admin')
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+    return _client(app, admin_id)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for benchmarks and load tests.
+
+Creates N users, M events and K registrations with a realistic geographic
+spread: people and venues cluster around the gazetteer cities, weighted
+roughly by population, with a normal scatter of a few kilometres, and most
+registrations come from users in the event's own city.  Output is
+deterministic for a given --seed.  Every generated account shares the
+password BENCH_PASSWORD so load drivers can sign in.  Usage:
+
+    python benchmarks/datagen.py --database sqlite:///bench.db
+    python benchmarks/datagen.py --users 100000 --events 2000 --registrations 500000 --database sqlite:///big.db
+
+generate() can also be called inside an app context (see conftest.py and
+load_driver.py).
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+BENCH_PASSWORD = 'bench-password'
+BATCH_SIZE = 5000
+
+# (gazetteer name, relative weight, scatter in km)
+CITIES = [
+    ('mumbai', 20, 12), ('delhi', 19, 15), ('bengaluru', 12, 10), ('hyderabad', 10, 10),
+    ('ahmedabad', 8, 8), ('chennai', 9, 10), ('kolkata', 14, 9), ('pune', 7, 8),
+    ('jaipur', 4, 6), ('lucknow', 4, 6),
+]
+TOPICS = ('Town Hall', 'Rally', 'Youth Meet', 'Policy Forum', 'Volunteer Drive', 'Door-to-Door Briefing',
+          'Farmers Dialogue', 'Women in Politics', 'Manifesto Launch', 'Ward Meeting')
+PARTIES = ('Progress Alliance', 'People First', 'Green Future', 'Unity Front', 'Civic Renewal')
+LOCAL_SHARE = 0.85  # registrations from the event's own city
+
+
+def scatter(rng, latitude, longitude, km):
+    """A point normally distributed around (latitude, longitude) with sigma km"""
+    dlat = rng.gauss(0, km) / 111.0
+    dlng = rng.gauss(0, km) / (111.0 * math.cos(math.radians(latitude)))
+    return round(latitude + dlat, 6), round(longitude + dlng, 6)
+
+
+def generate(users=2000, events=100, registrations=10000, seed=1, parties=None, now=None):
+    """
+    Insert the dataset into the current app's database (tables must exist).
+    Returns a summary dict with the generated id ranges.
+    """
+    from datetime import datetime, timedelta
+    from werkzeug.security import generate_password_hash
+    from political_events.extensions import db
+    from political_events.geocoding import DEFAULT_GAZETTEER
+    from political_events.helpers import generate_qr_code
+    from political_events.models import User, Event, EventRegistration
+
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    parties = parties or max(len(PARTIES), users // 500)
+    password_hash = generate_password_hash(BENCH_PASSWORD)  # hashed once, shared by every account
+    weights = [weight for _, weight, _ in CITIES]
+
+    def place(city_index):
+        name, _, km = CITIES[city_index]
+        return scatter(rng, *DEFAULT_GAZETTEER[name], km)
+
+    def insert(model, rows):
+        for offset in range(0, len(rows), BATCH_SIZE):
+            db.session.execute(db.insert(model), rows[offset:offset + BATCH_SIZE])
+        db.session.commit()
+
+    party_rows, user_rows, user_city = [], [], []
+    for i in range(parties):
+        party_rows.append({
+            'email': f'party{i}@bench.example', 'password_hash': password_hash, 'role': 'party',
+            'party_name': f'{PARTIES[i % len(PARTIES)]} {i // len(PARTIES) or ""}'.strip(),
+            'is_business_email': True, 'created_at': now - timedelta(days=rng.randrange(400)),
+        })
+    for i in range(users):
+        city = rng.choices(range(len(CITIES)), weights)[0]
+        latitude, longitude = place(city)
+        user_city.append(city)
+        user_rows.append({
+            'email': f'user{i}@bench.example', 'password_hash': password_hash, 'role': 'user',
+            'created_at': now - timedelta(minutes=rng.randrange(400 * 24 * 60)),
+            'latitude': latitude, 'longitude': longitude,
+            'location_updated_at': now - timedelta(minutes=rng.randrange(7 * 24 * 60)),
+        })
+    first_user = (db.session.execute(db.select(db.func.max(User.id))).scalar() or 0) + 1
+    insert(User, party_rows + user_rows)
+    ids = db.session.execute(db.select(User.id).where(User.id >= first_user).order_by(User.id)).scalars().all()
+    party_ids, user_ids = ids[:parties], ids[parties:]
+
+    qr_code = generate_qr_code('bench-event')  # one real image so payload sizes are realistic
+    event_rows, event_city = [], []
+    for i in range(events):
+        city = rng.choices(range(len(CITIES)), weights)[0]
+        latitude, longitude = place(city)
+        party = rng.randrange(parties)
+        # Mostly upcoming, some in the recent past
+        offset = timedelta(hours=rng.randrange(-30 * 24, 60 * 24)) if rng.random() < 0.2 \
+            else timedelta(hours=rng.randrange(1, 60 * 24))
+        event_city.append(city)
+        event_rows.append({
+            'title': f'{rng.choice(TOPICS)} in {CITIES[city][0].title()} #{i}',
+            'description': f'Synthetic benchmark event {i}. ' * rng.randrange(2, 12),
+            'party_name': party_rows[party]['party_name'], 'party_id': party_ids[party],
+            'location': f'{CITIES[city][0].title()} Ward {rng.randrange(1, 200)}',
+            'latitude': latitude, 'longitude': longitude, 'event_date': now + offset,
+            'qr_code': qr_code, 'is_active': True, 'created_at': now - timedelta(days=rng.randrange(1, 90)),
+        })
+    first_event = (db.session.execute(db.select(db.func.max(Event.id))).scalar() or 0) + 1
+    insert(Event, event_rows)
+    event_ids = db.session.execute(
+        db.select(Event.id).where(Event.id >= first_event).order_by(Event.id)
+    ).scalars().all()
+
+    users_by_city = {}
+    for user_id, city in zip(user_ids, user_city):
+        users_by_city.setdefault(city, []).append(user_id)
+    # Popularity is long-tailed: a few events draw most of the crowd
+    popularity = [rng.paretovariate(1.2) for _ in event_ids]
+    registrations = min(registrations, users * events)
+    seen, registration_rows = set(), []
+    while len(registration_rows) < registrations:
+        index = rng.choices(range(events), popularity)[0]
+        local = users_by_city.get(event_city[index])
+        user_id = rng.choice(local) if local and rng.random() < LOCAL_SHARE else rng.choice(user_ids)
+        pair = (event_ids[index], user_id)
+        if pair in seen:
+            continue
+        seen.add(pair)
+        event = event_rows[index]
+        attended = event['event_date'] < now and rng.random() < 0.6
+        latitude, longitude = scatter(rng, event['latitude'], event['longitude'], CITIES[event_city[index]][2])
+        registration_rows.append({
+            'event_id': pair[0], 'user_id': user_id, 'latitude': latitude, 'longitude': longitude,
+            'registered_at': min(event['event_date'], now) - timedelta(minutes=rng.randrange(1, 30 * 24 * 60)),
+            'attended': attended, 'qr_scanned_at': event['event_date'] if attended else None,
+        })
+    insert(EventRegistration, registration_rows)
+
+    return {
+        'users': users, 'parties': parties, 'events': events, 'registrations': len(registration_rows),
+        'party_ids': [party_ids[0], party_ids[-1]] if party_ids else [],
+        'user_ids': [user_ids[0], user_ids[-1]] if user_ids else [],
+        'event_ids': [event_ids[0], event_ids[-1]] if event_ids else [],
+        'seed': seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--registrations', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database', help='DATABASE_URL to fill (default: DATABASE_URL from the environment)')
+    args = parser.parse_args()
+
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    from political_events import create_app
+    from political_events.bootstrap import bootstrap
+
+    app = create_app()
+    with app.app_context():
+        bootstrap()
+        t0 = time.perf_counter()
+        summary = generate(args.users, args.events, args.registrations, seed=args.seed)
+        summary['elapsed_s'] = round(time.perf_counter() - t0, 3)
+    print(json.dumps(summary, indent=2))
+    print(f"✅ Accounts: user0@bench.example … / {BENCH_PASSWORD}")
+
+
+if __name__ == '__main__':
+    main()
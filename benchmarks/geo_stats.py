@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Geo statistics benchmark: per-row Python loop versus political_events.geo_stats.
+
+Scatters --points registrations around a venue (normal, sigma about 10 km)
+and computes the distance summary, percentiles, ring histogram and 1 km
+hotspots twice: with a per-row loop over helpers.haversine_km and dicts,
+the way the party pages did it in JavaScript, and with geo_stats.compute().
+The loop's hotspots bin into grid cells rather than comparing every pair
+of markers as the map page did, which would take minutes at 100k.
+Reports the median time of each.  Usage:
+
+    python benchmarks/geo_stats.py                   # 100k points
+    python benchmarks/geo_stats.py --points 20000 --output geo_stats.json
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import results  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+VENUE = (19.076, 72.8777)
+
+
+def python_stats(latitudes, longitudes, attended):
+    from political_events.geo_stats import CATCHMENT_SHARES, HOTSPOT_CELL_KM, PERCENTILES, RINGS_KM
+    from political_events.helpers import haversine_km
+
+    distances = [haversine_km(VENUE[0], VENUE[1], lat, lng) for lat, lng in zip(latitudes, longitudes)]
+    ordered = sorted(distances)
+
+    def percentile(p):
+        position = (len(ordered) - 1) * p / 100
+        low = math.floor(position)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+    rings = [0] * len(RINGS_KM)
+    rings_attended = [0] * len(RINGS_KM)
+    for distance, present in zip(distances, attended):
+        ring = len(RINGS_KM) - 1
+        while RINGS_KM[ring] > distance:
+            ring -= 1
+        rings[ring] += 1
+        rings_attended[ring] += present
+
+    cell_lat = HOTSPOT_CELL_KM / 111.32
+    cell_lng = HOTSPOT_CELL_KM / (111.32 * math.cos(math.radians(VENUE[0])))
+    cells = {}
+    for lat, lng in zip(latitudes, longitudes):
+        cell = cells.setdefault((math.floor(lat / cell_lat), math.floor(lng / cell_lng)), [0, 0.0, 0.0])
+        cell[0] += 1
+        cell[1] += lat
+        cell[2] += lng
+    hotspots = sorted(cells.values(), key=lambda cell: -cell[0])[:20]
+
+    return {
+        'mean': sum(distances) / len(distances),
+        'percentiles': [percentile(p) for p in PERCENTILES],
+        'catchment': [percentile(share * 100) for share in CATCHMENT_SHARES],
+        'rings': rings,
+        'rings_attended': rings_attended,
+        'hotspots': hotspots,
+    }
+
+
+def median_seconds(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--points', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/geo_stats-<commit>.json)')
+    args = parser.parse_args()
+
+    import numpy as np
+    from political_events import geo_stats
+
+    rng = np.random.default_rng(1)
+    latitudes = VENUE[0] + rng.normal(0, 0.09, args.points)
+    longitudes = VENUE[1] + rng.normal(0, 0.09, args.points)
+    attended = rng.random(args.points) < 0.4
+
+    # The loop works on Python lists, as rows come back from the database
+    lists = latitudes.tolist(), longitudes.tolist(), attended.tolist()
+    expected = python_stats(*lists)
+    vectorized = geo_stats.compute(VENUE[0], VENUE[1], latitudes, longitudes, attended)
+    assert abs(expected['mean'] - vectorized['distance_km']['mean']) < 1e-3
+    assert expected['rings'] == vectorized['rings']['registrations']
+
+    timings = {
+        'python_loop': median_seconds(lambda: python_stats(*lists), args.repeats),
+        'numpy': median_seconds(lambda: geo_stats.compute(VENUE[0], VENUE[1], latitudes, longitudes, attended),
+                                args.repeats),
+        'numpy_from_rows': median_seconds(
+            lambda: geo_stats.compute(VENUE[0], VENUE[1], np.array(lists[0]), np.array(lists[1]),
+                                      np.array(lists[2])),
+            args.repeats,
+        ),
+    }
+    report = {'points': args.points}
+    for name, seconds in timings.items():
+        report[name] = {'total_ms': seconds * 1000}
+    report['speedup'] = timings['python_loop'] / timings['numpy_from_rows']
+    path = results.save(report, 'geo_stats', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Image pipeline benchmark: upload memory and variant rendering.
+
+Streams a --megabytes upload through political_events.images.receive() and
+reports its peak Python memory next to reading the whole body at once.
+Then renders the WebP variants of --images synthetic 4000x3000 JPEG photos
+one after another in this process, and in a process pool of --workers, and
+reports the median wall time of each.  Usage:
+
+    python benchmarks/images.py                      # 32 MB upload, 8 photos, 4 workers
+    python benchmarks/images.py --images 16 --workers 8 --output images.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import results  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def median_seconds(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def peak_bytes(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def make_photos(directory, count):
+    """JPEGs with enough detail that encoding and resizing do real work"""
+    from PIL import Image
+
+    paths = []
+    for index in range(count):
+        photo = Image.effect_mandelbrot((4000, 3000), (-2.0 + index * 0.01, -1.2, 1.0, 1.2), 100).convert('RGB')
+        path = os.path.join(directory, f'photo{index}', 'original.jpg')
+        os.makedirs(os.path.dirname(path))
+        photo.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--megabytes', type=int, default=32)
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/images-<commit>.json)')
+    args = parser.parse_args()
+
+    from political_events import images
+
+    report = {'upload_megabytes': args.megabytes, 'images': args.images, 'workers': args.workers}
+    with tempfile.TemporaryDirectory() as root:
+        upload = os.path.join(root, 'upload.bin')  # read back like a request body: a fresh bytes per read
+        with open(upload, 'wb') as out:
+            out.write(os.urandom(args.megabytes * 1024 * 1024))
+
+        def streamed():
+            with open(upload, 'rb') as stream:
+                path, _, _ = images.receive(stream, root)
+            os.unlink(path)
+
+        def buffered():
+            with open(upload, 'rb') as stream:
+                data = stream.read()
+            with open(os.path.join(root, 'buffered'), 'wb') as out:
+                out.write(data)
+
+        report['receive_peak_kb'] = peak_bytes(streamed) / 1024
+        report['read_all_peak_kb'] = peak_bytes(buffered) / 1024
+
+        paths = make_photos(root, args.images)
+
+        def serial():
+            for path in paths:
+                images.render_variants(path, os.path.dirname(path))
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            def pooled():
+                futures = [pool.submit(images.render_variants, path, os.path.dirname(path)) for path in paths]
+                for future in futures:
+                    future.result()
+
+            pooled()  # start the workers before timing
+            timings = {'serial': median_seconds(serial, args.repeats), 'pool': median_seconds(pooled, args.repeats)}
+
+    for name, seconds in timings.items():
+        report[name] = {'total_ms': seconds * 1000, 'per_image_ms': seconds * 1000 / args.images}
+    report['speedup'] = timings['serial'] / timings['pool']
+    path = results.save(report, 'images', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+HTTP and Socket.IO load driver for the attendee hot paths.
+
+Virtual users sign in and loop over a weighted mix of
+POST /user/join_event/<id> (JSON, with an Idempotency-Key), a venue scan
+of their check-in code (POST /party/event/<id>/checkin, sent by the event's
+party) and POST /api/user/location.  Socket.IO listeners sit in the event
+rooms and count the attendance_update broadcasts the scans fan out.
+Without --url the driver builds a throwaway SQLite database with
+datagen.py and serves the app (real-time layer on) from a local threaded
+server; Socket.IO listeners then use Flask-SocketIO's in-process test
+client.  With --url it drives a running deployment whose accounts came
+from datagen.py, and listeners need the python-socketio client; scans are
+left out there, since the driver mints check-in codes with the local app.
+
+Results (per-operation latency percentiles, throughput, status codes and
+broadcast counts) are saved as JSON via results.save() for comparison across
+commits.  Usage:
+
+    python benchmarks/load_driver.py
+    python benchmarks/load_driver.py --users 100 --duration 60 --mix join=1,scan=2,location=5
+    python benchmarks/load_driver.py --url http://127.0.0.1:5000 --listeners 0 --output load.json
+"""
+
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import datagen  # noqa: E402  (also puts the project root on sys.path)
+import results  # noqa: E402
+
+OPERATIONS = ('join', 'scan', 'location')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report 302s as responses: form views redirect after doing their work"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class VirtualUser:
+    """One signed-in browser session issuing requests with urllib."""
+
+    def __init__(self, base_url, email, rng, codes=None):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.rng = rng
+        self.codes = codes
+        self.joined = []
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, form=None, payload=None, headers=None):
+        """(status, seconds) for one request"""
+        headers = dict(headers or {})
+        data = None
+        if payload is not None:
+            data = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        t0 = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        return status, time.perf_counter() - t0
+
+    def login(self):
+        status, _ = self.request('POST', '/login', form={'email': self.email, 'password': datagen.BENCH_PASSWORD})
+        return status == 302
+
+    def join(self, event_ids):
+        event_id = self.rng.choice(event_ids)
+        status, elapsed = self.request(
+            'POST', f'/user/join_event/{event_id}',
+            payload={'latitude': 19.07 + self.rng.uniform(-0.1, 0.1), 'longitude': 72.87 + self.rng.uniform(-0.1, 0.1)},
+            headers={'Idempotency-Key': uuid.uuid4().hex},
+        )
+        if status in (200, 201):
+            self.joined.append(event_id)
+        return status, elapsed
+
+    def scan(self, event_ids):
+        event_id = self.rng.choice(self.joined)
+        code = self.codes.get(event_id, self.email)
+        if code is None:  # waitlisted, so there is no code to scan
+            self.joined.remove(event_id)
+            return self.join(event_ids)
+        scanner, token = code
+        return scanner.request('POST', f'/party/event/{event_id}/checkin', payload={'token': token})
+
+    def location(self, event_ids):
+        return self.request('POST', '/api/user/location', payload={
+            'latitude': 19.07 + self.rng.uniform(-0.2, 0.2), 'longitude': 72.87 + self.rng.uniform(-0.2, 0.2),
+        })
+
+
+class CheckinCodes:
+    """Local mode: the check-in code an attendee's event page shows, and the signed-in party that scans it"""
+
+    def __init__(self, app, base_url):
+        self.app = app
+        self.base_url = base_url
+        self._tokens = {}
+        self._scanners = {}
+        self._lock = threading.Lock()
+
+    def get(self, event_id, email):
+        """(scanner, token) for email's registration to event_id, or None; looked up outside the timed request"""
+        from political_events import checkin
+        from political_events.extensions import db
+        from political_events.models import Event, EventRegistration, User
+
+        with self._lock:
+            token = self._tokens.get((event_id, email))
+            if token is None:
+                party = db.aliased(User)
+                with self.app.app_context():
+                    row = db.session.execute(
+                        db.select(EventRegistration.id, User.id, Event.event_date, party.email)
+                        .join(User, User.id == EventRegistration.user_id)
+                        .join(Event, Event.id == EventRegistration.event_id)
+                        .join(party, party.id == Event.party_id)
+                        .where(EventRegistration.event_id == event_id, User.email == email)
+                    ).first()
+                    db.session.remove()
+                if row is None:
+                    return None
+                registration_id, user_id, event_date, party_email = row
+                token = checkin.make_token(self.app.config, registration_id, event_id, user_id,
+                                           checkin.token_expiry(self.app.config, event_date))
+                self._tokens[(event_id, email)] = token
+                self._scanners.setdefault(event_id, party_email)
+            scanner = self._scanners[event_id]
+            if isinstance(scanner, str):
+                scanner = VirtualUser(self.base_url, scanner, random.Random(event_id))
+                if not scanner.login():
+                    raise SystemExit(f'Could not sign in as {scanner.email}')
+                self._scanners[event_id] = scanner
+        return scanner, token
+
+
+class Recorder:
+    """Latencies and status codes per operation, shared by all virtual users."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def add(self, operation, status, elapsed):
+        with self._lock:
+            self.latencies[operation].append(elapsed)
+            self.statuses[operation][str(status)] += 1
+
+    def summary(self, wall):
+        report = {}
+        for operation, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            pick = lambda fraction: samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000  # noqa: E731
+            errors = sum(count for status, count in self.statuses[operation].items()
+                         if status == '0' or int(status) >= 400)
+            report[operation] = {
+                'requests': len(samples),
+                'errors': errors,
+                'throughput_rps': len(samples) / wall,
+                'latency_ms': {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': samples[-1] * 1000},
+                'statuses': dict(self.statuses[operation]),
+            }
+        return report
+
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f'Unknown operation {name!r}; choose from {", ".join(OPERATIONS)}')
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def serve_locally(args, workdir):
+    """Generate a dataset, start the app on an ephemeral port; returns (base_url, app, server)"""
+    from werkzeug.serving import make_server
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(workdir, "load.db")}'
+    from political_events import create_app
+    from political_events.extensions import db
+
+    app = create_app(realtime=True)
+    with app.app_context():
+        db.create_all()
+        datagen.generate(users=max(args.users, args.dataset_users), events=args.events,
+                         registrations=args.registrations, seed=args.seed)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log line per request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', app, server
+
+
+def upcoming_events(base_url):
+    with urllib.request.urlopen(base_url + '/api/events', timeout=30) as response:
+        return [event['id'] for event in json.load(response)]
+
+
+class Listeners:
+    """Socket.IO clients sitting in event rooms, counting attendance_update messages."""
+
+    def __init__(self, count, event_ids, base_url=None, app=None):
+        self.clients = []
+        self.received = Counter()
+        self._lock = threading.Lock()
+        self.error = None
+        if not count:
+            return
+        try:
+            if app is not None:
+                from political_events.extensions import realtime
+                for i in range(count):
+                    client = realtime.socketio.test_client(app)
+                    client.emit('join_event_room', {'event_id': event_ids[i % len(event_ids)]})
+                    self.clients.append(client)
+            else:
+                import socketio
+                for i in range(count):
+                    client = socketio.Client()
+                    client.on('attendance_update', self._count)
+                    client.connect(base_url)
+                    client.emit('join_event_room', {'event_id': event_ids[i % len(event_ids)]})
+                    self.clients.append(client)
+        except Exception as e:  # missing client transport, refused connection, ...
+            self.error = f'{type(e).__name__}: {e}'
+
+    def _count(self, data):
+        with self._lock:
+            self.received['attendance_update'] += 1
+
+    def close(self):
+        for client in self.clients:
+            if hasattr(client, 'get_received'):
+                for message in client.get_received():
+                    self.received[message['name']] += 1
+            client.disconnect()
+
+    def summary(self):
+        if self.error:
+            return {'skipped': self.error}
+        return {'listeners': len(self.clients), 'received': dict(self.received)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help='drive a running server instead of a local one')
+    parser.add_argument('--users', type=int, default=50, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds of load after sign-in')
+    parser.add_argument('--mix', default='join=1,scan=1,location=3', help='operation weights')
+    parser.add_argument('--listeners', type=int, default=20, help='Socket.IO clients in event rooms')
+    parser.add_argument('--dataset-users', type=int, default=2000, help='local mode: generated users')
+    parser.add_argument('--events', type=int, default=50, help='local mode: generated events')
+    parser.add_argument('--registrations', type=int, default=5000, help='local mode: generated registrations')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/load-<commit>.json)')
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    if args.url and mix.pop('scan', None):
+        print('ℹ️  Leaving out scans: check-in codes are only minted in local mode')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = server = None
+        base_url = args.url
+        if base_url is None:
+            base_url, app, server = serve_locally(args, workdir)
+        event_ids = upcoming_events(base_url)
+        if not event_ids:
+            raise SystemExit('No upcoming events to join; generate a dataset first (benchmarks/datagen.py)')
+
+        codes = CheckinCodes(app, base_url) if app is not None else None
+        users = [VirtualUser(base_url, f'user{i}@bench.example', random.Random(args.seed + i), codes)
+                 for i in range(args.users)]
+        for user in users:
+            if not user.login():
+                raise SystemExit(f'Could not sign in as {user.email}')
+        listeners = Listeners(args.listeners, event_ids, base_url, app)
+
+        recorder = Recorder()
+        names, weights = zip(*mix.items())
+        deadline = time.perf_counter() + args.duration
+
+        def run(user):
+            while time.perf_counter() < deadline:
+                operation = user.rng.choices(names, weights)[0]
+                if operation == 'scan' and not user.joined:
+                    operation = 'join'  # nothing to scan into yet
+                status, elapsed = getattr(user, operation)(event_ids)
+                recorder.add(operation, status, elapsed)
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=run, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - t0
+        time.sleep(0.5)  # let the last broadcasts arrive
+        listeners.close()
+        if server is not None:
+            server.shutdown()
+            from political_events.extensions import db
+            with app.app_context():
+                db.engine.dispose()
+
+    report = {
+        'target': args.url or 'local',
+        'virtual_users': args.users,
+        'duration_s': wall,
+        'mix': mix,
+        'operations': recorder.summary(wall),
+        'socketio': listeners.summary(),
+    }
+    path = results.save(report, 'load', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
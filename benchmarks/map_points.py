@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Map payload benchmark: inline registration JSON versus political_events.map_points.
+
+Builds --points registrations scattered around a venue (normal, sigma
+about 10 km) and encodes them three ways: the REGISTRATION dicts the map
+page used to inline, the 'polyline' encoding and the 'float32' buffer.
+Reports the bytes per marker of each, raw and gzipped (as a server or
+proxy with compression would send them), and the median encoding time.
+Usage:
+
+    python benchmarks/map_points.py                  # 20k points
+    python benchmarks/map_points.py --points 100000 --output map_points.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import results  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+VENUE = (19.076, 72.8777)
+
+
+def median_seconds(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/map_points-<commit>.json)')
+    args = parser.parse_args()
+
+    import numpy as np
+    from political_events import map_points, serializers
+    from political_events.read_models import RegistrationRow
+
+    rng = np.random.default_rng(1)
+    latitudes = (VENUE[0] + rng.normal(0, 0.09, args.points)).tolist()
+    longitudes = (VENUE[1] + rng.normal(0, 0.09, args.points)).tolist()
+    attended = (rng.random(args.points) < 0.4).tolist()
+    start = datetime(2026, 1, 1)
+    registrations = [
+        RegistrationRow(index + 1, 1, index + 1, f'voter{index + 1}@example.com', start + timedelta(seconds=index),
+                        present, start + timedelta(hours=1) if present else None, latitude, longitude)
+        for index, (latitude, longitude, present) in enumerate(zip(latitudes, longitudes, attended))
+    ]
+    rows = [(row.id, row.latitude, row.longitude, row.attended) for row in registrations]
+
+    def inline_json():
+        return json.dumps(serializers.REGISTRATION.many(registrations), default=str).encode()
+
+    encoders = {
+        'inline_json': inline_json,
+        'polyline': lambda: json.dumps({'points': map_points.encode(rows, 'polyline')}).encode(),
+        'float32': lambda: map_points.encode(rows, 'float32'),
+    }
+    polyline = map_points.decode_polyline(map_points.encode(rows, 'polyline'), len(map_points.FIELDS))
+    assert [row[0] for row in polyline] == [row.id for row in registrations]
+
+    report = {'points': args.points}
+    for name, encode in encoders.items():
+        payload = encode()
+        report[name] = {
+            'bytes_per_marker': round(len(payload) / args.points, 2),
+            'gzip_bytes_per_marker': round(len(gzip.compress(payload)) / args.points, 2),
+            'total_ms': median_seconds(encode, args.repeats) * 1000,
+        }
+    report['reduction'] = report['inline_json']['bytes_per_marker'] / report['polyline']['bytes_per_marker']
+    report['gzip_reduction'] = (report['inline_json']['gzip_bytes_per_marker']
+                                / report['polyline']['gzip_bytes_per_marker'])
+    path = results.save(report, 'map_points', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Read-model benchmark: ORM objects versus slotted read rows on large results.
+
+Builds a throwaway SQLite database with one event holding --rows
+registrations (each from a distinct user) and --rows upcoming events, then
+loads both the way the APIs did before (ORM query, joinedload of the user,
+dict per object) and through political_events.read_models.  Reports the
+median time to load and to serialize, and tracemalloc's peak and retained
+memory for the loaded list.  Usage:
+
+    python benchmarks/read_models.py                 # 100k rows
+    python benchmarks/read_models.py --rows 20000 --output read_models.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import results  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def populate(rows):
+    from datetime import datetime, timedelta
+    from political_events.extensions import db
+    from political_events.models import User, Event, EventRegistration
+
+    now = datetime.utcnow()
+    db.session.add(User(email='party@bench.example', password_hash='x', role='party', party_name='Bench'))
+    db.session.commit()
+    for offset in range(0, rows, 10000):
+        count = min(10000, rows - offset)
+        db.session.execute(db.insert(User), [
+            {'email': f'user{offset + i}@bench.example', 'password_hash': 'x', 'role': 'user', 'created_at': now}
+            for i in range(count)
+        ])
+        db.session.execute(db.insert(Event), [
+            {'title': f'Event {offset + i}', 'description': 'Benchmark event ' * 8, 'party_name': 'Bench',
+             'party_id': 1, 'location': 'Bench Hall', 'latitude': 19.07, 'longitude': 72.87,
+             'event_date': now + timedelta(days=1, minutes=offset + i), 'qr_code': 'x', 'created_at': now}
+            for i in range(count)
+        ])
+        db.session.execute(db.insert(EventRegistration), [
+            {'event_id': 1, 'user_id': offset + i + 2, 'latitude': 19.07, 'longitude': 72.87,
+             'registered_at': now, 'attended': bool(i % 3 == 0)}
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def orm_registrations():
+    from sqlalchemy.orm import joinedload
+    from political_events.models import EventRegistration
+
+    return EventRegistration.query.filter_by(event_id=1).options(joinedload(EventRegistration.user)).all()
+
+
+def orm_registration_dicts(registrations):
+    return [{
+        'id': reg.id,
+        'user_id': reg.user_id,
+        'user_email': reg.user.email,
+        'registered_at': reg.registered_at.isoformat(),
+        'attended': reg.attended,
+        'qr_scanned_at': reg.qr_scanned_at.isoformat() if reg.qr_scanned_at else None,
+        'latitude': reg.latitude,
+        'longitude': reg.longitude
+    } for reg in registrations]
+
+
+def orm_events():
+    from datetime import datetime
+    from political_events.models import Event
+
+    return Event.query.filter(Event.event_date > datetime.utcnow()).all()
+
+
+def orm_event_dicts(events):
+    return [{
+        'id': event.id,
+        'title': event.title,
+        'description': event.description,
+        'party_name': event.party_name,
+        'location': event.location,
+        'latitude': event.latitude,
+        'longitude': event.longitude,
+        'event_date': event.event_date.isoformat(),
+        'created_at': event.created_at.isoformat()
+    } for event in events]
+
+
+def measure(load, serialize, repeats):
+    """Median load/serialize seconds, and memory of one loaded result"""
+    from political_events.extensions import db
+
+    load_times, serialize_times = [], []
+    for _ in range(repeats):
+        db.session.remove()  # a fresh identity map, as in a new request
+        gc.collect()
+        t0 = time.perf_counter()
+        loaded = load()
+        t1 = time.perf_counter()
+        serialize(loaded)
+        t2 = time.perf_counter()
+        load_times.append(t1 - t0)
+        serialize_times.append(t2 - t1)
+        del loaded
+
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    loaded = load()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(loaded)
+    del loaded
+    db.session.remove()
+    return {
+        'rows': count,
+        'load_ms': statistics.median(load_times) * 1000,
+        'serialize_ms': statistics.median(serialize_times) * 1000,
+        'total_ms': (statistics.median(load_times) + statistics.median(serialize_times)) * 1000,
+        'rows_per_s': count / (statistics.median(load_times) + statistics.median(serialize_times)),
+        'retained_mb': retained / 2 ** 20,
+        'peak_mb': peak / 2 ** 20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/read_models-<commit>.json)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        from config import ProductionConfig
+        from political_events import create_app, read_models, serializers
+        from political_events.extensions import db
+
+        app = create_app(ProductionConfig)  # no development guards in the measurement
+        with app.app_context():
+            db.create_all()
+            populate(args.rows)
+            report = {
+                'rows': args.rows,
+                'registrations': {
+                    'orm': measure(orm_registrations, orm_registration_dicts, args.repeats),
+                    'read_model': measure(lambda: read_models.event_registrations(1),
+                                          serializers.REGISTRATION.many, args.repeats),
+                },
+                'events': {
+                    'orm': measure(orm_events, orm_event_dicts, args.repeats),
+                    'read_model': measure(read_models.upcoming_events, serializers.EVENT.many, args.repeats),
+                },
+            }
+            db.engine.dispose()
+
+    for name in ('registrations', 'events'):
+        orm, rows = report[name]['orm'], report[name]['read_model']
+        report[name]['speedup'] = orm['total_ms'] / rows['total_ms']
+        report[name]['memory_ratio'] = rows['retained_mb'] / orm['retained_mb']
+    path = results.save(report, 'read_models', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Registration load test: hundreds of concurrent joins against one capped event.
+
+Every simulated user POSTs /user/join_event/<id> through the app from its
+own thread, and a share of them retry immediately with the same
+idempotency key, as a flaky mobile client would.  Afterwards the database
+is checked for overbooking and duplicates, and per-request latency is
+reported.  Exits non-zero if any invariant is broken.  Usage:
+
+    python benchmarks/registration_load.py
+    python benchmarks/registration_load.py --users 1000 --capacity 250 --concurrency 300 --output load.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def setup(users, capacity):
+    from datetime import datetime, timedelta
+    from political_events.extensions import db
+    from political_events.models import User, Event, EventCapacity
+    
+    db.create_all()
+    db.session.add(User(email='party@bench.org', password_hash='x', role='party', party_name='Bench'))
+    db.session.commit()
+    party_id = db.session.execute(db.select(User.id)).scalar()
+    db.session.execute(db.insert(User), [
+        {'email': f'user{i}@bench.org', 'password_hash': 'x', 'role': 'user'} for i in range(users)
+    ])
+    event = Event(title='Launch rally', description='d', party_name='Bench', party_id=party_id,
+                  location='Bench Hall', latitude=12.97, longitude=77.59,
+                  event_date=datetime.utcnow() + timedelta(days=7), qr_code='x')
+    db.session.add(event)
+    db.session.flush()
+    db.session.add(EventCapacity(event_id=event.id, capacity=capacity, reserved=0))
+    db.session.commit()
+    user_ids = db.session.execute(db.select(User.id).where(User.role == 'user')).scalars().all()
+    return event.id, user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--capacity', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--retry-share', type=float, default=0.25, help='share of users that send a duplicate request')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmp, "load.db")}'
+        from political_events import create_app
+        from political_events.extensions import db
+        from political_events.models import EventRegistration, EventCapacity, WaitlistEntry
+        
+        app = create_app()
+        with app.app_context():
+            event_id, user_ids = setup(args.users, args.capacity)
+        
+        retry_every = max(int(1 / args.retry_share), 1) if args.retry_share else 0
+        requests = []
+        for index, user_id in enumerate(user_ids):
+            requests.append((user_id, f'key-{user_id}'))
+            if retry_every and index % retry_every == 0:
+                requests.append((user_id, f'key-{user_id}'))
+        
+        latencies, statuses, errors = [], {}, []
+        lock = threading.Lock()
+        start_gate = threading.Barrier(min(args.concurrency, len(requests)))
+        
+        def join(request):
+            user_id, key = request
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+            try:
+                start_gate.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            t0 = time.perf_counter()
+            response = client.post(f'/user/join_event/{event_id}', json={'latitude': 12.9, 'longitude': 77.6},
+                                   headers={'Idempotency-Key': key})
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+                else:
+                    status = response.get_json()['status']
+                    statuses[status] = statuses.get(status, 0) + 1
+        
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(join, requests))
+        wall = time.perf_counter() - t0
+        
+        with app.app_context():
+            registered = db.session.execute(
+                db.select(db.func.count(EventRegistration.id)).where(EventRegistration.event_id == event_id)
+            ).scalar()
+            distinct = db.session.execute(
+                db.select(db.func.count(db.distinct(EventRegistration.user_id)))
+                .where(EventRegistration.event_id == event_id)
+            ).scalar()
+            waitlisted = db.session.execute(
+                db.select(db.func.count(WaitlistEntry.id)).where(WaitlistEntry.event_id == event_id)
+            ).scalar()
+            reserved = db.session.get(EventCapacity, event_id).reserved
+            db.session.remove()
+            db.engine.dispose()
+    
+    checks = {
+        'not_overbooked': registered <= args.capacity,
+        'event_filled': registered == min(args.capacity, args.users),
+        'no_duplicate_registrations': distinct == registered,
+        'counter_matches_rows': reserved == registered,
+        'everyone_placed': registered + waitlisted == args.users,
+        'no_errors': not errors,
+    }
+    report = {
+        'users': args.users,
+        'capacity': args.capacity,
+        'concurrency': args.concurrency,
+        'requests': len(requests),
+        'python': sys.version.split()[0],
+        'wall_s': wall,
+        'throughput_rps': len(requests) / wall,
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50) * 1000,
+            'p95': percentile(latencies, 0.95) * 1000,
+            'p99': percentile(latencies, 0.99) * 1000,
+            'max': max(latencies) * 1000,
+            'stdev': statistics.pstdev(latencies) * 1000,
+        },
+        'responses': statuses,
+        'errors': errors,
+        'registered': registered,
+        'waitlisted': waitlisted,
+        'checks': checks,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(text + '\n')
+    print(text)
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark result files: run metadata and commit-to-commit comparison.
+
+Reports written through save() carry the git commit, Python version and a
+timestamp, and land in benchmarks/results/ unless a path is given.  compare
+walks two reports (ours, or pytest-benchmark --benchmark-json files) and
+prints every timing that moved by more than the threshold.  Usage:
+
+    python benchmarks/results.py compare results/load-abc123.json results/load-def456.json
+    python benchmarks/results.py compare old.json new.json --threshold 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Leaves whose name ends with one of these are timings: larger is worse
+TIMING_SUFFIXES = ('_s', '_ms', 'p50', 'p95', 'p99', 'max', 'mean', 'median', 'min')
+# ... and these are rates: smaller is worse
+RATE_SUFFIXES = ('_rps', 'ops')
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def metadata():
+    return {
+        'commit': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def save(report, name, output=None):
+    """Add metadata to report and write it; returns the path"""
+    report = dict(report, meta=metadata())
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{report['meta']['commit']}.json")
+    with open(output, 'w') as fh:
+        json.dump(report, fh, indent=2)
+        fh.write('\n')
+    return output
+
+
+def flatten(value, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1}; pytest-benchmark entries are keyed by test name"""
+    if isinstance(value, dict):
+        if 'benchmarks' in value and isinstance(value['benchmarks'], list):
+            value = {bench['name']: bench.get('stats', {}) for bench in value['benchmarks']}
+        items = {}
+        for key, child in value.items():
+            if key != 'meta':
+                items.update(flatten(child, f'{prefix}{key}.'))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix.rstrip('.'): value}
+    return {}
+
+
+def compare(old, new, threshold):
+    """Yield (name, old, new, change %, regressed) for metrics that moved more than threshold %"""
+    old, new = flatten(old), flatten(new)
+    for name in sorted(old.keys() & new.keys()):
+        leaf = name.rsplit('.', 1)[-1]
+        lower_is_better = leaf.endswith(TIMING_SUFFIXES)
+        if not lower_is_better and not leaf.endswith(RATE_SUFFIXES):
+            continue
+        before, after = old[name], new[name]
+        if not before:
+            continue
+        change = (after - before) / before * 100
+        if abs(change) >= threshold:
+            yield name, before, after, change, change > 0 if lower_is_better else change < 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff = commands.add_parser('compare', help='compare two result files')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=10.0, help='minimum change in percent to report')
+    args = parser.parse_args()
+
+    with open(args.old) as fh:
+        old = json.load(fh)
+    with open(args.new) as fh:
+        new = json.load(fh)
+    print(f"{old.get('meta', {}).get('commit', args.old)} -> {new.get('meta', {}).get('commit', args.new)}")
+    regressions = 0
+    for name, before, after, change, regressed in compare(old, new, args.threshold):
+        regressions += regressed
+        print(f"{'❌' if regressed else '✅'} {name}: {before:.4g} -> {after:.4g} ({change:+.1f}%)")
+    if regressions:
+        print(f'\n{regressions} regression(s) above {args.threshold:g}%')
+        sys.exit(1)
+    print('\nNo regressions above threshold')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: CPU per registration in a bulk JSON response.
+
+Builds --rows read_models.RegistrationRow objects in memory and turns them
+into a jsonify() body three ways: the hand-written dict with isoformat()
+calls on Flask's default provider (sorted keys, ASCII escapes), the compiled
+serializers.REGISTRATION on JSONProvider with the standard library, and the
+same on orjson when it is installed.  Reports the median process CPU time
+per registration for building the dicts and for encoding them.  Usage:
+
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --rows 20000 --output serialization.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import results  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def make_rows(count):
+    from political_events.read_models import RegistrationRow
+
+    now = datetime.utcnow()
+    return [RegistrationRow(
+        id=i, event_id=1, user_id=i + 2, user_email=f'user{i}@bench.example',
+        registered_at=now - timedelta(seconds=i), attended=i % 3 == 0,
+        qr_scanned_at=now - timedelta(seconds=i // 2) if i % 3 == 0 else None,
+        latitude=19.07 + i * 1e-6, longitude=72.87 - i * 1e-6,
+    ) for i in range(count)]
+
+
+def handwritten_dicts(rows):
+    """The registration API's dicts before the compiled serializers"""
+    return [{
+        'id': reg.id,
+        'user_id': reg.user_id,
+        'user_email': reg.user_email,
+        'registered_at': reg.registered_at.isoformat() if reg.registered_at else None,
+        'attended': reg.attended,
+        'qr_scanned_at': reg.qr_scanned_at.isoformat() if reg.qr_scanned_at else None,
+        'latitude': reg.latitude,
+        'longitude': reg.longitude,
+    } for reg in rows]
+
+
+def measure(rows, build, provider, repeats):
+    """Median CPU seconds to build the dicts and to encode them as a response body"""
+    build_times, encode_times = [], []
+    for _ in range(repeats):
+        gc.collect()
+        t0 = time.process_time()
+        payload = build(rows)
+        t1 = time.process_time()
+        body = provider.response(payload).get_data()
+        t2 = time.process_time()
+        build_times.append(t1 - t0)
+        encode_times.append(t2 - t1)
+    build_s, encode_s = statistics.median(build_times), statistics.median(encode_times)
+    return {
+        'build_us_per_row': build_s / len(rows) * 1e6,
+        'encode_us_per_row': encode_s / len(rows) * 1e6,
+        'total_us_per_row': (build_s + encode_s) / len(rows) * 1e6,
+        'total_ms': (build_s + encode_s) * 1000,
+        'body_bytes': len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/serialization-<commit>.json)')
+    args = parser.parse_args()
+
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from political_events import serializers
+
+    def app_with(cls, backend=None):
+        app = Flask(__name__)
+        app.config['JSON_BACKEND'] = backend
+        app.json = cls(app)
+        return app  # the provider only holds a weak reference to it
+
+    rows = make_rows(args.rows)
+    variants = {
+        'handwritten_flask_default': (handwritten_dicts, app_with(DefaultJSONProvider)),
+        'compiled_json': (serializers.REGISTRATION.many, app_with(serializers.JSONProvider, 'json')),
+    }
+    if serializers.orjson is not None:
+        variants['compiled_orjson'] = (serializers.REGISTRATION.many, app_with(serializers.JSONProvider, 'orjson'))
+
+    report = {'rows': args.rows}
+    for name, (build, app) in variants.items():
+        report[name] = measure(rows, build, app.json, args.repeats)
+    baseline = report['handwritten_flask_default']['total_us_per_row']
+    for name in variants:
+        report[name]['speedup'] = baseline / report[name]['total_us_per_row']
+    path = results.save(report, 'serialization', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
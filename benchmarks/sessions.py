@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Session store benchmark: Set-Cookie rate and per-request cost.
+
+Signs in --clients users against a throwaway SQLite database and has each
+send --requests authenticated API calls (location pings and unread counts),
+once with Flask's cookie sessions plus the old "session.modified = True on
+every request" refresh, and once with the server-side store.  Reports how
+many responses carried a Set-Cookie, the bytes of Set-Cookie headers sent,
+and request time percentiles per operation.  Usage:
+
+    python benchmarks/sessions.py
+    python benchmarks/sessions.py --clients 50 --requests 200 --output sessions.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import datagen  # noqa: E402  (also puts the project root on sys.path)
+import results  # noqa: E402
+
+
+def run(app, clients, requests):
+    from flask import session
+    from flask_login import current_user
+
+    if app.config['SESSION_STORE'] == 'cookie':
+        def refresh_every_request():  # what views.before_request used to do
+            if current_user.is_authenticated:
+                session.permanent = True
+                session.modified = True
+        app.before_request(refresh_every_request)
+
+    test_clients = []
+    for i in range(clients):
+        client = app.test_client()
+        response = client.post('/login', data={'email': f'user{i}@bench.example', 'password': datagen.BENCH_PASSWORD})
+        assert response.status_code == 302, response.status_code
+        test_clients.append(client)
+
+    timings = {'unread_count': [], 'location': []}
+    with_cookie = cookie_bytes = 0
+    for n in range(requests):
+        for client in test_clients:
+            t0 = time.perf_counter()
+            if n % 2:
+                operation, response = 'unread_count', client.get('/api/notifications/unread_count')
+            else:
+                operation, response = 'location', client.post('/api/user/location',
+                                                              json={'latitude': 19.07, 'longitude': 72.87})
+            timings[operation].append(time.perf_counter() - t0)
+            assert response.status_code == 200, response.status_code
+            cookies = response.headers.getlist('Set-Cookie')
+            with_cookie += bool(cookies)
+            cookie_bytes += sum(len(cookie) for cookie in cookies)
+    report = {
+        'requests': sum(len(samples) for samples in timings.values()),
+        'set_cookie_responses': with_cookie,
+        'set_cookie_bytes': cookie_bytes,
+    }
+    for operation, samples in timings.items():
+        report[operation] = {'median_ms': statistics.median(samples) * 1000,
+                             'p95_ms': sorted(samples)[int(len(samples) * 0.95)] * 1000}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=50, help='API calls per client')
+    parser.add_argument('--output', help='report path (default: benchmarks/results/sessions-<commit>.json)')
+    args = parser.parse_args()
+
+    from config import ProductionConfig
+    from political_events import create_app
+    from political_events.extensions import db
+
+    report = {'clients': args.clients}
+    for store in ('cookie', 'server'):
+        with tempfile.TemporaryDirectory() as tmp:
+            class BenchConfig(ProductionConfig):
+                SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+                SESSION_STORE = store
+                SESSION_COOKIE_SECURE = False
+
+            app = create_app(BenchConfig)
+            with app.app_context():
+                db.create_all()
+                datagen.generate(users=args.clients, events=1, registrations=0)
+            report[store] = run(app, args.clients, args.requests)
+            with app.app_context():
+                db.engine.dispose()
+
+    path = results.save(report, 'sessions', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
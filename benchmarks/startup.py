@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: interpreter start -> app import -> first response.
+
+Each sample runs in a fresh interpreter so module caches do not hide import
+cost, which is what a cold Render boot pays.  Usage:
+
+    python benchmarks/startup.py                 # production entry point
+    python benchmarks/startup.py --module app    # Socket.IO entry point
+    python benchmarks/startup.py --runs 20 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; prints one JSON sample
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import importlib
+module = importlib.import_module(sys.argv[1])
+t1 = time.perf_counter()
+client = module.app.test_client()
+response = client.get('/health')
+t2 = time.perf_counter()
+heavy = [name for name in ('qrcode', 'PIL', 'flask_socketio', 'engineio') if name in sys.modules]
+print(json.dumps({
+    'import_s': t1 - t0,
+    'first_response_s': t2 - t1,
+    'total_s': t2 - t0,
+    'status': response.status_code,
+    'heavy_modules_loaded': heavy,
+    'modules_loaded': len(sys.modules),
+}))
+"""
+
+
+def run_sample(module):
+    env = dict(os.environ, DATABASE_URL=os.environ.get('BENCH_DATABASE_URL', 'sqlite:///:memory:'))
+    output = subprocess.check_output(
+        [sys.executable, '-c', PROBE, module], cwd=PROJECT_ROOT, env=env
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def summarize(samples, key):
+    values = sorted(sample[key] for sample in samples)
+    return {
+        'min': values[0],
+        'median': statistics.median(values),
+        'max': values[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--module', default='app_production', help='entry module exposing `app`')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+    
+    samples = [run_sample(args.module) for _ in range(args.runs)]
+    report = {
+        'module': args.module,
+        'runs': args.runs,
+        'python': sys.version.split()[0],
+        'import_s': summarize(samples, 'import_s'),
+        'first_response_s': summarize(samples, 'first_response_s'),
+        'total_s': summarize(samples, 'total_s'),
+        'heavy_modules_loaded': samples[-1]['heavy_modules_loaded'],
+        'modules_loaded': samples[-1]['modules_loaded'],
+        'status': samples[-1]['status'],
+    }
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
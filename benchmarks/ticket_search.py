@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Ticket search benchmark: FTS5 index versus LIKE over a large backlog.
+
+Builds a throwaway SQLite database with synthetic tickets, then times the
+admin queue query (search + status filter + first keyset page) through the
+FTS index and through the LIKE fallback.  Usage:
+
+    python benchmarks/ticket_search.py                   # 100k tickets
+    python benchmarks/ticket_search.py --tickets 20000 --output search.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+WORDS = ('login password reset event ticket qr code scan map location volunteer rally '
+         'party venue parking refund email phone registration account error slow page '
+         'attendance badge schedule timezone speaker banner permission upload').split()
+
+# Common words match most tickets; order references are rare, like real
+# names and ids are; the last query matches nothing
+QUERIES = ['password reset', 'qr', 'parking refund', 'order 4242', 'order 17', 'zzznomatch']
+
+
+def populate(count, seed=1):
+    from datetime import datetime, timedelta
+    from political_events.extensions import db
+    from political_events.models import User, Ticket
+    
+    rng = random.Random(seed)
+    db.session.add(User(email='bench@example.com', password_hash='x', role='user'))
+    db.session.commit()
+    start = datetime(2024, 1, 1)
+    statuses = ('open', 'in_progress', 'resolved')
+    for offset in range(0, count, 5000):
+        db.session.execute(db.insert(Ticket), [
+            {
+                'user_id': 1,
+                'subject': ' '.join(rng.choices(WORDS, k=4)),
+                'message': ' '.join(rng.choices(WORDS, k=40)) + f' order {rng.randrange(50000)}',
+                'status': rng.choice(statuses),
+                'created_at': start + timedelta(minutes=offset + i),
+            }
+            for i in range(min(5000, count - offset))
+        ])
+        db.session.commit()
+
+
+def time_query(text, use_index, repeats):
+    from political_events import tickets
+    from political_events.extensions import db
+    from political_events.models import Ticket
+    from political_events.pagination import keyset_paginate
+    
+    tickets._search_available[db.engine] = use_index
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        query = tickets.queue_query(status='open', search=text)
+        rows, _ = keyset_paginate(query, Ticket.created_at, Ticket.id)
+        samples.append(time.perf_counter() - t0)
+    return {'median_ms': statistics.median(samples) * 1000, 'rows': len(rows)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tickets', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        from political_events import create_app
+        from political_events.extensions import db
+        from political_events.tickets import ensure_search_index
+        
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            if not ensure_search_index():
+                sys.exit('SQLite was built without FTS5')
+            t0 = time.perf_counter()
+            populate(args.tickets)
+            load_s = time.perf_counter() - t0
+            
+            results = {
+                text: {
+                    'fts': time_query(text, True, args.repeats),
+                    'like': time_query(text, False, args.repeats),
+                }
+                for text in QUERIES
+            }
+            db.session.remove()
+            db.engine.dispose()
+    
+    report = {
+        'tickets': args.tickets,
+        'python': sys.version.split()[0],
+        'load_with_triggers_s': load_s,
+        'queries': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
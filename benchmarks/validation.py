@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Validation benchmark: provisioning rows through the old helpers and the schemas.
+
+Generates --rows user records (about one in five invalid in some field) and
+validates them the way provisioning did before political_events.validation
+(re.match with a literal pattern per call, twelve str.replace passes per
+sanitize, a list scan for personal email domains) and with
+USER_ROW.validate_many.  Also times sanitize() alone against the replace
+loop.  Reports the median rows per second of each.  Usage:
+
+    python benchmarks/validation.py
+    python benchmarks/validation.py --rows 20000 --output validation.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import results  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+PERSONAL_EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com', 'icloud.com']
+
+
+def make_records(count, seed=1):
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        role = 'party' if i % 10 == 0 else 'user'
+        record = {
+            'email': f'  Volunteer{i}@{rng.choice(PERSONAL_EMAIL_DOMAINS + ["campaign.org"])} ',
+            'phone': f'({rng.randint(200, 999)}) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+            'password': 'Str0ng!pass' if i % 3 else '',
+            'role': role,
+            'party_name': f'Party <{i}>' if role == 'party' else '',
+        }
+        flaw = rng.randrange(20)
+        if flaw == 0:
+            record['email'] = 'not-an-email'
+        elif flaw == 1:
+            record['phone'] = '12345'
+        elif flaw == 2:
+            record['password'] = 'weak'
+        elif flaw == 3:
+            record['role'] = 'admin'
+        records.append(record)
+    return records
+
+
+def old_sanitize(text):
+    if not text:
+        return ""
+    for char in ['<', '>', '"', "'", '&', ';', '(', ')', '{', '}', '[', ']']:
+        text = text.replace(char, '')
+    return text.strip()
+
+
+def old_validate_password(password):
+    if len(password) < 8:
+        return False, "Password must be at least 8 characters long"
+    if not re.search(r'[A-Z]', password):
+        return False, "Password must contain at least one uppercase letter"
+    if not re.search(r'[a-z]', password):
+        return False, "Password must contain at least one lowercase letter"
+    if not re.search(r'\d', password):
+        return False, "Password must contain at least one number"
+    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        return False, "Password must contain at least one special character"
+    return True, "Password is strong"
+
+
+def old_validate_user_row(record, default_role='user'):
+    """provisioning.validate_user_row before the validation module"""
+    email = str(record.get('email') or '').strip().lower()
+    phone = str(record.get('phone') or '').strip()
+    password = str(record.get('password') or '')
+    role = str(record.get('role') or default_role).strip().lower()
+    party_name = str(record.get('party_name') or '').strip()
+
+    errors = []
+    if not email or re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email) is None:
+        errors.append('A valid email is required')
+    if phone and len(re.sub(r'\D', '', phone)) != 10:
+        errors.append('Phone must have 10 digits')
+    if password:
+        password_valid, password_message = old_validate_password(password)
+        if not password_valid:
+            errors.append(password_message)
+    if role not in ('user', 'party'):
+        errors.append('role must be one of user, party')
+    if role == 'party' and not 3 <= len(party_name) <= 100:
+        errors.append('party_name must be 3-100 characters for party accounts')
+    if role == 'party' and email.split('@')[-1].lower() in PERSONAL_EMAIL_DOMAINS:
+        errors.append('personal email')
+    values = {
+        'email': old_sanitize(email),
+        'phone': re.sub(r'\D', '', phone) or None,
+        'password': password,
+        'role': role,
+        'party_name': old_sanitize(party_name) if role == 'party' else None,
+    }
+    return values, errors
+
+
+def median_seconds(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='report path (default: benchmarks/results/validation-<commit>.json)')
+    args = parser.parse_args()
+
+    from political_events import validation
+
+    records = make_records(args.rows)
+    texts = [record['party_name'] or record['email'] for record in records]
+
+    def schema_rows():
+        batch = validation.USER_ROW.validate_many(records, default_role='user')
+        for result in batch:  # the personal-domain lookup the old helper also does
+            if result.values and result.values['role'] == 'party':
+                validation.is_personal_email(result.values['email'])
+        return batch
+
+    new_invalid = sum(not result for result in validation.USER_ROW.validate_many(records))
+
+    timings = {
+        'user_rows_old': median_seconds(lambda: [old_validate_user_row(record) for record in records], args.repeats),
+        'user_rows_schema': median_seconds(schema_rows, args.repeats),
+        'sanitize_old': median_seconds(lambda: [old_sanitize(text) for text in texts], args.repeats),
+        'sanitize_regex': median_seconds(lambda: [validation.sanitize(text) for text in texts], args.repeats),
+    }
+    report = {'rows': args.rows, 'invalid_rows': new_invalid}
+    for name, seconds in timings.items():
+        report[name] = {'total_ms': seconds * 1000, 'rows_per_s': args.rows / seconds}
+    report['user_rows_speedup'] = timings['user_rows_old'] / timings['user_rows_schema']
+    report['sanitize_speedup'] = timings['sanitize_old'] / timings['sanitize_regex']
+    path = results.save(report, 'validation', args.output)
+    print(json.dumps(report, indent=2))
+    print(f'✅ Saved {path}')
+
+
+if __name__ == '__main__':
+    main()
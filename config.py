@@ -25,12 +25,83 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
     ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'pdf'}
+    # Event images (political_events.images) are stored by content hash under
+    # UPLOAD_FOLDER, relative to the instance folder unless absolute; their
+    # WebP variants are rendered by IMAGE_WORKERS processes (0 = in a thread)
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+    
+    # Bulk event import
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 500))
+    IMPORT_QR_WORKERS = int(os.getenv('IMPORT_QR_WORKERS', 0))  # > 1 = shared process pool, else inline
+    GEOCODER = os.getenv('GEOCODER', 'offline')
+    GEOCODER_GAZETTEER = os.getenv('GEOCODER_GAZETTEER', '')  # optional CSV of name,latitude,longitude
+    
+    # Invitation fan-out
+    INVITATION_BATCH_SIZE = int(os.getenv('INVITATION_BATCH_SIZE', 1000))
+    
+    # Notification retention (read notifications older than this are purged)
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 30))
+    NOTIFICATION_PURGE_CHUNK_SIZE = int(os.getenv('NOTIFICATION_PURGE_CHUNK_SIZE', 5000))
+    
+    # create_event drafts untouched for this long are discarded
+    EVENT_DRAFT_TTL_HOURS = int(os.getenv('EVENT_DRAFT_TTL_HOURS', 72))
+    
+    # Events older than this many days are moved to the archive tables
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 90))
+    ARCHIVE_CHUNK_SIZE = int(os.getenv('ARCHIVE_CHUNK_SIZE', 200))
+    
+    # Venue check-in: token signing key (defaults to one derived from
+    # SECRET_KEY), how long after the event starts tokens verify and how
+    # often accepted scans are written to the database
+    CHECKIN_TOKEN_SECRET = os.getenv('CHECKIN_TOKEN_SECRET')
+    CHECKIN_TOKEN_VALID_HOURS = int(os.getenv('CHECKIN_TOKEN_VALID_HOURS', 24))
+    CHECKIN_FLUSH_INTERVAL = float(os.getenv('CHECKIN_FLUSH_INTERVAL', 1.0))
+    CHECKIN_FLUSH_BATCH_SIZE = int(os.getenv('CHECKIN_FLUSH_BATCH_SIZE', 500))
+    
+    # Location trail (political_events.location_trail): raw pings are kept
+    # for LOCATION_TRAIL_RAW_HOURS, then thinned to one per
+    # LOCATION_TRAIL_RESOLUTION seconds, and dropped after
+    # LOCATION_TRAIL_RETENTION_DAYS (python maintenance.py compact-locations)
+    LOCATION_TRAIL_RAW_HOURS = int(os.getenv('LOCATION_TRAIL_RAW_HOURS', 48))
+    LOCATION_TRAIL_RESOLUTION = int(os.getenv('LOCATION_TRAIL_RESOLUTION', 300))
+    LOCATION_TRAIL_RETENTION_DAYS = int(os.getenv('LOCATION_TRAIL_RETENTION_DAYS', 90))
     
     # Security
     SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = os.getenv('SESSION_COOKIE_HTTPONLY', 'True').lower() == 'true'
     PERMANENT_SESSION_LIFETIME = int(os.getenv('PERMANENT_SESSION_LIFETIME', 3600))
     
+    # Server-side sessions (political_events.sessions); 'cookie' keeps Flask's
+    # signed cookies.  Expiry is extended, and the cookie re-sent, only once
+    # SESSION_REFRESH_FRACTION of the lifetime has passed.
+    SESSION_STORE = os.getenv('SESSION_STORE', 'server')
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 10000))  # sessions cached per process
+    SESSION_REFRESH_FRACTION = float(os.getenv('SESSION_REFRESH_FRACTION', 0.25))
+    SESSION_GC_INTERVAL = int(os.getenv('SESSION_GC_INTERVAL', 300))  # seconds between expired-session sweeps
+    SESSION_GC_BATCH = int(os.getenv('SESSION_GC_BATCH', 1000))  # rows deleted per sweep
+    
+    # Real-time (Socket.IO) layer, off unless explicitly enabled
+    REALTIME_ENABLED = os.getenv('REALTIME_ENABLED', 'False').lower() == 'true'
+    STATS_SNAPSHOT_TTL = int(os.getenv('STATS_SNAPSHOT_TTL', 300))  # seconds before live stats are reloaded
+    
+    # Opt-in request/query/template timing served at /metrics (Prometheus);
+    # METRICS_TOKEN lets a scraper in without an admin session.  With
+    # PROFILING_ENABLED admins can append ?__profile=1 to any URL.
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'False').lower() == 'true'
+    INSTRUMENTATION_SLOW_QUERIES = int(os.getenv('INSTRUMENTATION_SLOW_QUERIES', 10))  # kept per endpoint
+    INSTRUMENTATION_SLOW_REQUEST_MS = int(os.getenv('INSTRUMENTATION_SLOW_REQUEST_MS', 1000))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR')  # defaults to instance/profiles
+    
+    # JSON encoding for jsonify() and |tojson: 'auto' uses orjson when it is
+    # installed, 'orjson' requires it, 'json' forces the standard library
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+    
+    # N+1 guards (political_events.query_guard): 'raise', 'warn' or empty
+    LAZY_LOAD_GUARD = os.getenv('LAZY_LOAD_GUARD', '')
+    QUERY_BUDGETS = os.getenv('QUERY_BUDGETS', '')
+    
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'logs/political_events.log')
@@ -41,16 +112,18 @@ class DevelopmentConfig(Config):
     TESTING = False
     CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = 3600
+    LAZY_LOAD_GUARD = os.getenv('LAZY_LOAD_GUARD', 'warn')
+    QUERY_BUDGETS = os.getenv('QUERY_BUDGETS', 'warn')
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
     CSRF_ENABLED = True
-    SESSION_COOKIE_SECURE = True
+    SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'True').lower() == 'true'
     
     # Use environment-specific database
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', Config.SQLALCHEMY_DATABASE_URI)
 
 class TestingConfig(Config):
     """Testing configuration"""
@@ -58,6 +131,8 @@ class TestingConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    LAZY_LOAD_GUARD = 'raise'
+    QUERY_BUDGETS = 'raise'
 
 # Configuration dictionary
 config = {
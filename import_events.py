@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Bulk Event Import Script for Political Events App
+Creates events for a party account from a CSV, JSON or JSON Lines file.
+
+Usage:
+    python import_events.py events.csv --party party@demo.com
+    python import_events.py events.jsonl --party party@demo.com --batch-size 1000 --workers 4
+
+CSV/JSON fields: title, description, location, event_date (YYYY-MM-DDTHH:MM)
+and optionally latitude/longitude; missing coordinates are geocoded from
+location.
+"""
+
+import argparse
+import json
+import sys
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import events for a party account')
+    parser.add_argument('file', help='CSV, JSON or JSON Lines file')
+    parser.add_argument('--party', required=True, help='email of the party account that owns the events')
+    parser.add_argument('--format', choices=['csv', 'json', 'jsonl'], help='override format detection')
+    parser.add_argument('--batch-size', type=int, help='rows per INSERT/commit')
+    parser.add_argument('--workers', type=int, help='QR rendering processes (0 = inline)')
+    args = parser.parse_args()
+    
+    from political_events import create_app
+    from political_events.geocoding import get_geocoder
+    from political_events.importer import import_events, detect_format
+    from political_events.models import User
+    
+    app = create_app()
+    with app.app_context():
+        party = User.query.filter_by(email=args.party.lower(), role='party').first()
+        if not party:
+            print(f"❌ No party account found for {args.party}")
+            sys.exit(1)
+        
+        with open(args.file, 'rb') as fh:
+            report = import_events(
+                fh,
+                args.format or detect_format(args.file),
+                party,
+                geocoder=get_geocoder(app.config),
+                batch_size=args.batch_size or app.config['IMPORT_BATCH_SIZE'],
+                qr_workers=args.workers if args.workers is not None else app.config['IMPORT_QR_WORKERS'],
+            )
+    
+    result = report.to_dict()
+    print(f"✅ Imported {result['created']} of {result['total']} events")
+    if result['errors']:
+        print(f"⚠️  {result['failed']} rows rejected:")
+        for error in result['errors']:
+            print(f"   row {error['row']}: {'; '.join(error['errors'])}")
+        print(json.dumps(result['errors'], indent=2), file=sys.stderr)
+        sys.exit(2 if not result['created'] else 0)
+
+if __name__ == '__main__':
+    main()
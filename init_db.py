@@ -2,14 +2,22 @@
 """
 Database Initialization Script for Political Events App
 Run this script to create all database tables and initial data.
+
+The work is versioned (see political_events.bootstrap): when the schema and
+demo data are already up to date this is a single query, so it is safe to
+run on every deploy start.  Pass --force to re-run table creation and seeding.
 """
 
 import os
-from app_production import app, db, User
-from werkzeug.security import generate_password_hash
+import sys
 
-def init_database():
+def init_database(app=None, force=False):
     """Initialize the database with tables and initial data."""
+    from political_events.bootstrap import bootstrap, DEMO_ACCOUNTS
+    
+    if app is None:
+        from political_events import create_app
+        app = create_app()
     
     # Ensure instance directory exists
     instance_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
@@ -18,69 +26,28 @@ def init_database():
         print(f"✅ Created instance directory: {instance_dir}")
     
     with app.app_context():
-        print("Creating database tables...")
         try:
-            db.create_all()
-            print("✅ Database tables created successfully!")
+            result = bootstrap(force=force)
         except Exception as e:
-            print(f"❌ Error creating database: {e}")
+            print(f"❌ Error initializing database: {e}")
             return
-        
-        # Check if admin user exists
-        admin = User.query.filter_by(role='admin').first()
-        if not admin:
-            print("Creating admin user...")
-            admin = User(
-                email='admin@political.com',
-                phone='1234567890',
-                password_hash=generate_password_hash('admin123'),
-                role='admin'
-            )
-            db.session.add(admin)
-            db.session.commit()
-            print("✅ Admin user created: admin@political.com / admin123")
-        else:
-            print("✅ Admin user already exists")
-        
-        # Check if demo party user exists
-        party_user = User.query.filter_by(role='party').first()
-        if not party_user:
-            print("Creating demo party user...")
-            party_user = User(
-                email='party@demo.com',
-                phone='9876543210',
-                password_hash=generate_password_hash('party123'),
-                role='party',
-                party_name='Demo Political Party'
-            )
-            db.session.add(party_user)
-            db.session.commit()
-            print("✅ Demo party user created: party@demo.com / party123")
-        else:
-            print("✅ Demo party user already exists")
-        
-        # Check if demo regular user exists
-        regular_user = User.query.filter_by(role='user').first()
-        if not regular_user:
-            print("Creating demo regular user...")
-            regular_user = User(
-                email='user@demo.com',
-                phone='5555555555',
-                password_hash=generate_password_hash('user123'),
-                role='user'
-            )
-            db.session.add(regular_user)
-            db.session.commit()
-            print("✅ Demo regular user created: user@demo.com / user123")
-        else:
-            print("✅ Demo regular user already exists")
-        
-        print("\n🎉 Database initialization complete!")
-        print("\n📋 Demo Accounts:")
-        print("   Admin: admin@political.com / admin123")
-        print("   Party: party@demo.com / party123")
-        print("   User:  user@demo.com / user123")
+    
+    if result['skipped']:
+        print("✅ Database already up to date")
+        return
+    
+    if result['created_tables']:
+        print("✅ Database tables created successfully!")
+    
+    passwords = {account['email']: account['password'] for account in DEMO_ACCOUNTS}
+    for email in result['seeded']:
+        print(f"✅ Demo user created: {email} / {passwords[email]}")
+    
+    print("\n🎉 Database initialization complete!")
+    print("\n📋 Demo Accounts:")
+    print("   Admin: admin@political.com / admin123")
+    print("   Party: party@demo.com / party123")
+    print("   User:  user@demo.com / user123")
 
 if __name__ == '__main__':
-    init_database()
-
+    init_database(force='--force' in sys.argv[1:])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Maintenance Script for Political Events App
+Periodic housekeeping jobs, meant to be run from cron or a scheduler.
+
+Usage:
+    python maintenance.py purge-notifications [--days 30] [--chunk-size 5000]
+    python maintenance.py purge-drafts [--hours 72]
+    python maintenance.py archive-events [--days 90] [--chunk-size 200]
+    python maintenance.py purge-join-keys [--hours 24]
+    python maintenance.py purge-sessions [--chunk-size 1000]
+    python maintenance.py compact-locations [--hours 48] [--resolution 300] [--days 90]
+    python maintenance.py backfill-rollups [--chunk-size 200]
+    python maintenance.py prune-images [--hours 24]
+    python maintenance.py normalize-phones [--chunk-size 1000]
+"""
+
+import argparse
+
+def run_purge_notifications(app, args):
+    from political_events.notifications import purge_read_notifications
+    
+    days = args.days if args.days is not None else app.config['NOTIFICATION_RETENTION_DAYS']
+    with app.app_context():
+        deleted = purge_read_notifications(
+            older_than_days=days,
+            chunk_size=args.chunk_size or app.config['NOTIFICATION_PURGE_CHUNK_SIZE'],
+        )
+    print(f"🧹 Deleted {deleted} read notifications older than {days} days")
+
+def run_purge_drafts(app, args):
+    from political_events.drafts import purge_expired_drafts
+    
+    hours = args.hours if args.hours is not None else app.config['EVENT_DRAFT_TTL_HOURS']
+    with app.app_context():
+        deleted = purge_expired_drafts(ttl_hours=hours)
+    print(f"🧹 Deleted {deleted} event drafts untouched for {hours} hours")
+
+def run_archive_events(app, args):
+    from political_events.archive import archive_events
+    
+    days = args.days if args.days is not None else app.config['ARCHIVE_AFTER_DAYS']
+    with app.app_context():
+        moved = archive_events(
+            older_than_days=days,
+            chunk_size=args.chunk_size or app.config['ARCHIVE_CHUNK_SIZE'],
+        )
+    print(f"📦 Archived {moved['events']} events and {moved['registrations']} registrations older than {days} days")
+
+def run_purge_join_keys(app, args):
+    from political_events.registrations import purge_idempotency_keys
+    
+    with app.app_context():
+        deleted = purge_idempotency_keys(older_than_hours=args.hours)
+    print(f"🧹 Deleted {deleted} join idempotency keys older than {args.hours} hours")
+
+def run_purge_sessions(app, args):
+    from political_events.sessions import purge_expired_sessions
+    
+    with app.app_context():
+        deleted = purge_expired_sessions(chunk_size=args.chunk_size or app.config['SESSION_GC_BATCH'])
+    print(f"🧹 Deleted {deleted} expired sessions")
+
+def run_compact_locations(app, args):
+    from political_events.location_trail import compact_trails, purge_trails
+    
+    hours = args.hours if args.hours is not None else app.config['LOCATION_TRAIL_RAW_HOURS']
+    resolution = args.resolution if args.resolution is not None else app.config['LOCATION_TRAIL_RESOLUTION']
+    days = args.days if args.days is not None else app.config['LOCATION_TRAIL_RETENTION_DAYS']
+    with app.app_context():
+        compacted = compact_trails(older_than_hours=hours, resolution=resolution)
+        purged = purge_trails(retention_days=days)
+    print(f"🗜️  Folded {compacted['points']} location pings older than {hours} hours into "
+          f"{compacted['blocks']} daily blocks ({resolution}s resolution)")
+    print(f"🧹 Deleted {purged['blocks']} daily blocks and {purged['points']} pings older than {days} days")
+
+def run_backfill_rollups(app, args):
+    from political_events.rollups import backfill
+    
+    with app.app_context():
+        done = backfill(chunk_size=args.chunk_size)
+    print(f"📈 Rebuilt {done['rows']} arrival rollup rows for {done['events']} events")
+
+def run_prune_images(app, args):
+    from political_events.images import prune_images
+    
+    with app.app_context():
+        done = prune_images(grace_hours=args.hours)
+    print(f"🖼️  Rendered variants of {done['rendered']} interrupted uploads")
+    print(f"🧹 Deleted {done['deleted']} images no event has used for {args.hours} hours")
+
+def run_normalize_phones(app, args):
+    from political_events.provisioning import normalize_phones
+    
+    with app.app_context():
+        done = normalize_phones(chunk_size=args.chunk_size)
+    print(f"📞 Normalised {done['updated']} phone numbers to digits only")
+    if done['conflicts']:
+        print(f"⚠️  {done['conflicts']} numbers left as they are: another account has the same digits")
+
+def main():
+    parser = argparse.ArgumentParser(description='Run periodic maintenance jobs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    purge_parser = subparsers.add_parser('purge-notifications', help='delete old read notifications')
+    purge_parser.add_argument('--days', type=int, help='retention in days (default: NOTIFICATION_RETENTION_DAYS)')
+    purge_parser.add_argument('--chunk-size', type=int, help='rows deleted per transaction')
+    
+    drafts_parser = subparsers.add_parser('purge-drafts', help='delete expired create_event drafts')
+    drafts_parser.add_argument('--hours', type=int, help='draft lifetime (default: EVENT_DRAFT_TTL_HOURS)')
+    
+    archive_parser = subparsers.add_parser('archive-events', help='move past events to the archive tables')
+    archive_parser.add_argument('--days', type=int, help='archive events older than this (default: ARCHIVE_AFTER_DAYS)')
+    archive_parser.add_argument('--chunk-size', type=int, help='events moved per transaction')
+    
+    keys_parser = subparsers.add_parser('purge-join-keys', help='forget old event join idempotency keys')
+    keys_parser.add_argument('--hours', type=int, default=24, help='retry window to keep (default: 24)')
+    
+    sessions_parser = subparsers.add_parser('purge-sessions', help='delete expired server-side sessions')
+    sessions_parser.add_argument('--chunk-size', type=int, help='rows deleted per transaction (default: SESSION_GC_BATCH)')
+    
+    locations_parser = subparsers.add_parser('compact-locations', help='downsample and expire location trails')
+    locations_parser.add_argument('--hours', type=int, help='keep raw pings this long (default: LOCATION_TRAIL_RAW_HOURS)')
+    locations_parser.add_argument('--resolution', type=int, help='seconds per kept ping (default: LOCATION_TRAIL_RESOLUTION)')
+    locations_parser.add_argument('--days', type=int, help='retention in days (default: LOCATION_TRAIL_RETENTION_DAYS)')
+    
+    rollups_parser = subparsers.add_parser('backfill-rollups', help='rebuild per-event arrival rollups from registrations')
+    rollups_parser.add_argument('--chunk-size', type=int, default=200, help='events rebuilt per transaction (default: 200)')
+    
+    images_parser = subparsers.add_parser('prune-images', help='finish interrupted image renders and delete unused images')
+    images_parser.add_argument('--hours', type=int, default=24, help='keep unused images this long (default: 24)')
+    phones_parser = subparsers.add_parser('normalize-phones', help='store phone numbers as digits only')
+    phones_parser.add_argument('--chunk-size', type=int, default=1000, help='users per transaction (default: 1000)')
+    
+    args = parser.parse_args()
+    
+    from political_events import create_app
+    app = create_app()
+    if args.command == 'purge-notifications':
+        run_purge_notifications(app, args)
+    elif args.command == 'purge-drafts':
+        run_purge_drafts(app, args)
+    elif args.command == 'archive-events':
+        run_archive_events(app, args)
+    elif args.command == 'purge-join-keys':
+        run_purge_join_keys(app, args)
+    elif args.command == 'purge-sessions':
+        run_purge_sessions(app, args)
+    elif args.command == 'compact-locations':
+        run_compact_locations(app, args)
+    elif args.command == 'backfill-rollups':
+        run_backfill_rollups(app, args)
+    elif args.command == 'prune-images':
+        run_prune_images(app, args)
+    elif args.command == 'normalize-phones':
+        run_normalize_phones(app, args)
+
+if __name__ == '__main__':
+    main()
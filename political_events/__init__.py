@@ -0,0 +1,55 @@
+"""
+Political Events Platform application package.
+
+Use create_app() to build a configured Flask application.  Heavy optional
+dependencies (qrcode/Pillow, Flask-SocketIO) are imported on first use so a
+cold worker can bind its port as quickly as possible.
+"""
+
+import os
+
+from flask import Flask
+
+from config import get_config
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(config_class=None, realtime=None):
+    """
+    Application factory.
+
+    config_class defaults to config.get_config() (selected by FLASK_ENV).
+    realtime enables the Socket.IO layer; when None it follows the
+    REALTIME_ENABLED config value.
+    """
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(PROJECT_ROOT, 'templates'),
+        instance_path=os.path.join(PROJECT_ROOT, 'instance'),
+    )
+    app.config.from_object(config_class or get_config())
+    
+    from political_events.extensions import db, login_manager
+    from political_events.extensions import realtime as realtime_ext
+    from political_events.extensions import instrumentation
+    from political_events import models  # noqa: F401  (registers the user loader)
+    from political_events import views, query_guard, sessions
+    from political_events.serializers import JSONProvider
+    
+    app.json = JSONProvider(app)  # orjson when installed, see JSON_BACKEND
+    db.init_app(app)
+    login_manager.init_app(app)
+    sessions.init_app(app)
+    if app.config.get('INSTRUMENTATION_ENABLED', False):
+        # Before the views so its timer wraps their before/after_request hooks
+        instrumentation.init_app(app)
+    query_guard.init_app(app)  # only registers anything in development and tests
+    views.init_app(app)
+    
+    if realtime is None:
+        realtime = app.config.get('REALTIME_ENABLED', False)
+    if realtime:
+        realtime_ext.init_app(app)
+    
+    return app
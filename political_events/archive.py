@@ -0,0 +1,146 @@
+"""
+Event archival.
+
+Events that ended more than ARCHIVE_AFTER_DAYS ago are moved, together
+with their registrations, into archived_event / archived_registration,
+and a per-event attendance summary is written to event_summary.  Each
+chunk of events is copied with INSERT ... SELECT and removed from the hot
+tables in one transaction, so the event and event_registration tables
+(and their indexes) only hold current data.  Seat limits, waitlists,
+invitation jobs, arrival rollups and image links of archived events are
+dropped, as are their registration revisions (unused images then go with
+prune_images()).  Event and
+registration ids are AUTOINCREMENT on SQLite, so a new event never takes
+an archived one's id; bootstrap() rebuilds the tables of databases created
+before that and starts their sequences past the archived ids.
+
+The event_history and registration_history views union hot and archived
+rows for reporting; the app itself only reads archived rows through the
+read-only archive pages.
+"""
+
+from datetime import datetime, timedelta
+
+from political_events import images
+from political_events.checkin import event_owners, event_rosters
+from political_events.extensions import db
+from political_events.models import (
+    Event, EventRegistration, ArchivedEvent, ArchivedRegistration, EventSummary, InvitationJob,
+    EventCapacity, WaitlistEntry, EventActivityRollup, EventRevision,
+)
+
+HISTORY_VIEWS = {
+    'event_history': (Event, ArchivedEvent),
+    'registration_history': (EventRegistration, ArchivedRegistration),
+}
+
+
+def ensure_history_views():
+    """(Re)create the read-only views that union hot and archived rows"""
+    engine = db.engine
+    with engine.begin() as conn:
+        for name, (hot, archived) in HISTORY_VIEWS.items():
+            columns = ', '.join(column.name for column in hot.__table__.columns)
+            body = (f'SELECT {columns}, 0 AS archived FROM {hot.__tablename__} '
+                    f'UNION ALL SELECT {columns}, 1 AS archived FROM {archived.__tablename__}')
+            if engine.dialect.name == 'sqlite':
+                conn.execute(db.text(f'DROP VIEW IF EXISTS {name}'))
+                conn.execute(db.text(f'CREATE VIEW {name} AS {body}'))
+            else:
+                conn.execute(db.text(f'CREATE OR REPLACE VIEW {name} AS {body}'))
+
+
+def _archive_chunk(event_ids, now):
+    event_columns = [column.name for column in Event.__table__.columns]
+    db.session.execute(
+        db.insert(ArchivedEvent).from_select(
+            event_columns + ['archived_at'],
+            db.select(*Event.__table__.columns, db.literal(now)).where(Event.id.in_(event_ids)),
+        )
+    )
+    
+    attended = db.case((EventRegistration.attended.is_(True), 1), else_=0)
+    db.session.execute(
+        db.insert(EventSummary).from_select(
+            ['event_id', 'party_id', 'title', 'location', 'event_date', 'registrations', 'attendees',
+             'first_registered_at', 'last_registered_at', 'last_checkin_at', 'archived_at'],
+            db.select(
+                Event.id, Event.party_id, Event.title, Event.location, Event.event_date,
+                db.func.count(EventRegistration.id),
+                db.func.coalesce(db.func.sum(attended), 0),
+                db.func.min(EventRegistration.registered_at),
+                db.func.max(EventRegistration.registered_at),
+                db.func.max(EventRegistration.qr_scanned_at),
+                db.literal(now),
+            )
+            .outerjoin(EventRegistration, EventRegistration.event_id == Event.id)
+            .where(Event.id.in_(event_ids))
+            .group_by(Event.id, Event.party_id, Event.title, Event.location, Event.event_date)
+        )
+    )
+    
+    registration_columns = [column.name for column in EventRegistration.__table__.columns]
+    db.session.execute(
+        db.insert(ArchivedRegistration).from_select(
+            registration_columns,
+            db.select(*EventRegistration.__table__.columns).where(EventRegistration.event_id.in_(event_ids)),
+        )
+    )
+    
+    moved = db.session.execute(
+        db.delete(EventRegistration).where(EventRegistration.event_id.in_(event_ids)),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    for model in (InvitationJob, EventCapacity, WaitlistEntry, EventActivityRollup, EventRevision):
+        db.session.execute(db.delete(model).where(model.event_id.in_(event_ids)),
+                           execution_options={'synchronize_session': False})
+    images.unlink_events(event_ids)
+    db.session.execute(db.delete(Event).where(Event.id.in_(event_ids)),
+                       execution_options={'synchronize_session': False})
+    event_owners.invalidate(event_ids)
+    event_rosters.invalidate(event_ids)
+    return moved
+
+
+def archive_events(older_than_days=90, chunk_size=200):
+    """
+    Archive events whose date is more than older_than_days in the past,
+    chunk_size events per transaction.  Returns {'events', 'registrations'} moved.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    totals = {'events': 0, 'registrations': 0}
+    while True:
+        event_ids = db.session.execute(
+            db.select(Event.id).where(Event.event_date < cutoff).order_by(Event.id).limit(chunk_size)
+        ).scalars().all()
+        if not event_ids:
+            break
+        try:
+            totals['registrations'] += _archive_chunk(event_ids, datetime.utcnow())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        totals['events'] += len(event_ids)
+    return totals
+
+
+def summary_query(party_id=None):
+    """select() of EventSummary rows, optionally for one party"""
+    query = db.select(EventSummary)
+    if party_id is not None:
+        query = query.where(EventSummary.party_id == party_id)
+    return query
+
+
+def summary_totals(party_id=None):
+    """Lifetime totals over archived events: events, registrations, attendees"""
+    query = db.select(
+        db.func.count(EventSummary.event_id),
+        db.func.coalesce(db.func.sum(EventSummary.registrations), 0),
+        db.func.coalesce(db.func.sum(EventSummary.attendees), 0),
+    )
+    if party_id is not None:
+        query = query.where(EventSummary.party_id == party_id)
+    events, registrations, attendees = db.session.execute(query).one()
+    return {'events': events, 'registrations': registrations, 'attendees': attendees}
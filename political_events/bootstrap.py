@@ -0,0 +1,216 @@
+"""
+Idempotent, versioned database bootstrap.
+
+The applied schema fingerprint and seed version are stored in the
+bootstrap_state table.  A deploy whose models and demo data are unchanged
+costs one SELECT; otherwise tables (plus the ticket search index and the
+archive history views) are created and only the missing demo accounts are
+inserted, with their password hashes computed concurrently.
+
+create_all() never alters a table that already exists, so on SQLite the
+tables declared sqlite_autoincrement that an older version created without
+it are rebuilt, and their sequences are moved past every id the archive
+tables hold; otherwise SQLite would hand an archived event's id to the
+next new event.
+"""
+
+import hashlib
+
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateTable
+
+from political_events.extensions import db
+from political_events.helpers import hash_passwords
+from political_events.models import User, BootstrapState
+from political_events.archive import HISTORY_VIEWS, ensure_history_views
+from political_events.registrations import remove_duplicate_registrations
+from political_events.tickets import ensure_search_index
+
+# Bump when DEMO_ACCOUNTS (or any other seed data) changes
+SEED_VERSION = '1'
+
+DEMO_ACCOUNTS = [
+    {'email': 'admin@political.com', 'phone': '1234567890', 'password': 'admin123', 'role': 'admin'},
+    {'email': 'party@demo.com', 'phone': '9876543210', 'password': 'party123', 'role': 'party',
+     'party_name': 'Demo Political Party'},
+    {'email': 'user@demo.com', 'phone': '5555555555', 'password': 'user123', 'role': 'user'},
+]
+
+
+def schema_fingerprint(metadata=None):
+    """Hash of every table, column and index name so model changes are detected without manual bumps"""
+    metadata = metadata if metadata is not None else db.metadata
+    parts = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(f'{table.name}.{column.name}:{column.type}' for column in table.columns)
+        parts.extend(f'{table.name}#{index.name}' for index in sorted(table.indexes, key=lambda i: i.name or ''))
+        if table.dialect_options['sqlite']['autoincrement']:
+            parts.append(f'{table.name}:autoincrement')
+    return hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+
+
+def read_state():
+    """Return the stored bootstrap state as a dict, or None when the table does not exist yet"""
+    try:
+        rows = db.session.execute(db.select(BootstrapState.key, BootstrapState.value)).all()
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+    return dict(rows)
+
+
+def _write_state(values):
+    for key, value in values.items():
+        db.session.merge(BootstrapState(key=key, value=value))
+
+
+def create_missing_indexes(metadata=None):
+    """create_all() skips indexes on tables that already exist; add any that are missing"""
+    metadata = metadata if metadata is not None else db.metadata
+    for table in metadata.tables.values():
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+def _autoincrement_tables(metadata):
+    return [table for table in metadata.sorted_tables if table.dialect_options['sqlite']['autoincrement']]
+
+
+def _rebuild_with_autoincrement(conn, table):
+    """Copy table into a new one created from its model (so with AUTOINCREMENT) and swap them"""
+    existing = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table.name})')}
+    staging = f'{table.name}__rebuild'
+    create = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.exec_driver_sql(f'DROP TABLE IF EXISTS {staging}')
+    conn.exec_driver_sql(create.replace(f'CREATE TABLE {table.name} ', f'CREATE TABLE {staging} ', 1))
+    
+    columns = [column for column in table.columns if column.name in existing]
+    # Older tables allowed NULL in columns the models now declare NOT NULL
+    values = [f'COALESCE({column.name}, CURRENT_TIMESTAMP)'
+              if not column.nullable and isinstance(column.type, db.DateTime) else column.name
+              for column in columns]
+    names = ', '.join(column.name for column in columns)
+    conn.exec_driver_sql(f'INSERT INTO {staging} ({names}) SELECT {", ".join(values)} FROM {table.name}')
+    conn.exec_driver_sql(f'DROP TABLE {table.name}')
+    conn.exec_driver_sql(f'ALTER TABLE {staging} RENAME TO {table.name}')
+    for index in table.indexes:
+        index.create(conn)
+
+
+def _advance_sequence(conn, table, archived):
+    """Start table's AUTOINCREMENT sequence past its own and its archive table's highest id"""
+    high = max(conn.exec_driver_sql(f'SELECT COALESCE(MAX(id), 0) FROM {name}').scalar()
+               for name in filter(None, (table.name, archived)))
+    seq = conn.execute(db.text('SELECT seq FROM sqlite_sequence WHERE name = :name'), {'name': table.name}).scalar()
+    if seq is None:
+        conn.execute(db.text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)'),
+                     {'name': table.name, 'seq': high})
+    elif seq < high:
+        conn.execute(db.text('UPDATE sqlite_sequence SET seq = :seq WHERE name = :name'),
+                     {'name': table.name, 'seq': high})
+
+
+def ensure_autoincrement(metadata=None):
+    """
+    On SQLite, rebuild the sqlite_autoincrement tables that were created
+    without AUTOINCREMENT and advance their sequences past the archived
+    ids.  Returns the names of the rebuilt tables.
+    """
+    metadata = metadata if metadata is not None else db.metadata
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return []
+    archives = {hot.__tablename__: archived.__tablename__ for hot, archived in HISTORY_VIEWS.values()}
+    
+    rebuilt = []
+    with engine.connect() as conn:
+        # DROP TABLE would otherwise delete the referencing rows; the pragma is ignored inside a transaction
+        foreign_keys = conn.exec_driver_sql('PRAGMA foreign_keys').scalar()
+        conn.exec_driver_sql('PRAGMA foreign_keys = OFF')
+        conn.commit()
+        try:
+            conn.exec_driver_sql('BEGIN')  # pysqlite would run the DDL outside the transaction
+            for table in _autoincrement_tables(metadata):
+                sql = conn.execute(
+                    db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {'name': table.name},
+                ).scalar()
+                if sql is not None and 'AUTOINCREMENT' not in sql.upper():
+                    if not rebuilt:
+                        # ALTER TABLE ... RENAME fails while a view names a dropped table
+                        for name in HISTORY_VIEWS:
+                            conn.exec_driver_sql(f'DROP VIEW IF EXISTS {name}')
+                    _rebuild_with_autoincrement(conn, table)
+                    rebuilt.append(table.name)
+                if sql is not None:
+                    _advance_sequence(conn, table, archives.get(table.name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql(f'PRAGMA foreign_keys = {int(foreign_keys)}')
+            conn.commit()
+    
+    if rebuilt:
+        ensure_history_views()
+    return rebuilt
+
+
+def seed_demo_accounts(accounts=DEMO_ACCOUNTS, max_workers=None):
+    """Insert the demo accounts whose role has no user yet; returns the created emails"""
+    roles = {account['role'] for account in accounts}
+    existing_roles = set(db.session.execute(
+        db.select(User.role).where(User.role.in_(roles)).distinct()
+    ).scalars())
+    missing = [account for account in accounts if account['role'] not in existing_roles]
+    if not missing:
+        return []
+    
+    hashes = hash_passwords([account['password'] for account in missing], max_workers)
+    
+    db.session.execute(db.insert(User), [
+        {
+            'email': account['email'],
+            'phone': account.get('phone'),
+            'password_hash': password_hash,
+            'role': account['role'],
+            'party_name': account.get('party_name'),
+        }
+        for account, password_hash in zip(missing, hashes)
+    ])
+    return [account['email'] for account in missing]
+
+
+def bootstrap(force=False):
+    """
+    Bring the database up to the current schema and seed version.
+    Must be called inside an application context.
+
+    Returns a dict describing what was done; 'skipped' is True when the
+    stored versions already matched.
+    """
+    fingerprint = schema_fingerprint()
+    state = read_state()
+    if not force and state and state.get('schema') == fingerprint and state.get('seed') == SEED_VERSION:
+        return {'skipped': True, 'created_tables': False, 'seeded': []}
+    
+    created_tables = force or state is None or state.get('schema') != fingerprint
+    if created_tables:
+        db.create_all()
+        # The unique registration index cannot be built over existing duplicates
+        remove_duplicate_registrations()
+        db.session.commit()
+        ensure_autoincrement()
+        create_missing_indexes()
+        ensure_search_index()
+        ensure_history_views()
+    
+    seeded = []
+    if force or not state or state.get('seed') != SEED_VERSION:
+        seeded = seed_demo_accounts()
+    
+    _write_state({'schema': fingerprint, 'seed': SEED_VERSION})
+    db.session.commit()
+    return {'skipped': False, 'created_tables': created_tables, 'seeded': seeded}
@@ -0,0 +1,322 @@
+"""
+Signed per-registration check-in tokens and batched attendance recording.
+
+A token is 'v2.<registration>.<event>.<user>.<expires>.<signature>' where
+the signature is a truncated HMAC-SHA256 of the rest under a key derived
+from SECRET_KEY (or CHECKIN_TOKEN_SECRET) and expires is a Unix time
+CHECKIN_TOKEN_VALID_HOURS after the event starts.  Scanners verify tokens
+in memory with a constant-time comparison; tokens are deterministic, so an
+attendee's QR code can be regenerated at any time and works offline.
+A scan then looks the registration up in the event's roster, an
+in-process cache of its registration ids and attendance loaded with one
+query and kept for ROSTER_TTL seconds; only a registration the roster does
+not know (one made since it was loaded) sends the scan to the database.
+Cancellations and archiving take registrations out of the roster at once
+in this process, and reach other processes when their copy expires.
+
+Accepted scans are appended to an in-process queue and written to
+EventRegistration in batches by a background flusher: one SELECT and one
+executemany UPDATE per batch, plus the arrival rollups, with only the
+first scan of a registration counted.  A slow database delays the write,
+not the line at the door.
+Pending scans are flushed at interpreter exit; a crash loses at most one
+flush interval, and the attendee's token still verifies on a re-scan.
+"""
+
+import base64
+import atexit
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timedelta
+
+from political_events import revisions, rollups
+from political_events.extensions import db
+from political_events.models import Event, EventRegistration
+from political_events.sessions import LRUCache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION = 'v2'
+SIGNATURE_BYTES = 16
+OWNER_CACHE_SIZE = 10000
+OWNER_TTL = 300  # seconds; archiving in another process is picked up within this
+ROSTER_CACHE_SIZE = 200  # events
+ROSTER_TTL = 60  # seconds; cancellations and check-ins in other processes are picked up within this
+
+CheckinClaim = namedtuple('CheckinClaim', 'registration_id event_id user_id expires_at')
+
+# derived key -> HMAC object primed with it, copied per signature
+_signers = {}
+_signers_lock = threading.Lock()
+
+
+def _signer(config):
+    secret = config.get('CHECKIN_TOKEN_SECRET') or config['SECRET_KEY']
+    signer = _signers.get(secret)
+    if signer is None:
+        key = hmac.new(secret.encode(), b'checkin-token', hashlib.sha256).digest()
+        signer = hmac.new(key, digestmod=hashlib.sha256)
+        with _signers_lock:
+            _signers[secret] = signer
+    return signer
+
+
+def _signature(config, payload):
+    mac = _signer(config).copy()
+    mac.update(payload.encode())
+    return base64.urlsafe_b64encode(mac.digest()[:SIGNATURE_BYTES]).rstrip(b'=').decode()
+
+
+def token_expiry(config, event_date):
+    """The Unix time a check-in token for an event on event_date stops verifying"""
+    expires = event_date + timedelta(hours=config['CHECKIN_TOKEN_VALID_HOURS'])
+    return int((expires - datetime(1970, 1, 1)).total_seconds())
+
+
+def make_token(config, registration_id, event_id, user_id, expires_at):
+    payload = f'{TOKEN_VERSION}.{registration_id}.{event_id}.{user_id}.{expires_at}'
+    return f'{payload}.{_signature(config, payload)}'
+
+
+def verify_token(config, token):
+    """Return the CheckinClaim for a genuine token (expired or not), or None"""
+    if not isinstance(token, str) or len(token) > 200:
+        return None
+    payload, _, signature = token.strip().rpartition('.')
+    parts = payload.split('.')
+    if len(parts) != 5 or parts[0] != TOKEN_VERSION:
+        return None
+    if not hmac.compare_digest(signature, _signature(config, payload)):
+        return None
+    try:
+        return CheckinClaim(int(parts[1]), int(parts[2]), int(parts[3]), int(parts[4]))
+    except ValueError:
+        return None
+
+
+def is_expired(claim, now=None):
+    return claim.expires_at < (now if now is not None else time.time())
+
+
+def registration_state(claim):
+    """None if claim's registration no longer exists (cancelled or archived), else whether it attended"""
+    return event_rosters.state(claim)
+
+
+class EventOwners:
+    """
+    event id -> party id, cached for up to ttl seconds per event (at most
+    maxsize events) so scans mostly stay off the database.  Unknown events
+    are not cached.
+    """
+
+    def __init__(self, maxsize=OWNER_CACHE_SIZE, ttl=OWNER_TTL):
+        self.ttl = ttl
+        self._owners = LRUCache(maxsize)  # event id -> (party id, loaded at)
+
+    def get(self, event_id):
+        cached = self._owners.get(event_id)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        party_id = db.session.execute(db.select(Event.party_id).where(Event.id == event_id)).scalar()
+        if party_id is None:
+            self._owners.pop(event_id)
+        else:
+            self._owners.set(event_id, (party_id, time.monotonic()))
+        return party_id
+
+    def invalidate(self, event_ids):
+        for event_id in event_ids:
+            self._owners.pop(event_id)
+
+    def clear(self):
+        self._owners.clear()
+
+
+event_owners = EventOwners()
+
+
+class EventRosters:
+    """
+    event id -> {registration id: (user id, attended)}, cached for up to
+    ttl seconds per event (at most maxsize events).  A registration id
+    missing from a cached roster reloads it once; ids that are still
+    missing, or that this process cancelled, are remembered as gone.
+    """
+
+    def __init__(self, maxsize=ROSTER_CACHE_SIZE, ttl=ROSTER_TTL):
+        self.ttl = ttl
+        self._rosters = LRUCache(maxsize)  # event id -> (registrations, revoked ids, loaded at)
+        self._lock = threading.Lock()
+
+    def _load(self, event_id):
+        registrations = {
+            row.id: (row.user_id, bool(row.attended)) for row in db.session.execute(
+                db.select(EventRegistration.id, EventRegistration.user_id, EventRegistration.attended)
+                .where(EventRegistration.event_id == event_id)
+            )
+        }
+        roster = (registrations, set(), time.monotonic())
+        self._rosters.set(event_id, roster)
+        return roster
+
+    def state(self, claim):
+        """None if claim's registration is not on its event's roster, else whether it attended"""
+        roster = self._rosters.get(claim.event_id)
+        if roster is None or time.monotonic() - roster[2] >= self.ttl:
+            roster = self._load(claim.event_id)
+        elif claim.registration_id not in roster[0] and claim.registration_id not in roster[1]:
+            roster = self._load(claim.event_id)  # registered since the roster was loaded
+            if claim.registration_id not in roster[0]:
+                roster[1].add(claim.registration_id)  # ids are never reused, so it stays gone
+        entry = roster[0].get(claim.registration_id)
+        if entry is None or entry[0] != claim.user_id:
+            return None
+        return entry[1]
+
+    def revoke(self, event_id, registration_ids):
+        """Take cancelled registrations off a cached roster"""
+        roster = self._rosters.get(event_id)
+        if roster is None:
+            return
+        with self._lock:
+            for registration_id in registration_ids:
+                roster[0].pop(registration_id, None)
+                roster[1].add(registration_id)
+
+    def mark_attended(self, claims):
+        """Record written check-ins in the cached rosters"""
+        with self._lock:
+            for claim in claims:
+                roster = self._rosters.get(claim.event_id)
+                if roster is not None and claim.registration_id in roster[0]:
+                    roster[0][claim.registration_id] = (claim.user_id, True)
+
+    def invalidate(self, event_ids):
+        for event_id in event_ids:
+            self._rosters.pop(event_id)
+
+    def clear(self):
+        self._rosters.clear()
+
+
+event_rosters = EventRosters()
+
+
+class AttendanceQueue:
+    """Append-only queue of accepted scans, flushed to EventRegistration in batches"""
+
+    def __init__(self):
+        self._pending = deque()
+        self._seen = set()  # registration ids queued and not yet flushed
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._started = False
+        self._app = None
+
+    def append(self, claim, scanned_at=None):
+        """Queue a verified scan; returns False if it is already waiting to be written"""
+        with self._lock:
+            if claim.registration_id in self._seen:
+                return False
+            self._seen.add(claim.registration_id)
+            self._pending.append((claim, scanned_at or datetime.utcnow()))
+        return True
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self, batch_size=500):
+        """
+        Write up to batch_size queued scans; returns the registrations that
+        were newly marked attended as (claim, party_id) pairs.
+        """
+        with self._lock:
+            batch = [self._pending.popleft() for _ in range(min(batch_size, len(self._pending)))]
+        if not batch:
+            return []
+        
+        ids = [claim.registration_id for claim, _ in batch]
+        try:
+            fresh = set(db.session.execute(
+                db.select(EventRegistration.id)
+                .where(EventRegistration.id.in_(ids), EventRegistration.attended.is_not(True))
+            ).scalars())
+            rows = [{'reg_id': claim.registration_id, 'scanned_at': scanned_at}
+                    for claim, scanned_at in batch if claim.registration_id in fresh]
+            if rows:
+                table = EventRegistration.__table__
+                db.session.execute(
+                    table.update()
+                    .where(table.c.id == db.bindparam('reg_id'))
+                    .values(attended=True, qr_scanned_at=db.bindparam('scanned_at')),
+                    rows,
+                )
+                rollups.record([(claim.event_id, scanned_at, 0, 1) for claim, scanned_at in batch
+                                if claim.registration_id in fresh])
+                revisions.bump(claim.event_id for claim, _ in batch if claim.registration_id in fresh)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._pending.extendleft(reversed(batch))
+            raise
+        marked = [claim for claim, _ in batch if claim.registration_id in fresh]
+        event_rosters.mark_attended(marked)
+        with self._lock:
+            # Written now, so registration_state() reports any re-scan
+            self._seen.difference_update(ids)
+        return [(claim, event_owners.get(claim.event_id)) for claim in marked]
+
+    def start(self, app):
+        """Start the background flusher for app (once per process)"""
+        if self._started:
+            return
+        from political_events.jobs import run_in_background
+        
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._app = app
+        run_in_background(app, self._run,
+                          app.config['CHECKIN_FLUSH_INTERVAL'], app.config['CHECKIN_FLUSH_BATCH_SIZE'])
+        atexit.register(self._flush_at_exit)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self, interval, batch_size):
+        from political_events import live_stats
+        
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            while self._pending:
+                try:
+                    marked = self.flush(batch_size)
+                except Exception:
+                    logger.exception('Attendance flush failed; %d scans pending', len(self._pending))
+                    break
+                finally:
+                    db.session.remove()
+                for claim, party_id in marked:
+                    live_stats.attendance_marked(party_id, claim.user_id)
+
+    def _flush_at_exit(self):
+        if not self._pending or self._app is None:
+            return
+        with self._app.app_context():
+            while self._pending:
+                try:
+                    self.flush(len(self._pending))
+                except Exception:
+                    logger.exception('Could not flush %d pending check-ins at exit', len(self._pending))
+                    return
+
+
+attendance_queue = AttendanceQueue()
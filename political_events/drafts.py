@@ -0,0 +1,166 @@
+"""
+Server-side drafts for the create_event form.
+
+The browser sends only the fields that changed since its last successful
+save, debounced while the organizer types, so a save is a small PATCH and
+an unchanged form sends nothing.  Submitting promotes the stored draft to
+an Event without the form being uploaded again.  Drafts untouched for
+EVENT_DRAFT_TTL_HOURS are purged by maintenance.py.
+"""
+
+import json
+import secrets
+from datetime import datetime, timedelta
+
+from political_events.extensions import db
+from political_events.helpers import generate_qr_code
+from political_events.importer import validate_event_row
+from political_events.models import Event, EventDraft, EventCapacity
+
+DRAFT_FIELDS = ('title', 'description', 'location', 'latitude', 'longitude', 'event_date', 'capacity')
+MAX_FIELD_LENGTH = {'title': 200, 'location': 200, 'description': 10000}
+
+
+def _validate_changes(changes):
+    """Return the cleaned field changes, raising ValueError for anything unexpected"""
+    if not isinstance(changes, dict):
+        raise ValueError('changes must be an object')
+    unknown = set(changes) - set(DRAFT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown draft fields: {', '.join(sorted(unknown))}")
+    cleaned = {}
+    for field, value in changes.items():
+        if value is not None and not isinstance(value, (str, int, float)):
+            raise ValueError(f'{field} must be a string')
+        value = '' if value is None else str(value)
+        if len(value) > MAX_FIELD_LENGTH.get(field, 64):
+            raise ValueError(f'{field} is too long')
+        cleaned[field] = value
+    return cleaned
+
+
+def get_draft(draft_id, party_id, ttl_hours=None):
+    """The party's draft with this id, or None (also None once expired)"""
+    query = db.select(EventDraft).where(EventDraft.id == draft_id, EventDraft.party_id == party_id)
+    if ttl_hours:
+        query = query.where(EventDraft.updated_at >= datetime.utcnow() - timedelta(hours=ttl_hours))
+    return db.session.execute(query).scalar()
+
+
+def latest_draft(party_id, ttl_hours):
+    """The party's most recently edited live draft, for resuming the form"""
+    return db.session.execute(
+        db.select(EventDraft)
+        .where(EventDraft.party_id == party_id,
+               EventDraft.updated_at >= datetime.utcnow() - timedelta(hours=ttl_hours))
+        .order_by(EventDraft.updated_at.desc())
+        .limit(1)
+    ).scalar()
+
+
+def create_draft(party_id, changes=None):
+    """Start a draft, optionally with its first fields.  Commits."""
+    now = datetime.utcnow()
+    draft = EventDraft(
+        id=secrets.token_urlsafe(12),
+        party_id=party_id,
+        data=json.dumps(_validate_changes(changes or {})),
+        version=1,
+        created_at=now,
+        updated_at=now,
+    )
+    db.session.add(draft)
+    db.session.commit()
+    return draft
+
+
+def patch_draft(draft, changes):
+    """
+    Merge changed fields into a draft.  The row is only written when a
+    value actually differs.  Commits; returns True if anything changed.
+    """
+    changes = _validate_changes(changes)
+    data = json.loads(draft.data)
+    changed = {field: value for field, value in changes.items() if data.get(field, '') != value}
+    if not changed:
+        return False
+    data.update(changed)
+    draft.data = json.dumps(data)
+    draft.version += 1
+    draft.updated_at = datetime.utcnow()
+    db.session.commit()
+    return True
+
+
+def draft_fields(draft):
+    return json.loads(draft.data)
+
+
+def serialize_draft(draft):
+    return {
+        'id': draft.id,
+        'version': draft.version,
+        'fields': draft_fields(draft),
+        'updated_at': draft.updated_at.isoformat(),
+    }
+
+
+def promote_draft(draft, party, geocoder=None):
+    """
+    Validate a draft and turn it into an Event, deleting the draft.
+    Returns (event, errors); on errors nothing is written.  Commits.
+    """
+    fields = draft_fields(draft)
+    values, errors = validate_event_row(fields, datetime.utcnow())
+    capacity = None
+    if fields.get('capacity'):
+        try:
+            capacity = int(fields['capacity'])
+        except ValueError:
+            capacity = 0
+        if capacity < 1:
+            errors.append('capacity must be a positive number')
+    if not errors and values['latitude'] is None:
+        coordinates = geocoder.geocode(values['location']) if geocoder else None
+        if coordinates is None:
+            errors.append('Pick the event location on the map')
+        else:
+            values['latitude'], values['longitude'] = coordinates
+    if errors:
+        return None, errors
+    
+    event = Event(
+        title=values['title'],
+        description=values['description'],
+        party_name=party.party_name,
+        party_id=party.id,
+        location=values['location'],
+        latitude=values['latitude'],
+        longitude=values['longitude'],
+        event_date=values['event_date'],
+        qr_code=generate_qr_code(f"event_{datetime.utcnow().timestamp()}"),
+    )
+    db.session.add(event)
+    if capacity:
+        db.session.flush()
+        db.session.add(EventCapacity(event_id=event.id, capacity=capacity, reserved=0))
+    db.session.delete(draft)
+    db.session.commit()
+    return event, []
+
+
+def purge_expired_drafts(ttl_hours=72, chunk_size=1000):
+    """Delete drafts not edited within ttl_hours, chunk_size per transaction; returns rows deleted"""
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            db.select(EventDraft.id).where(EventDraft.updated_at < cutoff).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(db.delete(EventDraft).where(EventDraft.id.in_(ids)),
+                           execution_options={'synchronize_session': False})
+        db.session.commit()
+        deleted += len(ids)
+    return deleted
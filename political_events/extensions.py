@@ -0,0 +1,20 @@
+"""
+Flask extension instances shared across the application.
+They are created unbound and attached to an app inside create_app().
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager
+
+from political_events.instrumentation import Instrumentation
+from political_events.realtime import Realtime
+
+db = SQLAlchemy()
+login_manager = LoginManager()
+login_manager.login_view = 'login'
+
+# Optional Socket.IO layer; emits are no-ops until init_app() is called
+realtime = Realtime()
+
+# Optional request/query/template timing and /metrics; inert until init_app() is called
+instrumentation = Instrumentation()
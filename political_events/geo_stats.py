@@ -0,0 +1,138 @@
+"""
+Distance statistics of an event's registrants, computed with NumPy.
+
+The party pages used to loop over every registration in JavaScript to get
+distances from the venue, and the map page compared every pair of markers
+to find hotspots.  event_stats() loads an event's registration coordinates
+once into arrays and computes, without a Python-level loop over rows:
+
+- distance summary and percentiles (great-circle, in km)
+- a radial histogram of registrations and attendees in RINGS_KM rings
+- registrations per compass sector, by bearing from the venue
+- catchment radii holding CATCHMENT_SHARES of registrants, with area and density
+- hotspots: the busiest HOTSPOT_CELL_KM grid cells, with their centroid
+
+Results are cached per event in process memory and reused while the
+venue and the event's registration revision (political_events.revisions)
+are unchanged.
+"""
+
+import numpy as np
+
+from political_events import revisions
+from political_events.extensions import db
+from political_events.helpers import EARTH_RADIUS_KM
+from political_events.models import EventRegistration
+from political_events.sessions import LRUCache
+
+RINGS_KM = (0, 1, 2, 5, 10, 25, 50, 100)  # ring i is [RINGS_KM[i], RINGS_KM[i + 1]); the last is open-ended
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+CATCHMENT_SHARES = (0.5, 0.8, 0.95)
+SECTORS = ('N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW')
+HOTSPOT_CELL_KM = 1.0
+MAX_HOTSPOTS = 20
+NEARBY_KM = 5
+
+_cache = LRUCache(1000)  # event id -> ((revision, latitude, longitude), stats)
+
+
+def _load(event_id):
+    """(latitudes, longitudes, attended) arrays of event_id's registrations"""
+    rows = db.session.execute(
+        db.select(EventRegistration.latitude, EventRegistration.longitude, EventRegistration.attended)
+        .where(EventRegistration.event_id == event_id)
+    ).all()
+    table = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return table[:, 0], table[:, 1], table[:, 2] > 0
+
+
+def distances_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances from (latitude, longitude) to each point, in km"""
+    lat1, lng1 = np.radians(latitude), np.radians(longitude)
+    lat2, lng2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bearings_deg(latitude, longitude, latitudes, longitudes):
+    """Initial bearing from (latitude, longitude) to each point, degrees clockwise from north"""
+    lat1, lng1 = np.radians(latitude), np.radians(longitude)
+    lat2, dlng = np.radians(latitudes), np.radians(longitudes) - lng1
+    y = np.sin(dlng) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlng)
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def _hotspots(latitude, latitudes, longitudes):
+    """The busiest grid cells (two or more registrants), largest first"""
+    cell_lat = HOTSPOT_CELL_KM / 111.32
+    cell_lng = HOTSPOT_CELL_KM / max(111.32 * np.cos(np.radians(latitude)), 1e-6)
+    rows = np.floor(latitudes / cell_lat).astype(np.int64)
+    columns = np.floor(longitudes / cell_lng).astype(np.int64)
+    # One integer per cell; sorting those is far cheaper than np.unique(axis=0) on pairs
+    cells = (rows - rows.min()) * (columns.max() - columns.min() + 1) + (columns - columns.min())
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    sum_lat = np.bincount(inverse, weights=latitudes)
+    sum_lng = np.bincount(inverse, weights=longitudes)
+    busiest = [index for index in np.argsort(-counts, kind='stable')[:MAX_HOTSPOTS] if counts[index] >= 2]
+    return [{'latitude': round(float(sum_lat[index] / counts[index]), 6),
+             'longitude': round(float(sum_lng[index] / counts[index]), 6),
+             'count': int(counts[index])} for index in busiest]
+
+
+def compute(latitude, longitude, latitudes, longitudes, attended):
+    """Statistics of registrants at latitudes/longitudes around a venue at (latitude, longitude)"""
+    count = len(latitudes)
+    stats = {'registrations': count, 'attended': int(attended.sum())}
+    if not count:
+        stats.update(distance_km=None, rings=None, sectors=None, catchment=[], hotspots=[], nearby_km=NEARBY_KM, nearby=0)
+        return stats
+
+    distance = distances_km(latitude, longitude, latitudes, longitudes)
+    # One partial sort for the percentiles and the catchment radii together
+    values = np.percentile(distance, PERCENTILES + tuple(share * 100 for share in CATCHMENT_SHARES))
+    values, radii = values[:len(PERCENTILES)], values[len(PERCENTILES):]
+    stats['distance_km'] = {
+        'mean': round(float(distance.mean()), 3),
+        'std': round(float(distance.std()), 3),
+        'min': round(float(distance.min()), 3),
+        'max': round(float(distance.max()), 3),
+        'percentiles': {f'p{p}': round(float(value), 3) for p, value in zip(PERCENTILES, values)},
+        'attended_mean': round(float(distance[attended].mean()), 3) if attended.any() else None,
+        'absent_mean': round(float(distance[~attended].mean()), 3) if not attended.all() else None,
+    }
+
+    ring = np.searchsorted(RINGS_KM, distance, side='right') - 1
+    stats['rings'] = {
+        'edges_km': list(RINGS_KM),
+        'registrations': np.bincount(ring, minlength=len(RINGS_KM)).tolist(),
+        'attended': np.bincount(ring[attended], minlength=len(RINGS_KM)).tolist(),
+    }
+
+    sector = ((bearings_deg(latitude, longitude, latitudes, longitudes) + 22.5) // 45).astype(np.int64) % 8
+    stats['sectors'] = {'labels': list(SECTORS), 'registrations': np.bincount(sector, minlength=8).tolist()}
+
+    stats['catchment'] = []
+    for share, radius in zip(CATCHMENT_SHARES, radii):
+        area = float(np.pi * radius ** 2)
+        inside = int(np.count_nonzero(distance <= radius))
+        stats['catchment'].append({
+            'share': share, 'radius_km': round(float(radius), 3), 'area_km2': round(area, 3),
+            'density_per_km2': round(inside / area, 3) if area else None,
+        })
+
+    stats['nearby_km'] = NEARBY_KM
+    stats['nearby'] = int(np.count_nonzero(distance <= NEARBY_KM))
+    stats['hotspots'] = _hotspots(latitude, latitudes, longitudes)
+    return stats
+
+
+def event_stats(event):
+    """Statistics of event's registrants, from the cache while its registrations are unchanged"""
+    signature = (revisions.revision(event.id), event.latitude, event.longitude)
+    cached = _cache.get(event.id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    stats = {'event_id': event.id, **compute(event.latitude, event.longitude, *_load(event.id))}
+    _cache.set(event.id, (signature, stats))
+    return stats
@@ -0,0 +1,156 @@
+"""
+Pluggable geocoding for event locations.
+
+A geocoder turns free-text locations into (latitude, longitude) pairs in
+batches.  The default OfflineGeocoder needs no network access; real providers
+subclass Geocoder and are registered in GEOCODERS.  CachingGeocoder stores
+results in the geocode_cache table so each distinct location is resolved once.
+"""
+
+import csv
+import re
+
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db
+from political_events.models import GeocodeCache
+
+COORDINATE_PATTERN = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+# Small built-in gazetteer used by the offline stub
+DEFAULT_GAZETTEER = {
+    'new delhi': (28.6139, 77.2090),
+    'delhi': (28.7041, 77.1025),
+    'mumbai': (19.0760, 72.8777),
+    'bengaluru': (12.9716, 77.5946),
+    'bangalore': (12.9716, 77.5946),
+    'chennai': (13.0827, 80.2707),
+    'kolkata': (22.5726, 88.3639),
+    'hyderabad': (17.3850, 78.4867),
+    'pune': (18.5204, 73.8567),
+    'ahmedabad': (23.0225, 72.5714),
+    'jaipur': (26.9124, 75.7873),
+    'lucknow': (26.8467, 80.9462),
+}
+
+
+def normalize_location(location):
+    """Cache key for a location string"""
+    return ' '.join(location.lower().split())[:200]
+
+
+class Geocoder:
+    """Base class; subclasses implement geocode_many()"""
+    name = 'base'
+
+    def geocode(self, location):
+        return self.geocode_many([location]).get(location)
+
+    def geocode_many(self, locations):
+        """Return a dict mapping each resolvable location to (latitude, longitude)"""
+        raise NotImplementedError
+
+
+class OfflineGeocoder(Geocoder):
+    """
+    Network-free stand-in: accepts literal "lat, lng" strings and names from a
+    gazetteer (the built-in city list, optionally extended from a CSV file
+    with name,latitude,longitude columns).
+    """
+    name = 'offline'
+
+    def __init__(self, gazetteer_path=None):
+        self.gazetteer = dict(DEFAULT_GAZETTEER)
+        if gazetteer_path:
+            with open(gazetteer_path, newline='', encoding='utf-8') as fh:
+                for row in csv.DictReader(fh):
+                    self.gazetteer[normalize_location(row['name'])] = (float(row['latitude']), float(row['longitude']))
+
+    def geocode_many(self, locations):
+        results = {}
+        for location in locations:
+            match = COORDINATE_PATTERN.match(location)
+            if match:
+                results[location] = (float(match.group(1)), float(match.group(2)))
+                continue
+            key = normalize_location(location)
+            if key in self.gazetteer:
+                results[location] = self.gazetteer[key]
+                continue
+            # Fall back to the most specific comma-separated part ("Town Hall, Pune")
+            for part in reversed(key.split(',')):
+                part = part.strip()
+                if part in self.gazetteer:
+                    results[location] = self.gazetteer[part]
+                    break
+        return results
+
+
+class CachingGeocoder(Geocoder):
+    """Wraps another geocoder with an in-memory dict in front of the geocode_cache table"""
+
+    def __init__(self, geocoder):
+        self.geocoder = geocoder
+        self.name = geocoder.name
+        self._memory = {}
+
+    def geocode_many(self, locations):
+        keys = {location: normalize_location(location) for location in set(locations)}
+        pending = {key for key in keys.values() if key not in self._memory}
+        
+        if pending:
+            cached = db.session.execute(
+                db.select(GeocodeCache.location_key, GeocodeCache.latitude, GeocodeCache.longitude)
+                .where(GeocodeCache.location_key.in_(pending))
+            ).all()
+            for key, latitude, longitude in cached:
+                self._memory[key] = (latitude, longitude)
+                pending.discard(key)
+        
+        if pending:
+            # Ask the wrapped geocoder once per distinct location
+            originals = {}
+            for location, key in keys.items():
+                if key in pending:
+                    originals.setdefault(key, location)
+            resolved = self.geocoder.geocode_many(list(originals.values()))
+            new_rows = []
+            for key, location in originals.items():
+                if location in resolved:
+                    self._memory[key] = resolved[location]
+                    new_rows.append({
+                        'location_key': key,
+                        'latitude': resolved[location][0],
+                        'longitude': resolved[location][1],
+                        'provider': self.geocoder.name,
+                    })
+            if new_rows:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(db.insert(GeocodeCache), new_rows)
+                except IntegrityError:
+                    pass  # a concurrent import cached the same locations first
+        
+        return {location: self._memory[key] for location, key in keys.items() if key in self._memory}
+
+
+class GeocoderConfigError(RuntimeError):
+    """GEOCODER names no registered geocoder"""
+
+
+GEOCODERS = {
+    'offline': OfflineGeocoder,
+}
+
+
+def get_geocoder(config):
+    """Build the configured geocoder (GEOCODER / GEOCODER_GAZETTEER) wrapped in the local cache"""
+    name = config.get('GEOCODER', 'offline')
+    factory = GEOCODERS.get(name)
+    if factory is None:
+        raise GeocoderConfigError(f"Unknown GEOCODER '{name}'; expected one of: {', '.join(sorted(GEOCODERS))}")
+    if factory is OfflineGeocoder:
+        geocoder = factory(config.get('GEOCODER_GAZETTEER'))
+    else:
+        geocoder = factory()
+    return CachingGeocoder(geocoder)
@@ -0,0 +1,98 @@
+"""
+Validation, sanitisation and rendering helpers shared by the views.
+"""
+
+import io
+import base64
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from political_events import validation
+
+
+# Validation Functions (compiled versions in political_events.validation)
+def validate_email(email):
+    """Validate email format"""
+    return validation.is_email(email)
+
+def validate_phone(phone):
+    """Validate phone number format (10 digits)"""
+    return validation.is_phone(phone)
+
+def validate_password(password):
+    """Validate password strength"""
+    problem = validation.password_problem(password)
+    return (False, problem) if problem else (True, "Password is strong")
+
+def sanitize_input(text):
+    """Sanitize user input to prevent injection attacks"""
+    return validation.sanitize(text)
+
+def hash_passwords(passwords, max_workers=None):
+    """Hash many passwords concurrently, preserving order"""
+    passwords = list(passwords)
+    if len(passwords) <= 1:
+        return [generate_password_hash(password) for password in passwords]
+    # Werkzeug's scrypt/PBKDF2 run in hashlib's C code with the GIL released,
+    # so a thread pool spreads the work across cores
+    workers = min(max_workers or os.cpu_count() or 1, len(passwords))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(generate_password_hash, passwords))
+
+# Geography
+EARTH_RADIUS_KM = 6371.0
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle, for index-friendly prefilters"""
+    dlat = radius_km / 111.32
+    dlng = radius_km / max(111.32 * math.cos(math.radians(latitude)), 1e-6)
+    return latitude - dlat, latitude + dlat, max(longitude - dlng, -180.0), min(longitude + dlng, 180.0)
+
+# Custom Jinja2 filters
+def format_date(date_obj, format_str='%B %d, %Y'):
+    """Custom filter to format dates in templates"""
+    if date_obj is None:
+        return 'N/A'
+    try:
+        if hasattr(date_obj, 'strftime'):
+            return date_obj.strftime(format_str)
+        else:
+            return str(date_obj)
+    except Exception:
+        return str(date_obj)
+
+def format_datetime(date_obj, format_str='%B %d, %Y %I:%M %p'):
+    """Custom filter to format datetime in templates"""
+    if date_obj is None:
+        return 'N/A'
+    try:
+        if hasattr(date_obj, 'strftime'):
+            return date_obj.strftime(format_str)
+        else:
+            return str(date_obj)
+    except Exception:
+        return str(date_obj)
+
+# QR Codes
+def generate_qr_code(data):
+    """Render data as a QR code and return it as a base64-encoded PNG"""
+    # qrcode pulls in Pillow; import on first use to keep app startup cheap
+    import qrcode
+
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode()
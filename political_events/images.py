@@ -0,0 +1,368 @@
+"""
+Event images: streaming uploads, content-addressed storage and WebP variants.
+
+An upload is copied from the request in CHUNK_SIZE pieces straight into a
+temporary file under UPLOAD_FOLDER while its SHA-256 is computed, so memory
+use does not grow with the file (MAX_CONTENT_LENGTH still caps it).  The
+file is then stored by hash as images/<ab>/<hash>/original.<ext>, so the
+same picture uploaded twice, to one event or several, is kept once:
+image_blob has a row per stored file and event_image links events to
+blobs in display order.  Lists of events read covers() with one join
+instead of parsing a JSON column per event.
+
+Pillow renders a WebP of each VARIANTS size (longest side, never
+upscaled) in a process pool, off the request; image URLs point at the
+original until the variants are ready.  A URL names content that never
+changes, so files are served with a one-year immutable Cache-Control.
+
+prune_images() (`python maintenance.py prune-images`) renders variants a
+restart interrupted and deletes blobs that no event has used for the grace
+period, counted from unlinked_at, which is set when a blob loses its last
+link and cleared when it is linked again.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from flask import current_app, url_for
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db
+from political_events.models import EventImage, ImageBlob
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Pillow format -> (extension, content type) of the originals we accept
+FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'GIF': ('gif', 'image/gif'),
+    'WEBP': ('webp', 'image/webp'),
+}
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+VARIANTS = {'thumb': 320, 'medium': 960, 'large': 1920}  # longest side in pixels
+WEBP_QUALITY = 80
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+SHA256_PATTERN = re.compile(r'[0-9a-f]{64}')
+# Every name a stored file can have: the original and its variants
+FILE_NAMES = frozenset([f'original.{extension}' for extension, _ in FORMATS.values()]
+                       + [f'{name}.webp' for name in VARIANTS])
+RENDER_TIMEOUT = timedelta(minutes=10)  # a blob pending longer lost its render to a restart
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def storage_root(app):
+    """UPLOAD_FOLDER, relative to the instance folder unless absolute"""
+    folder = app.config['UPLOAD_FOLDER']
+    return folder if os.path.isabs(folder) else os.path.join(app.instance_path, folder)
+
+
+def blob_directory(root, sha256):
+    return os.path.join(root, 'images', sha256[:2], sha256)
+
+
+def receive(stream, root, max_bytes=None):
+    """
+    Copy stream into a temporary file under root, hashing it on the way.
+    Returns (path, sha256 hex digest, size); raises ValueError past max_bytes.
+    """
+    incoming = os.path.join(root, 'incoming')
+    os.makedirs(incoming, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    descriptor, path = tempfile.mkstemp(dir=incoming, suffix='.upload')
+    try:
+        with os.fdopen(descriptor, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise ValueError(f'Images may be at most {max_bytes // (1024 * 1024)} MB')
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    if not size:
+        os.unlink(path)
+        raise ValueError('The upload is empty')
+    return path, digest.hexdigest(), size
+
+
+def inspect(path, allowed_extensions):
+    """(extension, content type, width, height) of the image at path; raises ValueError"""
+    from PIL import Image  # Pillow is imported on first use, as for QR codes
+
+    try:
+        with Image.open(path) as image:
+            image_format, (width, height) = image.format, image.size
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValueError('The upload is not a readable image') from None
+    if image_format not in FORMATS:
+        raise ValueError(f'Unsupported image format {image_format}')
+    extension, content_type = FORMATS[image_format]
+    allowed = {EXTENSION_ALIASES.get(allowed, allowed) for allowed in allowed_extensions}
+    if extension not in allowed:
+        raise ValueError(f'{extension} images are not allowed')
+    return extension, content_type, width, height
+
+
+def render_variants(original, directory):
+    """Write a WebP of each VARIANTS size next to original; runs in a worker process"""
+    from PIL import Image, ImageOps
+
+    with Image.open(original) as image:
+        largest = max(VARIANTS.values())
+        image.draft('RGB', (largest, largest))  # JPEGs decode at a reduced scale when they can
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            transparent = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if transparent else 'RGB')
+        # Largest first, each resized from the previous one
+        for name, size in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+            image.thumbnail((size, size), Image.LANCZOS)
+            target = os.path.join(directory, f'{name}.webp')
+            partial = f'{target}.partial'
+            image.save(partial, 'WEBP', quality=WEBP_QUALITY, method=4)
+            os.replace(partial, target)
+
+
+def _executor(workers):
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def _reset_executor():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def render(sha256):
+    """Render sha256's variants (in the process pool unless IMAGE_WORKERS is 0) and record the outcome"""
+    blob = db.session.get(ImageBlob, sha256)
+    if blob is None or blob.status == 'ready':
+        return
+    directory = blob_directory(storage_root(current_app), sha256)
+    original = os.path.join(directory, f'original.{blob.extension}')
+    workers = current_app.config['IMAGE_WORKERS']
+    try:
+        if workers:
+            _executor(workers).submit(render_variants, original, directory).result()
+        else:
+            render_variants(original, directory)
+        blob.status = 'ready'
+    except BrokenProcessPool:
+        _reset_executor()  # a worker died (out of memory, killed); start a fresh pool next time
+        logger.exception('Image worker pool broke while rendering %s', sha256)
+        blob.status = 'failed'
+    except Exception:
+        logger.exception('Could not render variants of image %s', sha256)
+        blob.status = 'failed'
+    db.session.commit()
+
+
+def _store_blob(path, sha256, size, root, allowed_extensions):
+    """Move a received file into place as a new blob, unless that content is already stored"""
+    if db.session.get(ImageBlob, sha256) is not None:
+        return False
+    extension, content_type, width, height = inspect(path, allowed_extensions)
+    directory = blob_directory(root, sha256)
+    os.makedirs(directory, exist_ok=True)
+    os.replace(path, os.path.join(directory, f'original.{extension}'))
+    try:
+        with db.session.begin_nested():
+            db.session.add(ImageBlob(sha256=sha256, extension=extension, content_type=content_type, size=size,
+                                     width=width, height=height, status='pending'))
+    except IntegrityError:
+        return False  # the same file was stored by a concurrent upload
+    return True
+
+
+def add_event_image(event_id, user_id, stream, app):
+    """
+    Store an uploaded image from stream and append it to event_id's images.
+    Returns (EventImage, new_blob); the caller commits, then calls
+    schedule_render() for a new blob.  Raises ValueError for bad uploads.
+    """
+    root = storage_root(app)
+    path, sha256, size = receive(stream, root, app.config.get('MAX_CONTENT_LENGTH'))
+    try:
+        new_blob = _store_blob(path, sha256, size, root, app.config['ALLOWED_EXTENSIONS'])
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+    image = db.session.execute(
+        db.select(EventImage).where(EventImage.event_id == event_id, EventImage.sha256 == sha256)
+    ).scalar()
+    if image is None:
+        if not new_blob:
+            _relink(sha256)
+        position = db.session.execute(
+            db.select(db.func.coalesce(db.func.max(EventImage.position) + 1, 0)).where(EventImage.event_id == event_id)
+        ).scalar()
+        image = EventImage(event_id=event_id, sha256=sha256, position=position, uploaded_by=user_id)
+        db.session.add(image)
+        db.session.flush()
+    return image, new_blob
+
+
+def schedule_render(app, sha256):
+    """Render a new blob's variants in the background"""
+    from political_events.jobs import run_in_background
+
+    run_in_background(app, render, sha256)
+
+
+def _relink(sha256):
+    """Keep a blob that was unused from being pruned now that an event uses it again"""
+    db.session.execute(
+        db.update(ImageBlob).where(ImageBlob.sha256 == sha256, ImageBlob.unlinked_at.is_not(None))
+        .values(unlinked_at=None),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def _unlink(condition):
+    """
+    Delete the EventImage rows matching condition and stamp the blobs no
+    event uses any more; returns the rows deleted
+    """
+    # Synchronized, so a loaded EventImage leaves the identity map with its row
+    sha256s = db.session.execute(
+        db.delete(EventImage).where(condition).returning(EventImage.sha256)
+    ).scalars().all()
+    if sha256s:
+        db.session.execute(
+            db.update(ImageBlob)
+            .where(ImageBlob.sha256.in_(set(sha256s)), ImageBlob.sha256.not_in(db.select(EventImage.sha256)))
+            .values(unlinked_at=datetime.utcnow()),
+            execution_options={'synchronize_session': False},
+        )
+    return len(sha256s)
+
+
+def remove_event_image(event_id, image_id):
+    """Unlink an image from an event; the file goes with prune_images() once unused.  The caller commits"""
+    return _unlink(db.and_(EventImage.event_id == event_id, EventImage.id == image_id))
+
+
+def unlink_events(event_ids):
+    """Unlink every image of event_ids (when they are archived).  The caller commits"""
+    return _unlink(EventImage.event_id.in_(event_ids))
+
+
+def urls(sha256, extension, status):
+    """{'original': url, 'thumb': url, ...}; the variants are the original until rendered"""
+    original = url_for('image_file', sha256=sha256, name=f'original.{extension}')
+    if status != 'ready':
+        return {'original': original, **{name: original for name in VARIANTS}}
+    return {'original': original,
+            **{name: url_for('image_file', sha256=sha256, name=f'{name}.webp') for name in VARIANTS}}
+
+
+def _images():
+    return (db.select(EventImage.id, EventImage.event_id, EventImage.position, ImageBlob.sha256,
+                      ImageBlob.extension, ImageBlob.width, ImageBlob.height, ImageBlob.status)
+            .join(ImageBlob, ImageBlob.sha256 == EventImage.sha256))
+
+
+def _as_dict(row):
+    return {'id': row.id, 'position': row.position, 'width': row.width, 'height': row.height,
+            'status': row.status, 'urls': urls(row.sha256, row.extension, row.status)}
+
+
+def event_images(event_id):
+    """An event's images in display order, as dicts with their URLs"""
+    rows = db.session.execute(
+        _images().where(EventImage.event_id == event_id).order_by(EventImage.position, EventImage.id)
+    )
+    return [_as_dict(row) for row in rows]
+
+
+def covers(event_ids):
+    """{event_id: first image dict} for the events among event_ids that have images, in one query"""
+    if not event_ids:
+        return {}
+    rows = db.session.execute(
+        _images().where(EventImage.event_id.in_(event_ids))
+        .order_by(EventImage.event_id, EventImage.position, EventImage.id)
+    )
+    result = {}
+    for row in rows:
+        if row.event_id not in result:
+            result[row.event_id] = _as_dict(row)
+    return result
+
+
+def prune_images(grace_hours=24):
+    """
+    Render variants of blobs still pending after RENDER_TIMEOUT (their
+    render was interrupted), and delete blobs (rows and files) that no event
+    has used for grace_hours: since they were unlinked, or since they were
+    stored if no event ever used them.  Returns {'rendered', 'deleted'}.
+    """
+    root = storage_root(current_app)
+    now = datetime.utcnow()
+    stale = now - timedelta(hours=grace_hours)
+    done = {'rendered': 0, 'deleted': 0}
+
+    pending = db.session.execute(
+        db.select(ImageBlob.sha256).where(ImageBlob.status == 'pending', ImageBlob.created_at < now - RENDER_TIMEOUT)
+    ).scalars().all()
+    for sha256 in pending:
+        render(sha256)
+        done['rendered'] += 1
+
+    used = db.select(EventImage.sha256)
+    unused = db.session.execute(
+        db.select(ImageBlob.sha256)
+        .where(ImageBlob.sha256.not_in(used), db.func.coalesce(ImageBlob.unlinked_at, ImageBlob.created_at) < stale)
+    ).scalars().all()
+    for sha256 in unused:
+        try:
+            # Checked again in the DELETE, in case an upload reused the blob meanwhile
+            deleted = db.session.execute(
+                db.delete(ImageBlob).where(ImageBlob.sha256 == sha256, ImageBlob.sha256.not_in(used)),
+                execution_options={'synchronize_session': False},
+            ).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if deleted:
+            directory = blob_directory(root, sha256)
+            shutil.rmtree(directory, ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(directory))  # the two-character prefix directory, once empty
+            except OSError:
+                pass
+            done['deleted'] += 1
+
+    incoming = os.path.join(root, 'incoming')
+    if os.path.isdir(incoming):
+        for entry in os.scandir(incoming):  # uploads a crashed worker left behind
+            if datetime.utcfromtimestamp(entry.stat().st_mtime) < stale:
+                os.unlink(entry.path)
+    return done
@@ -0,0 +1,202 @@
+"""
+Bulk event import from CSV or JSON.
+
+Rows are read in a single streaming pass and validated a batch at a time
+with validation.EVENT_ROW.  Each batch is geocoded in one call, its QR codes
+are rendered (in a shared process pool when IMPORT_QR_WORKERS asks for one),
+and it is written with one multi-row INSERT
+and its own commit, so a bad batch never rolls back earlier ones.  Every
+rejected row is reported with its row number and field errors.
+
+Supported formats: CSV with a header row, JSON Lines (one object per line)
+and a JSON array (which json.load has to read in full).
+"""
+
+import io
+import itertools
+import json
+import os
+import csv
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from political_events.extensions import db
+from political_events.helpers import generate_qr_code
+from political_events.models import Event
+from political_events.validation import EVENT_ROW
+
+REQUIRED_FIELDS = ('title', 'description', 'location', 'event_date')
+FORMATS_BY_EXTENSION = {'.csv': 'csv', '.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ImportReport:
+    """Outcome of an import: created event ids and per-row errors"""
+
+    def __init__(self):
+        self.total = 0
+        self.created_ids = []
+        self.errors = []
+
+    def add_error(self, row_number, messages, fields=None):
+        error = {'row': row_number, 'errors': messages}
+        if fields:
+            error['fields'] = fields  # {field: [messages]} from validation
+        self.errors.append(error)
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'created': len(self.created_ids),
+            'failed': len(self.errors),
+            'event_ids': self.created_ids,
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+        }
+
+
+def detect_format(filename):
+    """Guess the import format from a file name, defaulting to CSV"""
+    return FORMATS_BY_EXTENSION.get(os.path.splitext(filename or '')[1].lower(), 'csv')
+
+
+def iter_records(stream, fmt):
+    """Yield (row_number, record) pairs from a text or binary stream"""
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(stream, 'mode', ''):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    
+    if fmt == 'csv':
+        # Row 1 is the header
+        for row_number, record in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, record
+    elif fmt == 'jsonl':
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as e:
+                yield row_number, e
+    elif fmt == 'json':
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError('JSON import must be an array of event objects')
+        for row_number, record in enumerate(records, start=1):
+            yield row_number, record
+    else:
+        raise ValueError(f'Unsupported import format: {fmt}')
+
+
+def chunks(items, size):
+    """Lists of up to size consecutive items"""
+    items = iter(items)
+    while chunk := list(itertools.islice(items, size)):
+        yield chunk
+
+
+def validate_event_row(record, now):
+    """Return (values, errors) for one import record; coordinates may be left for the geocoder"""
+    result = EVENT_ROW.validate(record, now=now)
+    return result.values, result.messages()
+
+
+def _iter_batches(records, report, batch_size, now):
+    for chunk in chunks(records, batch_size):
+        report.total += len(chunk)
+        results = EVENT_ROW.validate_many([record for _, record in chunk], now=now)
+        batch = []
+        for (row_number, _), result in zip(chunk, results):
+            if result.errors:
+                report.add_error(row_number, result.messages(), result.errors)
+            else:
+                batch.append((row_number, result.values))
+        if batch:
+            yield batch
+
+
+def _insert_batch(batch, party, geocoder, qr_map, report):
+    to_geocode = [values['location'] for _, values in batch if values['latitude'] is None]
+    coordinates = geocoder.geocode_many(to_geocode) if to_geocode and geocoder else {}
+    
+    ready = []
+    for row_number, values in batch:
+        if values['latitude'] is None:
+            if values['location'] not in coordinates:
+                report.add_error(row_number, [f"Could not geocode location '{values['location']}'"])
+                continue
+            values['latitude'], values['longitude'] = coordinates[values['location']]
+        ready.append((row_number, values))
+    if not ready:
+        db.session.commit()  # keep any geocode cache entries
+        return
+    
+    stamp = datetime.utcnow().timestamp()
+    payloads = [f'event_{stamp}_{row_number}' for row_number, _ in ready]
+    qr_codes = list(qr_map(generate_qr_code, payloads))
+    
+    rows = [{
+        'title': values['title'],
+        'description': values['description'],
+        'party_name': party.party_name,
+        'party_id': party.id,
+        'location': values['location'],
+        'latitude': values['latitude'],
+        'longitude': values['longitude'],
+        'event_date': values['event_date'],
+        'qr_code': qr_code,
+    } for (_, values), qr_code in zip(ready, qr_codes)]
+    
+    try:
+        ids = db.session.execute(db.insert(Event).returning(Event.id), rows).scalars().all()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for row_number, _ in ready:
+            report.add_error(row_number, [f'Database error: {e.__class__.__name__}'])
+        return
+    report.created_ids.extend(ids)
+
+
+def _executor(workers):
+    """The process pool shared by every import, started on first use with workers processes"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def _reset_executor():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def import_events(stream, fmt, party, geocoder=None, batch_size=500, qr_workers=0):
+    """
+    Import events for party from stream.  Must run inside an app context.
+
+    qr_workers > 1 renders QR codes in a process pool of that size, shared
+    with later imports; 0 or 1 (the default) renders them in this process.
+    """
+    report = ImportReport()
+    now = datetime.utcnow()
+    
+    if qr_workers and qr_workers > 1:
+        pool = _executor(qr_workers)
+        qr_map = lambda fn, items: pool.map(fn, items, chunksize=16)
+    else:
+        qr_map = map
+    try:
+        for batch in _iter_batches(iter_records(stream, fmt), report, batch_size, now):
+            _insert_batch(batch, party, geocoder, qr_map, report)
+    except BrokenProcessPool:
+        _reset_executor()  # a worker died; the next import starts a fresh pool
+        raise
+    return report
@@ -0,0 +1,301 @@
+"""
+Opt-in request instrumentation (INSTRUMENTATION_ENABLED).
+
+Every request is timed, and SQLAlchemy cursor events count the statements it
+runs, their total time and the slowest ones, keyed by endpoint.  Templates
+rendered with render_template() are timed through Flask's signals.  Each
+response carries a Server-Timing header (visible in browser dev tools), and
+the aggregates are served at /metrics in the Prometheus text format with
+latency histograms; /metrics/slow_queries lists the slowest statements per
+endpoint as JSON.  Both require METRICS_TOKEN as a bearer token when it is
+set and an admin session otherwise.
+
+With PROFILING_ENABLED an admin can add ?__profile=1 to any URL to run the
+request under the sampling profiler (political_events.profiler); the
+response is replaced by the report and the collapsed stacks are written to
+PROFILE_DIR.
+
+Nothing is registered unless init_app() is called, so the default
+deployment pays nothing for this module.
+"""
+
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from flask import (
+    current_app, g, has_app_context, request, jsonify, Response, before_render_template, template_rendered,
+)
+from flask_login import current_user
+from sqlalchemy import event
+
+from political_events.profiler import Sampler
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+MAX_STATEMENT_LENGTH = 500
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def exposition(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for label_values, (counts, total, count) in series:
+            labels = _format_labels(self.labels, label_values)
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+class Counters:
+    """Monotonic counters keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] += amount
+
+    def exposition(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f'{self.name}{{{_format_labels(self.labels, label_values)}}} {value:g}')
+        return lines
+
+
+class RequestStats:
+    """What one request spent; lives on flask.g for the request's duration."""
+
+    __slots__ = ('started', 'queries', 'db_time', 'slowest', 'rendering', 'templates', 'template_time', 'sampler')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = (0.0, None)
+        self.rendering = []
+        self.templates = []
+        self.template_time = 0.0
+        self.sampler = None
+
+
+class Instrumentation:
+    """Request, query and template timing with a Prometheus /metrics endpoint."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method'), LATENCY_BUCKETS)
+        self.requests = Counters('http_requests_total', 'Requests by endpoint and status.',
+                                 ('endpoint', 'method', 'status'))
+        self.query_latency = Histogram(
+            'db_query_duration_seconds', 'SQL statement latency by endpoint.', ('endpoint',), QUERY_BUCKETS)
+        self.queries_per_request = Histogram(
+            'db_queries_per_request', 'SQL statements per request by endpoint.', ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.db_time = Counters('db_time_seconds_total', 'Time spent in SQL by endpoint.', ('endpoint',))
+        self.template_latency = Histogram(
+            'template_render_duration_seconds', 'Template render time.', ('template',), LATENCY_BUCKETS)
+        self._slowest = defaultdict(dict)  # endpoint -> {statement: worst seconds}
+        self._slow_lock = threading.Lock()
+        self.slow_query_limit = 10
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = True
+        self.slow_query_limit = app.config.get('INSTRUMENTATION_SLOW_QUERIES', 10)
+        self.slow_request_seconds = app.config.get('INSTRUMENTATION_SLOW_REQUEST_MS', 1000) / 1000
+        self.profiling = app.config.get('PROFILING_ENABLED', False)
+        self.profile_dir = app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        with app.app_context():
+            for engine in app.extensions['sqlalchemy'].engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor)
+
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        app.add_url_rule('/metrics/slow_queries', 'slow_queries', self.slow_queries_view)
+        app.extensions['instrumentation'] = self
+        return self
+
+    # Hooks
+
+    def _before_request(self):
+        stats = g._request_stats = RequestStats()
+        if self.profiling and request.args.get('__profile') and \
+                current_user.is_authenticated and current_user.role == 'admin':
+            stats.sampler = Sampler().start()
+
+    def _after_request(self, response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.started
+        endpoint = request.endpoint or 'unmatched'
+
+        self.request_latency.observe((endpoint, request.method), elapsed)
+        self.requests.inc((endpoint, request.method, str(response.status_code)))
+        self.queries_per_request.observe((endpoint,), stats.queries)
+        if stats.queries:
+            self.db_time.inc((endpoint,), stats.db_time)
+        if stats.slowest[1] is not None:
+            self._record_slow(endpoint, *stats.slowest)
+
+        timing = [f'app;dur={elapsed * 1000:.1f}', f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"']
+        if stats.templates:
+            timing.append(f'tpl;dur={stats.template_time * 1000:.1f}')
+        response.headers['Server-Timing'] = ', '.join(timing)
+
+        if elapsed >= self.slow_request_seconds:
+            logger.warning('Slow request %s %s: %.0f ms, %d queries (%.0f ms), templates %s', request.method,
+                           request.path, elapsed * 1000, stats.queries, stats.db_time * 1000, stats.templates)
+
+        if stats.sampler is not None:
+            return self._profile_response(stats.sampler.stop(), endpoint)
+        return response
+
+    def _before_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        if has_app_context() and '_request_stats' in g:
+            conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_started')
+        if not started or not has_app_context():
+            return
+        stats = g.get('_request_stats')
+        if stats is None:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        stats.queries += 1
+        stats.db_time += elapsed
+        if elapsed > stats.slowest[0]:
+            stats.slowest = (elapsed, statement)
+        self.query_latency.observe((request.endpoint or 'unmatched',), elapsed)
+
+    def _before_render(self, app, template, context, **extra):
+        stats = g.get('_request_stats')
+        if stats is not None:
+            stats.rendering.append(time.perf_counter())
+
+    def _after_render(self, app, template, context, **extra):
+        stats = g.get('_request_stats')
+        if stats is None or not stats.rendering:
+            return
+        elapsed = time.perf_counter() - stats.rendering.pop()
+        stats.templates.append(template.name)
+        stats.template_time += elapsed
+        self.template_latency.observe((template.name,), elapsed)
+
+    def _record_slow(self, endpoint, seconds, statement):
+        statement = ' '.join(statement.split())[:MAX_STATEMENT_LENGTH]
+        with self._slow_lock:
+            worst = self._slowest[endpoint]
+            if seconds > worst.get(statement, 0.0):
+                worst[statement] = seconds
+                if len(worst) > 2 * self.slow_query_limit:
+                    keep = sorted(worst.items(), key=lambda item: item[1], reverse=True)[:self.slow_query_limit]
+                    self._slowest[endpoint] = dict(keep)
+
+    # Reports
+
+    def _profile_response(self, sampler, endpoint):
+        report = sampler.report(f'{request.method} {request.full_path} ({endpoint})')
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{endpoint}.folded')
+            with open(path, 'w') as fh:
+                fh.write(sampler.collapsed() + '\n')
+        except OSError:
+            logger.exception('Could not write profile for %s', endpoint)
+        return Response(report, mimetype='text/plain')
+
+    def slow_queries(self):
+        """{endpoint: [{'ms': ..., 'statement': ...}, ...]} slowest first"""
+        with self._slow_lock:
+            snapshot = {endpoint: list(worst.items()) for endpoint, worst in self._slowest.items()}
+        return {
+            endpoint: [
+                {'ms': round(seconds * 1000, 3), 'statement': statement}
+                for statement, seconds in sorted(entries, key=lambda item: item[1], reverse=True)[:self.slow_query_limit]
+            ]
+            for endpoint, entries in sorted(snapshot.items())
+        }
+
+    def exposition(self):
+        lines = []
+        for metric in (self.request_latency, self.requests, self.queries_per_request, self.query_latency,
+                       self.db_time, self.template_latency):
+            lines.extend(metric.exposition())
+        return '\n'.join(lines) + '\n'
+
+    def _authorized(self):
+        token = current_app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            return hmac.compare_digest(supplied.encode(), token.encode())
+        return current_user.is_authenticated and current_user.role == 'admin'
+
+    def metrics_view(self):
+        if not self._authorized():
+            return jsonify({'error': 'Access denied'}), 403
+        return Response(self.exposition(), mimetype='text/plain; version=0.0.4')
+
+    def slow_queries_view(self):
+        if not self._authorized():
+            return jsonify({'error': 'Access denied'}), 403
+        return jsonify(self.slow_queries())
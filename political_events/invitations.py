@@ -0,0 +1,138 @@
+"""
+Bulk event invitations delivered through the Notification table.
+
+The audience is resolved with set-based queries and walked in user-id order
+with keyset batches.  Each batch is one multi-row INSERT into notification
+and its own short transaction (unread counters are bumped in the same one),
+so a 200k-user fan-out never holds a long write lock.  Connected recipients
+get a real-time notice in their personal room and the party sees progress
+updates.  Jobs run in the background
+(political_events.jobs) and their state lives in InvitationJob.
+"""
+
+import logging
+from datetime import datetime
+
+from political_events.extensions import db, realtime
+from political_events.helpers import haversine_km, bounding_box
+from political_events.models import (
+    User, Event, EventRegistration, ArchivedEvent, ArchivedRegistration, InvitationJob,
+)
+from political_events.notifications import create_notifications, push_to_users
+
+logger = logging.getLogger(__name__)
+
+AUDIENCES = ('past_registrants', 'radius')
+MAX_RADIUS_KM = 500
+
+
+def audience_query(job, event):
+    """
+    Core select whose first column is the candidate user id (ascending,
+    unique).  Users already registered for the event are excluded.  Past
+    registrants include those of the party's archived events.
+    """
+    already_registered = db.select(EventRegistration.user_id).where(EventRegistration.event_id == event.id)
+    
+    if job.audience == 'past_registrants':
+        registrants = db.union(
+            db.select(EventRegistration.user_id)
+            .join(Event, Event.id == EventRegistration.event_id)
+            .where(Event.party_id == job.party_id, EventRegistration.event_id != event.id),
+            db.select(ArchivedRegistration.user_id)
+            .join(ArchivedEvent, ArchivedEvent.id == ArchivedRegistration.event_id)
+            .where(ArchivedEvent.party_id == job.party_id),
+        ).subquery()
+        user_id = registrants.c.user_id
+        query = db.select(user_id)
+    elif job.audience == 'radius':
+        min_lat, max_lat, min_lng, max_lng = bounding_box(event.latitude, event.longitude, job.radius_km)
+        user_id = User.id
+        query = db.select(User.id, User.latitude, User.longitude).where(
+            User.role == 'user',
+            User.latitude.between(min_lat, max_lat),
+            User.longitude.between(min_lng, max_lng),
+        )
+    else:
+        raise ValueError(f'Unknown audience: {job.audience}')
+    
+    return query.where(user_id.not_in(already_registered)), user_id
+
+
+def _recipients(job, event, rows):
+    if job.audience == 'radius':
+        # The bounding box over-selects its corners; keep the true circle
+        return [row[0] for row in rows
+                if haversine_km(event.latitude, event.longitude, row[1], row[2]) <= job.radius_km]
+    return [row[0] for row in rows]
+
+
+def job_progress(job):
+    return {
+        'id': job.id,
+        'event_id': job.event_id,
+        'audience': job.audience,
+        'radius_km': job.radius_km,
+        'status': job.status,
+        'total': job.total,
+        'processed': job.processed,
+        'sent': job.sent,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def default_message(event):
+    return (f"{event.party_name} invites you to {event.title} at {event.location} "
+            f"on {event.event_date.strftime('%B %d, %Y %I:%M %p')}.")
+
+
+def run_invitation_job(job_id, batch_size=1000):
+    """Execute an InvitationJob; must run inside an app context"""
+    job = db.session.get(InvitationJob, job_id)
+    event = db.session.get(Event, job.event_id)
+    progress_room = f'user:{job.party_id}'
+    
+    try:
+        query, user_id = audience_query(job, event)
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        job.total = db.session.execute(db.select(db.func.count()).select_from(query.subquery())).scalar()
+        db.session.commit()
+        realtime.emit('invitation_progress', job_progress(job), room=progress_room)
+        
+        title = f'Invitation: {event.title}'[:200]
+        message = job.message or default_message(event)
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                query.where(user_id > last_id).order_by(user_id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            
+            recipients = _recipients(job, event, rows)
+            create_notifications(recipients, title, message)
+            job.processed += len(rows)
+            job.sent += len(recipients)
+            db.session.commit()
+            
+            push_to_users(recipients, 'notification', {'title': title, 'message': message, 'event_id': event.id})
+            realtime.emit('invitation_progress', job_progress(job), room=progress_room)
+        
+        job.status = 'completed'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Invitation job %s failed', job_id)
+        job = db.session.get(InvitationJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    
+    realtime.emit('invitation_progress', job_progress(job), room=progress_room)
+    return job
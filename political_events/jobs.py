@@ -0,0 +1,31 @@
+"""
+Minimal background job runner.
+
+Jobs run in a daemon thread inside their own application context (and so
+their own database session).  When the Socket.IO layer is enabled its
+start_background_task() is used instead, so jobs cooperate with eventlet or
+gevent workers.
+"""
+
+import logging
+import threading
+
+from political_events.extensions import realtime
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(app, func, *args, **kwargs):
+    """Call func(*args, **kwargs) in the background within an app context of app"""
+    def runner():
+        with app.app_context():
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception('Background job %s failed', getattr(func, '__name__', func))
+    
+    if realtime.enabled:
+        return realtime.socketio.start_background_task(runner)
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    return thread
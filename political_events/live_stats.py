@@ -0,0 +1,194 @@
+"""
+Live dashboard statistics pushed over Socket.IO.
+
+Each dashboard subscribes to a channel: 'admin', 'party:<id>' or
+'user:<id>' (plus 'users' for the public upcoming-event count).  The first
+subscriber loads a snapshot with one query; after that the views report
+changes (registrations, check-ins, tickets, events, sign-ups) and only the
+resulting deltas are broadcast to the channel's room.  Snapshots are served
+from memory, so additional open dashboards cost no database work.
+
+Counters live in process memory.  A snapshot older than STATS_SNAPSHOT_TTL
+is reloaded on the next subscription, which bounds drift from other workers.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from flask_login import current_user
+
+from political_events.extensions import db, realtime
+from political_events.models import User, Event, EventRegistration, Ticket, EventSummary, ArchivedRegistration
+
+
+def _count(model_column, *criteria):
+    query = db.select(db.func.count(model_column))
+    for criterion in criteria:
+        query = query.where(criterion)
+    return query.scalar_subquery()
+
+
+def _sum(model_column, *criteria):
+    query = db.select(db.func.coalesce(db.func.sum(model_column), 0))
+    for criterion in criteria:
+        query = query.where(criterion)
+    return query.scalar_subquery()
+
+
+def load_snapshot(channel):
+    """
+    Compute a channel's counters from the database with a single query.
+    Lifetime totals include archived events via their stored summaries.
+    """
+    now = datetime.utcnow()
+    if channel == 'admin':
+        columns = {
+            'events': _count(Event.id) + _count(EventSummary.event_id),
+            'users': _count(User.id),
+            'open_tickets': _count(Ticket.id, Ticket.status == 'open'),
+            'parties': _count(User.id, User.role == 'party'),
+            'registrations': _count(EventRegistration.id) + _sum(EventSummary.registrations),
+            'checkins': (_count(EventRegistration.id, EventRegistration.attended.is_(True))
+                         + _sum(EventSummary.attendees)),
+        }
+    elif channel == 'users':
+        columns = {'upcoming_events': _count(Event.id, Event.event_date > now)}
+    elif channel.startswith('party:'):
+        party_id = int(channel.split(':', 1)[1])
+        party_events = db.select(Event.id).where(Event.party_id == party_id)
+        columns = {
+            'events': (_count(Event.id, Event.party_id == party_id)
+                       + _count(EventSummary.event_id, EventSummary.party_id == party_id)),
+            'active_events': _count(Event.id, Event.party_id == party_id, Event.is_active.is_(True)),
+            'upcoming_events': _count(Event.id, Event.party_id == party_id, Event.event_date > now),
+            'registrations': (_count(EventRegistration.id, EventRegistration.event_id.in_(party_events))
+                              + _sum(EventSummary.registrations, EventSummary.party_id == party_id)),
+            'attendees': (_count(EventRegistration.id, EventRegistration.event_id.in_(party_events),
+                                 EventRegistration.attended.is_(True))
+                          + _sum(EventSummary.attendees, EventSummary.party_id == party_id)),
+        }
+    elif channel.startswith('user:'):
+        user_id = int(channel.split(':', 1)[1])
+        columns = {
+            'registered': (_count(EventRegistration.id, EventRegistration.user_id == user_id)
+                           + _count(ArchivedRegistration.id, ArchivedRegistration.user_id == user_id)),
+            'attended': (_count(EventRegistration.id, EventRegistration.user_id == user_id,
+                                EventRegistration.attended.is_(True))
+                         + _count(ArchivedRegistration.id, ArchivedRegistration.user_id == user_id,
+                                  ArchivedRegistration.attended.is_(True))),
+        }
+    else:
+        raise ValueError(f'Unknown stats channel: {channel}')
+    
+    row = db.session.execute(db.select(*(column.label(name) for name, column in columns.items()))).one()
+    return row._asdict()
+
+
+class StatsTracker:
+    """In-memory channel counters kept current by deltas"""
+
+    def __init__(self):
+        self._snapshots = {}  # channel -> (counters, loaded_at)
+        self._lock = threading.Lock()
+
+    def snapshot(self, channel, ttl):
+        with self._lock:
+            cached = self._snapshots.get(channel)
+            if cached and time.monotonic() - cached[1] < ttl:
+                return dict(cached[0])
+        counters = load_snapshot(channel)
+        with self._lock:
+            self._snapshots[channel] = (counters, time.monotonic())
+        return dict(counters)
+
+    def apply(self, channel, delta):
+        """Fold delta into the cached counters and push it to subscribers"""
+        delta = {key: value for key, value in delta.items() if value}
+        if not delta:
+            return
+        with self._lock:
+            cached = self._snapshots.get(channel)
+            if cached is None:
+                return  # nobody has subscribed; the next subscriber loads fresh counts
+            counters = cached[0]
+            for key, value in delta.items():
+                counters[key] = counters.get(key, 0) + value
+        realtime.emit('stats_delta', {'channel': channel, 'delta': delta}, room=f'stats:{channel}')
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+tracker = StatsTracker()
+
+
+def channels_for(user):
+    if user.role == 'admin':
+        return ['admin']
+    if user.role == 'party':
+        return [f'party:{user.id}']
+    return [f'user:{user.id}', 'users']
+
+
+# Change notifications, called by the views after a successful commit
+def events_created(party_id, count=1, active=None, upcoming=None):
+    if not realtime.enabled:
+        return
+    active = count if active is None else active
+    upcoming = count if upcoming is None else upcoming
+    tracker.apply('admin', {'events': count})
+    tracker.apply(f'party:{party_id}', {'events': count, 'active_events': active, 'upcoming_events': upcoming})
+    tracker.apply('users', {'upcoming_events': upcoming})
+
+def registration_created(party_id, user_id):
+    if not realtime.enabled:
+        return
+    tracker.apply('admin', {'registrations': 1})
+    tracker.apply(f'party:{party_id}', {'registrations': 1})
+    tracker.apply(f'user:{user_id}', {'registered': 1})
+
+def registration_removed(party_id, user_id, attended=False):
+    """A cancelled registration; attended if it had been checked in, which takes its check-in back too"""
+    if not realtime.enabled:
+        return
+    checkins = -1 if attended else 0
+    tracker.apply('admin', {'registrations': -1, 'checkins': checkins})
+    tracker.apply(f'party:{party_id}', {'registrations': -1, 'attendees': checkins})
+    tracker.apply(f'user:{user_id}', {'registered': -1, 'attended': checkins})
+
+def attendance_marked(party_id, user_id):
+    if not realtime.enabled:
+        return
+    tracker.apply('admin', {'checkins': 1})
+    tracker.apply(f'party:{party_id}', {'attendees': 1})
+    tracker.apply(f'user:{user_id}', {'attended': 1})
+
+def users_created(count=1, parties=0):
+    if not realtime.enabled:
+        return
+    tracker.apply('admin', {'users': count, 'parties': parties})
+
+def open_tickets_changed(delta):
+    if not realtime.enabled:
+        return
+    tracker.apply('admin', {'open_tickets': delta})
+
+
+@realtime.on('subscribe_stats')
+def on_subscribe_stats(data=None):
+    """Join the caller's stats rooms and send the current counters"""
+    from flask_socketio import join_room
+    
+    if not current_user.is_authenticated:
+        return {'error': 'Authentication required'}
+    
+    ttl = current_app.config.get('STATS_SNAPSHOT_TTL', 300)
+    counters = {}
+    channels = channels_for(current_user)
+    for channel in channels:
+        join_room(f'stats:{channel}')
+        counters[channel] = tracker.snapshot(channel, ttl)
+    return {'channels': channels, 'stats': counters}
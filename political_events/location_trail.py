@@ -0,0 +1,282 @@
+"""
+Append-only location trail.
+
+User.latitude/longitude only hold the latest position.  Every location ping
+(POST /api/user/location) and event join is also appended to location_point,
+a narrow table whose primary key is (user_id, recorded_at): on SQLite it is
+a WITHOUT ROWID table, so the rows live in the index itself and a user's
+trail for a time window is a single range scan.  Times are Unix seconds and
+coordinates integers of 1e-5 degrees (about a metre).
+
+Raw pings are kept for LOCATION_TRAIL_RAW_HOURS.  compact_trails() then
+thins them to one per LOCATION_TRAIL_RESOLUTION seconds (the last ping of
+each interval) and folds them into location_trail_block, one row per user
+per UTC day holding the points as zigzag varint deltas, about 4-6 bytes a
+point.  purge_trails() drops everything older than
+LOCATION_TRAIL_RETENTION_DAYS.  Both run from
+`python maintenance.py compact-locations`.
+
+user_trail() and event_trails() read blocks and raw pings together, so
+callers do not see where compaction stopped.
+"""
+
+import calendar
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db
+from political_events.models import EventRegistration, LocationPoint, LocationTrailBlock
+
+SCALE = 100000  # stored units per degree
+DAY = 86400
+MAX_WINDOW = timedelta(days=31)  # longest span one query may read
+EVENT_WINDOW = timedelta(hours=3)  # default span either side of an event's start
+
+
+def to_timestamp(moment):
+    """Unix seconds of a naive UTC datetime"""
+    return calendar.timegm(moment.utctimetuple())
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def encode_points(points, start):
+    """
+    Varint-encode (timestamp, latitude_e5, longitude_e5) points, sorted by
+    time, as differences from the previous point (the first from start, 0, 0).
+    """
+    out = bytearray()
+    previous = (start, 0, 0)
+    for point in points:
+        for value, last in zip(point, previous):
+            value = _zigzag(value - last)
+            while value > 0x7f:
+                out.append((value & 0x7f) | 0x80)
+                value >>= 7
+            out.append(value)
+        previous = point
+    return bytes(out)
+
+
+def decode_points(data, start):
+    """The points encode_points() wrote, as a list of (timestamp, latitude_e5, longitude_e5)"""
+    points = []
+    values = []
+    previous = [start, 0, 0]
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(_unzigzag(value))
+        value = shift = 0
+        if len(values) == 3:
+            previous = [last + delta for last, delta in zip(previous, values)]
+            points.append(tuple(previous))
+            values = []
+    return points
+
+
+def downsample(points, resolution):
+    """Keep the last of the time-sorted points in each resolution-second interval"""
+    if not resolution or resolution <= 1:
+        return list(points)
+    kept = []
+    for point in points:
+        if kept and kept[-1][0] // resolution == point[0] // resolution:
+            kept[-1] = point
+        else:
+            kept.append(point)
+    return kept
+
+
+def record_point(user_id, latitude, longitude, recorded_at=None):
+    """
+    Append a ping to user_id's trail; the caller commits.  A later ping in
+    the same second replaces the earlier one.
+    """
+    timestamp = to_timestamp(recorded_at or datetime.utcnow())
+    position = {'latitude_e5': round(latitude * SCALE), 'longitude_e5': round(longitude * SCALE)}
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(LocationPoint).values(user_id=user_id, recorded_at=timestamp, **position))
+    except IntegrityError:
+        db.session.execute(
+            db.update(LocationPoint)
+            .where(LocationPoint.user_id == user_id, LocationPoint.recorded_at == timestamp)
+            .values(**position),
+            execution_options={'synchronize_session': False},
+        )
+
+
+def _read(user_filter, since, until):
+    """{user_id: time-sorted (timestamp, latitude_e5, longitude_e5)} between Unix seconds since and until"""
+    trails = {}
+    blocks = db.session.execute(
+        db.select(LocationTrailBlock.user_id, LocationTrailBlock.day, LocationTrailBlock.data)
+        .where(user_filter(LocationTrailBlock.user_id),
+               LocationTrailBlock.day.between(since // DAY, until // DAY))
+        .order_by(LocationTrailBlock.user_id, LocationTrailBlock.day)
+    )
+    for user_id, day, data in blocks:
+        trails.setdefault(user_id, []).extend(
+            point for point in decode_points(data, day * DAY) if since <= point[0] <= until
+        )
+    raw = db.session.execute(
+        db.select(LocationPoint.user_id, LocationPoint.recorded_at,
+                  LocationPoint.latitude_e5, LocationPoint.longitude_e5)
+        .where(user_filter(LocationPoint.user_id), LocationPoint.recorded_at.between(since, until))
+        .order_by(LocationPoint.user_id, LocationPoint.recorded_at)
+    )
+    for user_id, timestamp, latitude, longitude in raw:
+        trails.setdefault(user_id, []).append((timestamp, latitude, longitude))
+    for points in trails.values():
+        points.sort()  # blocks and raw pings overlap only around the compaction cutoff
+    return trails
+
+
+def _as_degrees(points, resolution):
+    return [[timestamp, latitude / SCALE, longitude / SCALE]
+            for timestamp, latitude, longitude in downsample(points, resolution)]
+
+
+def user_trail(user_id, since, until, resolution=None):
+    """[[unix_seconds, latitude, longitude], ...] of user_id between datetimes since and until"""
+    trails = _read(lambda column: column == user_id, to_timestamp(since), to_timestamp(until))
+    return _as_degrees(trails.get(user_id, []), resolution)
+
+
+def event_trails(event_id, since, until, resolution=None):
+    """{user_id: points as for user_trail()} of everyone registered for event_id"""
+    registered = db.select(EventRegistration.user_id).where(EventRegistration.event_id == event_id)
+    trails = _read(lambda column: column.in_(registered.scalar_subquery()),
+                   to_timestamp(since), to_timestamp(until))
+    return {user_id: _as_degrees(points, resolution) for user_id, points in trails.items()}
+
+
+def parse_moment(value):
+    """Naive UTC datetime of an ISO 8601 string or Unix seconds; raises ValueError"""
+    try:
+        if value.isdigit():
+            return datetime.utcfromtimestamp(int(value))
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is not None:
+            parsed = datetime.utcfromtimestamp(parsed.timestamp())
+        return parsed
+    except (OverflowError, OSError):
+        # Seconds or offsets past what the platform's time functions take
+        raise ValueError(f'{value} is out of range') from None
+
+
+def parse_window(args, default_since, default_until):
+    """
+    (since, until, resolution) from since / until (ISO 8601 or Unix seconds)
+    and resolution (seconds) query arguments.  Raises ValueError.
+    """
+    since = parse_moment(args['since']) if args.get('since') else default_since
+    until = parse_moment(args['until']) if args.get('until') else default_until
+    if until < since:
+        raise ValueError('until is before since')
+    if until - since > MAX_WINDOW:
+        raise ValueError(f'the window may span at most {MAX_WINDOW.days} days')
+    resolution = int(args.get('resolution') or 0)
+    if resolution < 0:
+        raise ValueError('resolution must not be negative')
+    return since, until, resolution
+
+
+def _compact_users(user_ids, cutoff, resolution):
+    rows = db.session.execute(
+        db.select(LocationPoint.user_id, LocationPoint.recorded_at,
+                  LocationPoint.latitude_e5, LocationPoint.longitude_e5)
+        .where(LocationPoint.user_id.in_(user_ids), LocationPoint.recorded_at < cutoff)
+        .order_by(LocationPoint.user_id, LocationPoint.recorded_at)
+    ).all()
+    days = {}
+    for user_id, timestamp, latitude, longitude in rows:
+        days.setdefault((user_id, timestamp // DAY), []).append((timestamp, latitude, longitude))
+
+    existing = db.session.execute(
+        db.select(LocationTrailBlock.user_id, LocationTrailBlock.day, LocationTrailBlock.data)
+        .where(LocationTrailBlock.user_id.in_(user_ids),
+               LocationTrailBlock.day.in_({day for _, day in days}))
+    ).all()
+    stored = {(user_id, day): data for user_id, day, data in existing if (user_id, day) in days}
+
+    blocks = []
+    for (user_id, day), points in days.items():
+        if (user_id, day) in stored:
+            points = sorted(decode_points(stored[(user_id, day)], day * DAY) + points)
+        points = downsample(points, resolution)
+        blocks.append({'user_id': user_id, 'day': day, 'points': len(points), 'resolution': resolution,
+                       'data': encode_points(points, day * DAY)})
+
+    if stored:
+        table = LocationTrailBlock.__table__
+        db.session.execute(
+            table.delete().where(table.c.user_id == db.bindparam('old_user_id'), table.c.day == db.bindparam('old_day')),
+            [{'old_user_id': user_id, 'old_day': day} for user_id, day in stored],
+        )
+    if blocks:
+        db.session.execute(db.insert(LocationTrailBlock), blocks)
+    db.session.execute(
+        db.delete(LocationPoint).where(LocationPoint.user_id.in_(user_ids), LocationPoint.recorded_at < cutoff),
+        execution_options={'synchronize_session': False},
+    )
+    return len(rows), len(blocks)
+
+
+def compact_trails(older_than_hours=48, resolution=300, users_per_chunk=500):
+    """
+    Fold raw pings older than older_than_hours into per-day blocks, one per
+    resolution seconds, users_per_chunk users per transaction.  Returns
+    {'points', 'blocks'}: raw pings consumed and blocks written.
+    """
+    cutoff = to_timestamp(datetime.utcnow() - timedelta(hours=older_than_hours))
+    totals = {'points': 0, 'blocks': 0}
+    after = 0
+    while True:
+        user_ids = db.session.execute(
+            db.select(LocationPoint.user_id).distinct()
+            .where(LocationPoint.user_id > after, LocationPoint.recorded_at < cutoff)
+            .order_by(LocationPoint.user_id).limit(users_per_chunk)
+        ).scalars().all()
+        if not user_ids:
+            break
+        try:
+            points, blocks = _compact_users(user_ids, cutoff, resolution)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        totals['points'] += points
+        totals['blocks'] += blocks
+        after = user_ids[-1]
+    return totals
+
+
+def purge_trails(retention_days=90):
+    """Delete blocks and raw pings older than retention_days.  Returns {'points', 'blocks'} deleted"""
+    cutoff = to_timestamp(datetime.utcnow() - timedelta(days=retention_days))
+    try:
+        blocks = db.session.execute(
+            db.delete(LocationTrailBlock).where(LocationTrailBlock.day < cutoff // DAY),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        points = db.session.execute(
+            db.delete(LocationPoint).where(LocationPoint.recorded_at < cutoff),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {'points': points, 'blocks': blocks}
@@ -0,0 +1,126 @@
+"""
+Compact encodings of an event's registration coordinates for the map pages.
+
+The party map pages used to inline every registration as a JSON object
+(email, dates, flags and full-precision coordinates, about 200 bytes a
+marker).  A marker only needs its position, its registration id (to fetch
+its details when clicked) and whether the registrant attended, so
+event_points() sends just that, in one of two encodings:
+
+- 'polyline' (the default): a string in the Google encoded-polyline
+  alphabet.  Each registration is four values, id, latitude and longitude
+  in 1e-5 degrees (about a metre) and attended (0 or 1), each written as
+  the difference from the previous registration's value.  Registrations
+  come in id order and registrants cluster around the venue, so most
+  markers take 8-10 characters.
+- 'float32': a little-endian binary buffer of a Uint32 count n followed by
+  n Uint32 ids, n Float32 latitudes, n Float32 longitudes and n Uint8
+  attended flags, which a browser reads with typed arrays and no parsing.
+  Float32 keeps coordinates to about 2 m.
+
+Registrations with a zero latitude or longitude (no position) are left
+out, as the map did.
+Encoded points are cached per event, keyed like geo_stats on the event's
+registration revision (political_events.revisions), which also makes up
+the response's ETag.
+"""
+
+import numpy as np
+
+from political_events import revisions
+from political_events.extensions import db
+from political_events.location_trail import SCALE
+from political_events.models import EventRegistration
+from political_events.sessions import LRUCache
+
+ENCODINGS = ('polyline', 'float32')
+FIELDS = ('id', 'latitude', 'longitude', 'attended')
+
+_cache = LRUCache(1000)  # (event id, encoding) -> (revision, payload)
+
+
+def _write_value(value, out):
+    """Append one signed value in the encoded-polyline alphabet"""
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_polyline(rows):
+    """Encode rows of integers, each as the difference from the same column of the previous row"""
+    out = []
+    previous = None
+    for row in rows:
+        for value, last in zip(row, previous or (0,) * len(row)):
+            _write_value(value - last, out)
+        previous = row
+    return ''.join(out)
+
+
+def decode_polyline(text, width):
+    """The rows of width integers encode_polyline() wrote"""
+    rows = []
+    values = []
+    previous = [0] * width
+    value = shift = 0
+    for char in text:
+        chunk = ord(char) - 63
+        value |= (chunk & 0x1f) << shift
+        if chunk & 0x20:
+            shift += 5
+            continue
+        values.append(~(value >> 1) if value & 1 else value >> 1)
+        value = shift = 0
+        if len(values) == width:
+            previous = [last + delta for last, delta in zip(previous, values)]
+            rows.append(tuple(previous))
+            values = []
+    return rows
+
+
+def pack_float32(ids, latitudes, longitudes, attended):
+    """The 'float32' buffer of parallel sequences of ids, coordinates and attended flags"""
+    return b''.join((
+        np.array([len(ids)], dtype='<u4').tobytes(),
+        np.asarray(ids, dtype='<u4').tobytes(),
+        np.asarray(latitudes, dtype='<f4').tobytes(),
+        np.asarray(longitudes, dtype='<f4').tobytes(),
+        np.asarray(attended, dtype=np.uint8).tobytes(),
+    ))
+
+
+def _load(event_id):
+    """(id, latitude, longitude, attended) of event_id's positioned registrations, in id order"""
+    return db.session.execute(
+        db.select(EventRegistration.id, EventRegistration.latitude, EventRegistration.longitude,
+                  EventRegistration.attended)
+        .where(EventRegistration.event_id == event_id,
+               EventRegistration.latitude != 0, EventRegistration.longitude != 0)
+        .order_by(EventRegistration.id)
+    ).all()
+
+
+def encode(rows, encoding):
+    if encoding == 'float32':
+        columns = list(zip(*rows)) or [(), (), (), ()]
+        return pack_float32(columns[0], columns[1], columns[2], [bool(flag) for flag in columns[3]])
+    return encode_polyline([(registration_id, round(latitude * SCALE), round(longitude * SCALE), int(bool(attended)))
+                            for registration_id, latitude, longitude, attended in rows])
+
+
+def event_points(event_id, encoding='polyline'):
+    """
+    (etag, count, payload) of event_id's markers in encoding, from the cache
+    while its registrations are unchanged
+    """
+    revision = revisions.revision(event_id)
+    etag = f'{event_id}-{encoding}-{revision}'
+    cached = _cache.get((event_id, encoding))
+    if cached is not None and cached[0] == revision:
+        return (etag, *cached[1])
+    rows = _load(event_id)
+    payload = (len(rows), encode(rows, encoding))
+    _cache.set((event_id, encoding), (revision, payload))
+    return (etag, *payload)
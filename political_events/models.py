@@ -0,0 +1,373 @@
+"""
+Database models for the Political Events Platform.
+"""
+
+from datetime import datetime
+
+from flask_login import UserMixin
+
+from political_events.extensions import db, login_manager
+
+
+class User(UserMixin, db.Model):
+    __table_args__ = (
+        db.Index('ix_user_created_at_id', 'created_at', 'id'),
+        db.Index('ix_user_role', 'role'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    phone = db.Column(db.String(20), unique=True, nullable=True)
+    password_hash = db.Column(db.String(200), nullable=False)
+    role = db.Column(db.String(20), default='user')  # admin, party, user
+    party_name = db.Column(db.String(100), nullable=True)
+    is_business_email = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Location tracking
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    location_updated_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationships
+    event_registrations = db.relationship('EventRegistration', backref='user', lazy=True)
+    tickets = db.relationship('Ticket', backref='user', lazy=True)
+
+
+class Event(db.Model):
+    __table_args__ = (
+        db.Index('ix_event_event_date_id', 'event_date', 'id'),
+        db.Index('ix_event_created_at_id', 'created_at', 'id'),
+        db.Index('ix_event_party_id', 'party_id'),
+        # Never reuse the id of a deleted (archived) row: archived_event keeps it
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    party_name = db.Column(db.String(100), nullable=False)
+    party_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    event_date = db.Column(db.DateTime, nullable=False)
+    qr_code = db.Column(db.Text, nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Relationships
+    registrations = db.relationship('EventRegistration', backref='event', lazy=True)
+
+
+class EventRegistration(db.Model):
+    __table_args__ = (
+        db.Index('ix_event_registration_event_id', 'event_id'),
+        db.Index('ix_event_registration_user_id', 'user_id'),
+        # One registration per user and event, enforced by the database
+        db.Index('uq_event_registration_event_id_user_id', 'event_id', 'user_id', unique=True),
+        # Never reuse the id of a cancelled or archived registration: check-in tokens name it
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    registered_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attended = db.Column(db.Boolean, default=False)
+    qr_scanned_at = db.Column(db.DateTime, nullable=True)
+    
+    # Location when registered
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+
+class EventCapacity(db.Model):
+    """Seat limit for a capped event; seats are reserved with a conditional UPDATE"""
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), primary_key=True)
+    capacity = db.Column(db.Integer, nullable=False)
+    reserved = db.Column(db.Integer, nullable=False, default=0)
+
+
+class WaitlistEntry(db.Model):
+    """A user waiting for a seat at a full event, served in id order"""
+    __table_args__ = (
+        db.Index('uq_waitlist_entry_event_id_user_id', 'event_id', 'user_id', unique=True),
+        db.Index('ix_waitlist_entry_event_id_id', 'event_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class RegistrationRequest(db.Model):
+    """Outcome of a join request, replayed when the same idempotency key is retried"""
+    __table_args__ = (
+        db.Index('ix_registration_request_created_at', 'created_at'),
+    )
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    key = db.Column(db.String(64), primary_key=True)
+    event_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ArchivedEvent(db.Model):
+    """A past event moved out of the event table by political_events.archive"""
+    __table_args__ = (
+        db.Index('ix_archived_event_party_id_event_date', 'party_id', 'event_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    party_name = db.Column(db.String(100), nullable=False)
+    party_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    event_date = db.Column(db.DateTime, nullable=False)
+    qr_code = db.Column(db.Text, nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+class ArchivedRegistration(db.Model):
+    """A registration for an archived event"""
+    __table_args__ = (
+        db.Index('ix_archived_registration_event_id', 'event_id'),
+        db.Index('ix_archived_registration_user_id', 'user_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('archived_event.id'), nullable=False)
+    registered_at = db.Column(db.DateTime)
+    attended = db.Column(db.Boolean, default=False)
+    qr_scanned_at = db.Column(db.DateTime, nullable=True)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    
+    user = db.relationship('User')
+
+
+class EventSummary(db.Model):
+    """Attendance totals for an archived event, computed when it was archived"""
+    __table_args__ = (
+        db.Index('ix_event_summary_party_id_event_date', 'party_id', 'event_date'),
+        db.Index('ix_event_summary_event_date_event_id', 'event_date', 'event_id'),
+    )
+    
+    event_id = db.Column(db.Integer, db.ForeignKey('archived_event.id'), primary_key=True)
+    party_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    event_date = db.Column(db.DateTime, nullable=False)
+    registrations = db.Column(db.Integer, nullable=False, default=0)
+    attendees = db.Column(db.Integer, nullable=False, default=0)
+    first_registered_at = db.Column(db.DateTime, nullable=True)
+    last_registered_at = db.Column(db.DateTime, nullable=True)
+    last_checkin_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+    
+    @property
+    def attendance_rate(self):
+        return self.attendees / self.registrations if self.registrations else 0.0
+
+
+class Ticket(db.Model):
+    __table_args__ = (
+        db.Index('ix_ticket_created_at_id', 'created_at', 'id'),
+        db.Index('ix_ticket_status_created_at', 'status', 'created_at'),
+        db.Index('ix_ticket_user_id_created_at', 'user_id', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='open')  # open, in_progress, resolved
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime, nullable=True)
+    admin_response = db.Column(db.Text, nullable=True)
+    
+    assignment = db.relationship('TicketAssignment', uselist=False, lazy=True)
+
+
+class TicketAssignment(db.Model):
+    """The admin currently responsible for a ticket"""
+    __table_args__ = (
+        db.Index('ix_ticket_assignment_admin_id', 'admin_id'),
+    )
+    
+    ticket_id = db.Column(db.Integer, db.ForeignKey('ticket.id'), primary_key=True)
+    admin_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    admin = db.relationship('User')
+
+
+class Notification(db.Model):
+    __table_args__ = (
+        # Inbox pages and unread scans walk a user's rows newest-first by id
+        db.Index('ix_notification_user_id_id', 'user_id', 'id'),
+        db.Index('ix_notification_user_id_is_read_id', 'user_id', 'is_read', 'id'),
+        db.Index('ix_notification_is_read_created_at', 'is_read', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return db.session.get(User, int(user_id))
+
+
+class BootstrapState(db.Model):
+    """Key/value record of the schema fingerprint and seed version applied by bootstrap"""
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class GeocodeCache(db.Model):
+    """Local cache of resolved locations so repeated imports skip the geocoder"""
+    location_key = db.Column(db.String(200), primary_key=True)  # normalised location text
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    provider = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class NotificationCounter(db.Model):
+    """Per-user unread notification count, maintained incrementally"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+
+
+class EventDraft(db.Model):
+    """An in-progress create_event form, saved field by field as it is edited"""
+    __table_args__ = (
+        db.Index('ix_event_draft_party_id_updated_at', 'party_id', 'updated_at'),
+        db.Index('ix_event_draft_updated_at', 'updated_at'),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)
+    party_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    data = db.Column(db.Text, nullable=False, default='{}')  # JSON object of form fields
+    version = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ServerSession(db.Model):
+    """A browser session held server-side; the cookie carries only id and revision"""
+    __table_args__ = (
+        db.Index('ix_server_session_expires_at', 'expires_at'),
+    )
+    
+    id = db.Column(db.String(64), primary_key=True)
+    revision = db.Column(db.String(16), nullable=False)  # changes on every write
+    data = db.Column(db.Text, nullable=False)  # Flask's tagged JSON
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+class InvitationJob(db.Model):
+    """A background fan-out of event invitations to a resolved audience"""
+    id = db.Column(db.Integer, primary_key=True)
+    party_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    audience = db.Column(db.String(30), nullable=False)  # past_registrants, radius
+    radius_km = db.Column(db.Float, nullable=True)
+    message = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), default='queued')  # queued, running, completed, failed
+    total = db.Column(db.Integer, default=0)  # candidate users to scan
+    processed = db.Column(db.Integer, default=0)  # candidates scanned so far
+    sent = db.Column(db.Integer, default=0)  # notifications written
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+class LocationPoint(db.Model):
+    """
+    A raw location ping.  The primary key is the (user_id, recorded_at)
+    index itself (WITHOUT ROWID on SQLite), so a user's trail is one range
+    scan and coordinates are stored as integers in units of 1e-5 degrees.
+    """
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    recorded_at = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Unix seconds, UTC
+    latitude_e5 = db.Column(db.Integer, nullable=False)
+    longitude_e5 = db.Column(db.Integer, nullable=False)
+
+
+class LocationTrailBlock(db.Model):
+    """One user's downsampled pings for one UTC day, delta-encoded as varints"""
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Integer, primary_key=True, autoincrement=False)  # days since 1970-01-01
+    points = db.Column(db.Integer, nullable=False)
+    resolution = db.Column(db.Integer, nullable=False)  # seconds per kept ping
+    data = db.Column(db.LargeBinary, nullable=False)
+
+
+class EventActivityRollup(db.Model):
+    """Registrations and check-ins of one event in one minute, hour or day, kept up to date as they happen"""
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    event_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    period = db.Column(db.Integer, primary_key=True, autoincrement=False)  # bucket length: 60, 3600 or 86400 s
+    bucket = db.Column(db.Integer, primary_key=True, autoincrement=False)  # bucket start, Unix seconds
+    registrations = db.Column(db.Integer, nullable=False, default=0)
+    checkins = db.Column(db.Integer, nullable=False, default=0)
+
+
+class EventRevision(db.Model):
+    """Bumped with every change to an event's registrations; keys the caches derived from them"""
+    event_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ImageBlob(db.Model):
+    """An uploaded image file, stored once under its SHA-256 however many events use it"""
+    sha256 = db.Column(db.String(64), primary_key=True)
+    extension = db.Column(db.String(8), nullable=False)  # of the original: jpg, png, gif or webp
+    content_type = db.Column(db.String(50), nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # bytes of the original
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # WebP variants: pending, ready, failed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    unlinked_at = db.Column(db.DateTime, nullable=True)  # when its last event link was removed
+
+
+class EventImage(db.Model):
+    """An image shown on an event, in position order"""
+    __table_args__ = (
+        db.Index('uq_event_image_event_id_sha256', 'event_id', 'sha256', unique=True),
+        db.Index('ix_event_image_sha256', 'sha256'),
+        # Never reuse the id of a removed image: DELETE .../images/<id> names it
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), db.ForeignKey('image_blob.sha256'), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,227 @@
+"""
+Notifications: creation, inbox queries, unread counters and retention.
+
+Unread counts are kept in notification_counter and adjusted in the same
+transaction as the insert or mark-read that changes them, so rendering the
+inbox badge is a primary-key lookup instead of a COUNT.  A user without a
+counter row is counted once and the row stored; when a concurrent request
+or invitation job stores it first, that row is used instead (page renders
+insert with ON CONFLICT DO NOTHING, fan-outs roll back to a savepoint and
+add to the existing rows).
+
+Every authenticated Socket.IO connection joins a personal room
+('user:<id>'), and the ids of connected users are tracked in memory so
+fan-outs push real-time notices only to users who can receive them.
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask_login import current_user
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db, realtime
+from political_events.models import Notification, NotificationCounter
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# dialect name -> insert() construct with on_conflict_do_nothing()
+_DIALECT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+_connected = Counter()  # user id -> open connections in this process
+_connected_lock = threading.Lock()
+
+
+def create_notifications(user_ids, title, message, created_at=None):
+    """
+    Insert one notification per user id and bump their unread counters.
+    The caller commits.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    created_at = created_at or datetime.utcnow()
+    db.session.execute(db.insert(Notification), [
+        {'user_id': user_id, 'title': title, 'message': message, 'is_read': False, 'created_at': created_at}
+        for user_id in user_ids
+    ])
+    
+    increments = Counter(user_ids)
+    pending = list(increments)
+    while pending:
+        existing = set(db.session.execute(
+            db.select(NotificationCounter.user_id).where(NotificationCounter.user_id.in_(pending))
+        ).scalars())
+        # One UPDATE per distinct increment (almost always a single +1 statement)
+        by_amount = {}
+        for user_id in existing:
+            by_amount.setdefault(increments[user_id], []).append(user_id)
+        for amount, ids in by_amount.items():
+            db.session.execute(
+                db.update(NotificationCounter)
+                .where(NotificationCounter.user_id.in_(ids))
+                .values(unread=NotificationCounter.unread + amount)
+            )
+        pending = [user_id for user_id in pending if user_id not in existing]
+        if not pending:
+            break
+        # Count rather than assume, so users with older notifications start correct
+        counts = _count_unread(pending)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(NotificationCounter), [
+                    {'user_id': user_id, 'unread': counts.get(user_id, 0)} for user_id in pending
+                ])
+            pending = []
+        except IntegrityError:
+            pass  # another transaction created some of them first; add to those instead
+    return len(user_ids)
+
+
+def _count_unread(user_ids):
+    rows = db.session.execute(
+        db.select(Notification.user_id, db.func.count(Notification.id))
+        .where(Notification.user_id.in_(user_ids), Notification.is_read.is_(False))
+        .group_by(Notification.user_id)
+    ).all()
+    return dict(rows)
+
+
+def unread_count(user_id):
+    """Cached unread count for user_id, initialising the counter row if needed"""
+    unread = db.session.execute(
+        db.select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+    ).scalar()
+    if unread is not None:
+        return unread
+    unread = _count_unread([user_id]).get(user_id, 0)
+    insert = _DIALECT_INSERTS[db.session.get_bind().dialect.name]
+    created = db.session.execute(
+        insert(NotificationCounter).values(user_id=user_id, unread=unread).on_conflict_do_nothing()
+    ).rowcount
+    if not created:
+        # Stored meanwhile by another request or an invitation job
+        return db.session.execute(
+            db.select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+        ).scalar()
+    # Called while base.html renders: expiring the page's objects on commit
+    # would reload each of them on its next attribute access
+    session = db.session()
+    expire_on_commit, session.expire_on_commit = session.expire_on_commit, False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+    return unread
+
+
+def inbox_page(user_id, before_id=None, limit=DEFAULT_PAGE_SIZE, unread_only=False):
+    """Newest-first page of a user's notifications; returns (items, next_before_id)"""
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    query = db.select(Notification).where(Notification.user_id == user_id)
+    if unread_only:
+        query = query.where(Notification.is_read.is_(False))
+    if before_id:
+        query = query.where(Notification.id < before_id)
+    items = db.session.execute(query.order_by(Notification.id.desc()).limit(limit + 1)).scalars().all()
+    next_before_id = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_before_id = items[-1].id
+    return items, next_before_id
+
+
+def mark_read(user_id, ids=None, from_id=None, to_id=None):
+    """
+    Mark a user's notifications read, either the given ids or the inclusive
+    id range [from_id, to_id] (either bound optional; neither = all).
+    Returns the number of notifications that changed.  Commits.
+    """
+    query = db.update(Notification).where(
+        Notification.user_id == user_id,
+        Notification.is_read.is_(False),
+    )
+    if ids is not None:
+        if not ids:
+            return 0
+        query = query.where(Notification.id.in_(ids))
+    if from_id is not None:
+        query = query.where(Notification.id >= from_id)
+    if to_id is not None:
+        query = query.where(Notification.id <= to_id)
+    
+    changed = db.session.execute(query.values(is_read=True), execution_options={'synchronize_session': False}).rowcount
+    if changed:
+        db.session.execute(
+            db.update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(unread=db.case(
+                (NotificationCounter.unread > changed, NotificationCounter.unread - changed),
+                else_=0,
+            ))
+        )
+    db.session.commit()
+    return changed
+
+
+def purge_read_notifications(older_than_days=30, chunk_size=5000):
+    """
+    Delete read notifications older than the cut-off in chunks of
+    chunk_size, committing after each chunk so the table is never locked
+    for long.  Unread counters are unaffected.  Returns rows deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            db.select(Notification.id)
+            .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(db.delete(Notification).where(Notification.id.in_(ids)),
+                           execution_options={'synchronize_session': False})
+        db.session.commit()
+        deleted += len(ids)
+    return deleted
+
+
+def connected_user_ids(user_ids):
+    """Subset of user_ids with an open Socket.IO connection to this process"""
+    with _connected_lock:
+        return [user_id for user_id in user_ids if _connected.get(user_id)]
+
+
+def push_to_users(user_ids, event, payload):
+    """Emit payload to the personal rooms of the connected users among user_ids"""
+    if not realtime.enabled:
+        return 0
+    targets = connected_user_ids(user_ids)
+    for user_id in targets:
+        realtime.emit(event, payload, room=f'user:{user_id}')
+    return len(targets)
+
+
+@realtime.on('connect')
+def on_connect(auth=None):
+    if not current_user.is_authenticated:
+        return
+    from flask_socketio import join_room
+    
+    join_room(f'user:{current_user.id}')
+    with _connected_lock:
+        _connected[current_user.id] += 1
+
+
+@realtime.on('disconnect')
+def on_disconnect(*args):
+    if not current_user.is_authenticated:
+        return
+    with _connected_lock:
+        _connected[current_user.id] -= 1
+        if _connected[current_user.id] <= 0:
+            del _connected[current_user.id]
@@ -0,0 +1,158 @@
+"""
+Keyset (seek) pagination and list filters for the admin views.
+
+A page is fetched with WHERE (sort, id) beyond the last row seen plus
+LIMIT per_page + 1, so the cost of page N does not grow with N the way
+OFFSET does.  The position is carried in an opaque URL-safe cursor; one
+that does not decode to a value of the sort column's type is a 400.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+
+from werkzeug.exceptions import BadRequest
+
+from political_events.extensions import db
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+
+class Page:
+    """One page of results plus the cursor for the next one"""
+
+    def __init__(self, items, next_cursor, sort, direction, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.sort = sort
+        self.direction = direction
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        payload = {'t': 'dt', 'v': sort_value.isoformat(), 'id': row_id}
+    else:
+        payload = {'v': sort_value, 'id': row_id}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (sort_value, id), or None for a missing cursor; raises ValueError for a malformed one"""
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        value = payload['v']
+        if payload.get('t') == 'dt':
+            value = datetime.fromisoformat(value)
+        last_id = payload['id']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Malformed cursor') from None
+    if type(last_id) is not int:
+        raise ValueError('Malformed cursor')
+    return value, last_id
+
+
+def _check_value(value, sort_column):
+    """Reject a cursor value of the wrong type for sort_column (None stands for NULL)"""
+    expected = sort_column.type.python_type
+    if value is not None and (not isinstance(value, expected) or isinstance(value, bool) and expected is not bool):
+        raise ValueError(f'Cursor does not match the {sort_column.key} sort')
+
+
+def keyset_paginate(query, sort_column, id_column, descending=True, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """
+    Apply ordering, the cursor predicate and LIMIT to a select() of ORM
+    entities and execute it.  NULL sort values order below every other
+    value, so rows without one come last in descending order and first in
+    ascending order.  Raises ValueError for a malformed cursor.
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        value, last_id = position
+        _check_value(value, sort_column)
+        if value is None:
+            # Within the NULLs; ascending order continues into the non-NULL values
+            beyond = db.and_(sort_column.is_(None), id_column < last_id if descending else id_column > last_id)
+            if not descending:
+                beyond = db.or_(sort_column.is_not(None), beyond)
+        elif descending:
+            beyond = db.or_(sort_column < value, db.and_(sort_column == value, id_column < last_id),
+                            sort_column.is_(None))
+        else:
+            beyond = db.or_(sort_column > value, db.and_(sort_column == value, id_column > last_id))
+        query = query.where(beyond)
+    
+    if descending:
+        query = query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc().nulls_first(), id_column.asc())
+    
+    rows = db.session.execute(query.limit(per_page + 1)).scalars().unique().all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+def paginate_from_args(query, args, sorts, default_sort, id_column):
+    """
+    Paginate query using the sort/direction/cursor/per_page request args.
+    sorts maps the allowed sort names to columns.  A bad cursor is a 400.
+    """
+    sort = args.get('sort') if args.get('sort') in sorts else default_sort
+    direction = 'asc' if args.get('direction') == 'asc' else 'desc'
+    try:
+        per_page = min(max(int(args.get('per_page', DEFAULT_PER_PAGE)), 1), MAX_PER_PAGE)
+    except ValueError:
+        per_page = DEFAULT_PER_PAGE
+    
+    try:
+        items, next_cursor = keyset_paginate(
+            query, sorts[sort], id_column,
+            descending=(direction == 'desc'),
+            cursor=args.get('cursor'),
+            per_page=per_page,
+        )
+    except ValueError as e:
+        raise BadRequest(str(e)) from None
+    return Page(items, next_cursor, sort, direction, per_page)
+
+
+def parse_date_range(args, prefix=''):
+    """Read <prefix>from / <prefix>to (YYYY-MM-DD) as a half-open datetime range"""
+    start = end = None
+    try:
+        if args.get(f'{prefix}from'):
+            start = datetime.strptime(args[f'{prefix}from'], '%Y-%m-%d')
+        if args.get(f'{prefix}to'):
+            end = datetime.strptime(args[f'{prefix}to'], '%Y-%m-%d') + timedelta(days=1)
+    except ValueError:
+        pass
+    return start, end
+
+
+def apply_date_range(query, column, args, prefix=''):
+    start, end = parse_date_range(args, prefix)
+    if start:
+        query = query.where(column >= start)
+    if end:
+        query = query.where(column < end)
+    return query
@@ -0,0 +1,226 @@
+"""
+Bulk user provisioning and streaming user export.
+
+Provisioning reads CSV / JSON rows (see importer.iter_records), validates
+them with the signup rules, rejects duplicates within the file and against
+existing accounts with one set-based query per batch (phones compare as
+digits only; normalize_phones() rewrites numbers stored before signup
+normalised them), hashes passwords on a
+thread pool and writes each batch with one multi-row INSERT.
+
+Exports stream straight from a server-side cursor, so no User objects are
+materialised regardless of table size.
+"""
+
+import csv
+import io
+import json
+import secrets
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db
+from political_events.helpers import hash_passwords
+from political_events.importer import chunks, iter_records
+from political_events.models import User
+from political_events.validation import USER_ROW, phone_digits
+
+EXPORT_COLUMNS = ('id', 'email', 'phone', 'role', 'party_name', 'is_business_email', 'created_at')
+
+
+class ProvisionReport:
+    """Outcome of a provisioning run"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.created_parties = 0
+        self.errors = []
+        self.generated_passwords = []
+
+    def add_error(self, row_number, messages, fields=None):
+        error = {'row': row_number, 'errors': messages}
+        if fields:
+            error['fields'] = fields  # {field: [messages]} from validation
+        self.errors.append(error)
+
+    def to_dict(self, include_passwords=False):
+        result = {
+            'total': self.total,
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+        }
+        if include_passwords:
+            result['generated_passwords'] = self.generated_passwords
+        return result
+
+
+def validate_user_row(record, default_role='user'):
+    """Return (values, errors) for one provisioning record using the signup rules"""
+    result = USER_ROW.validate(record, default_role=default_role)
+    return result.values, result.messages()
+
+
+def _existing(column, candidates):
+    if not candidates:
+        return set()
+    return set(db.session.execute(db.select(column).where(column.in_(candidates))).scalars())
+
+
+def _insert_batch(batch, report, hash_workers):
+    existing_emails = _existing(User.email, [values['email'] for _, values in batch])
+    existing_phones = _existing(User.phone, [values['phone'] for _, values in batch if values['phone']])
+    
+    ready = []
+    for row_number, values in batch:
+        errors = []
+        if values['email'] in existing_emails:
+            errors.append('Email already registered')
+        if values['phone'] and values['phone'] in existing_phones:
+            errors.append('Phone number already registered')
+        if errors:
+            report.add_error(row_number, errors)
+        else:
+            ready.append((row_number, values))
+    if not ready:
+        return
+    
+    for row_number, values in ready:
+        if not values['password']:
+            values['password'] = secrets.token_urlsafe(12)
+            report.generated_passwords.append({'row': row_number, 'email': values['email'], 'password': values['password']})
+    hashes = hash_passwords([values['password'] for _, values in ready], hash_workers)
+    
+    now = datetime.utcnow()
+    rows = [{
+        'email': values['email'],
+        'phone': values['phone'],
+        'password_hash': password_hash,
+        'role': values['role'],
+        'party_name': values['party_name'],
+        'is_business_email': values['role'] == 'party',
+        'created_at': now,
+    } for (_, values), password_hash in zip(ready, hashes)]
+    
+    try:
+        db.session.execute(db.insert(User), rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for row_number, _ in ready:
+            report.add_error(row_number, [f'Database error: {e.__class__.__name__}'])
+        return
+    report.created += len(rows)
+    report.created_parties += sum(1 for row in rows if row['role'] == 'party')
+
+
+def provision_users(stream, fmt, default_role='user', batch_size=500, hash_workers=None):
+    """
+    Create users from stream.  Must run inside an app context.
+
+    Rows without a password get a random one, listed in
+    report.generated_passwords so it can be handed to the volunteer.
+    """
+    report = ProvisionReport()
+    seen_emails, seen_phones = set(), set()
+    batch = []
+    
+    for chunk in chunks(iter_records(stream, fmt), batch_size):
+        report.total += len(chunk)
+        results = USER_ROW.validate_many([record for _, record in chunk], default_role=default_role)
+        for (row_number, _), result in zip(chunk, results):
+            values, errors = result.values, result.messages()
+            if not errors:
+                if values['email'] in seen_emails:
+                    errors.append('Duplicate email in import file')
+                if values['phone'] and values['phone'] in seen_phones:
+                    errors.append('Duplicate phone in import file')
+            if errors:
+                report.add_error(row_number, errors, result.errors)
+                continue
+            
+            seen_emails.add(values['email'])
+            if values['phone']:
+                seen_phones.add(values['phone'])
+            batch.append((row_number, values))
+            if len(batch) >= batch_size:
+                _insert_batch(batch, report, hash_workers)
+                batch = []
+    
+    if batch:
+        _insert_batch(batch, report, hash_workers)
+    return report
+
+
+def normalize_phones(chunk_size=1000):
+    """
+    Store every phone number as digits only, chunk_size users per
+    transaction.  A number whose digits another account already has is left
+    as it is.  Returns {'updated', 'conflicts'}.
+    """
+    done = {'updated': 0, 'conflicts': 0}
+    after = 0
+    while True:
+        rows = db.session.execute(
+            db.select(User.id, User.phone).where(User.id > after, User.phone.is_not(None))
+            .order_by(User.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        for user_id, phone in rows:
+            digits = phone_digits(phone)
+            if digits == phone:
+                continue
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(
+                        db.update(User).where(User.id == user_id).values(phone=digits or None),
+                        execution_options={'synchronize_session': False},
+                    )
+                done['updated'] += 1
+            except IntegrityError:
+                done['conflicts'] += 1
+        db.session.commit()
+        after = rows[-1].id
+    return done
+
+
+def _export_rows(role=None, chunk_size=1000):
+    query = db.select(*(getattr(User, column) for column in EXPORT_COLUMNS)).order_by(User.id)
+    if role:
+        query = query.where(User.role == role)
+    result = db.session.execute(query.execution_options(yield_per=chunk_size))
+    for row in result:
+        yield row
+
+
+def _format_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_users_csv(role=None, chunk_size=1000):
+    """Yield the user table as CSV text chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(_export_rows(role, chunk_size), start=1):
+        writer.writerow([_format_value(value) for value in row])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_users_jsonl(role=None, chunk_size=1000):
+    """Yield the user table as JSON Lines text chunks"""
+    lines = []
+    for row in _export_rows(role, chunk_size):
+        lines.append(json.dumps({column: _format_value(value) for column, value in zip(EXPORT_COLUMNS, row)}))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
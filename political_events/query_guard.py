@@ -0,0 +1,147 @@
+"""
+Development and test guards against N+1 queries.
+
+Lazy-load guard (LAZY_LOAD_GUARD = 'raise' or 'warn'): a relationship that
+lazy-loads with SQL while a template renders, or inside a serializing()
+block, raises LazyLoadError or logs a warning naming the attribute.  The fix
+is to eager-load it in the view (joinedload/selectinload) or to query the
+columns directly.
+
+Query budgets (QUERY_BUDGETS = 'raise' or 'warn'): a view decorated with
+@query_budget(n) may run at most n SQL statements per request, counting
+Flask-Login's user lookup.  Exceeding it raises QueryBudgetExceeded, which
+fails the test that made the request, or logs a warning.  A budget should
+not depend on how many rows the page shows; that is what catches the
+regressions.
+
+DevelopmentConfig warns and TestingConfig raises; production enables
+neither, and then nothing is registered and serializing() is a no-op.
+"""
+
+import contextlib
+import functools
+import logging
+
+from flask import (
+    current_app, g, has_app_context, has_request_context, request, before_render_template, template_rendered,
+)
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+MODES = ('raise', 'warn')
+
+
+class LazyLoadError(RuntimeError):
+    """A relationship was lazy-loaded while rendering or serializing"""
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A view ran more SQL statements than its @query_budget allows"""
+
+
+def query_budget(max_queries):
+    """Declare the most SQL statements a view may run per request"""
+    def decorator(f):
+        f.query_budget = max_queries
+        return f
+    return decorator
+
+
+def _guard_active():
+    return has_app_context() and g.get('_lazy_guard_depth', 0) > 0
+
+
+@contextlib.contextmanager
+def _guarding():
+    if not has_app_context() or 'query_guard' not in current_app.extensions:
+        yield
+        return
+    g._lazy_guard_depth = g.get('_lazy_guard_depth', 0) + 1
+    try:
+        yield
+    finally:
+        g._lazy_guard_depth -= 1
+
+
+def serializing(f=None):
+    """
+    Mark a block (with serializing(): ...) or a function (@serializing) as
+    serialization, where lazy loads are reported.
+    """
+    if f is None:
+        return _guarding()
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        with _guarding():
+            return f(*args, **kwargs)
+    return wrapper
+
+
+def _report(mode, exception, message, *args):
+    if mode == 'raise':
+        raise exception(message % args)
+    logger.warning(message, *args)
+
+
+def init_app(app):
+    """Register the guards selected by LAZY_LOAD_GUARD and QUERY_BUDGETS"""
+    lazy_mode = app.config.get('LAZY_LOAD_GUARD') or None
+    budget_mode = app.config.get('QUERY_BUDGETS') or None
+    for name, mode in (('LAZY_LOAD_GUARD', lazy_mode), ('QUERY_BUDGETS', budget_mode)):
+        if mode not in MODES + (None,):
+            raise ValueError(f'{name} must be one of {", ".join(MODES)} or empty, not {mode!r}')
+    if not lazy_mode and not budget_mode:
+        return
+    app.extensions['query_guard'] = {'lazy': lazy_mode, 'budget': budget_mode}
+
+    if lazy_mode:
+        from political_events.extensions import db
+
+        # The session factory is shared by every app in the process: listen once
+        if not event.contains(db.session.session_factory, 'do_orm_execute', _check_lazy_load):
+            event.listen(db.session.session_factory, 'do_orm_execute', _check_lazy_load)
+        before_render_template.connect(_begin_render, app)
+        template_rendered.connect(_end_render, app)
+
+    if budget_mode:
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            if has_app_context() and '_query_count' in g:
+                g._query_count += 1
+
+        def start_counting():
+            g._query_count = 0
+
+        def check_budget(response):
+            view = current_app.view_functions.get(request.endpoint)
+            budget = getattr(view, 'query_budget', None)
+            used = g.pop('_query_count', 0)
+            if budget is not None and used > budget:
+                _report(budget_mode, QueryBudgetExceeded, '%s ran %d SQL statements; its budget is %d',
+                        request.endpoint, used, budget)
+            return response
+
+        # Count from the first hook so the user lookup is included
+        app.before_request_funcs.setdefault(None, []).insert(0, start_counting)
+        app.after_request(check_budget)
+        with app.app_context():
+            for engine in app.extensions['sqlalchemy'].engines.values():
+                event.listen(engine, 'before_cursor_execute', count_statement)
+
+
+def _check_lazy_load(state):
+    if not state.is_select or state.lazy_loaded_from is None or not _guard_active():
+        return
+    mode = current_app.extensions.get('query_guard', {}).get('lazy')
+    if mode:
+        _report(mode, LazyLoadError, 'Lazy load of %s.%s in %s', state.lazy_loaded_from.class_.__name__,
+                state.loader_strategy_path[-1].key, request.endpoint if has_request_context() else '?')
+
+
+def _begin_render(app, template, context, **extra):
+    g._lazy_guard_depth = g.get('_lazy_guard_depth', 0) + 1
+
+
+def _end_render(app, template, context, **extra):
+    g._lazy_guard_depth = max(g.get('_lazy_guard_depth', 0) - 1, 0)
@@ -0,0 +1,63 @@
+"""
+Optional real-time layer built on Flask-SocketIO.
+
+Flask-SocketIO (and its async driver) is only imported when the extension is
+initialised, so deployments that run plain gunicorn never pay for it.  Views
+call realtime.emit() unconditionally; it is a no-op when the layer is off.
+"""
+
+
+class Realtime:
+    """Lazily-initialised wrapper around a SocketIO server."""
+
+    def __init__(self, app=None):
+        self.socketio = None
+        self._handlers = []
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def enabled(self):
+        return self.socketio is not None
+
+    def init_app(self, app, **kwargs):
+        """Create the SocketIO server for app and register the event handlers."""
+        from flask_socketio import SocketIO
+
+        self.socketio = SocketIO(app, **kwargs)
+        self._register_handlers()
+        app.extensions['realtime'] = self
+        return self.socketio
+
+    def on(self, event):
+        """Decorator registering a Socket.IO event handler, bound when the layer is enabled"""
+        def decorator(f):
+            self._handlers.append((event, f))
+            if self.socketio is not None:
+                self.socketio.on_event(event, f)
+            return f
+        return decorator
+
+    def emit(self, event, data, room=None):
+        """Broadcast event to room, or do nothing when real-time is disabled."""
+        if self.socketio is None:
+            return
+        self.socketio.emit(event, data, to=room)
+
+    def _register_handlers(self):
+        from flask_socketio import emit, join_room, leave_room
+
+        def on_join_event_room(data):
+            join_room(f"event_{data['event_id']}")
+
+        def on_leave_event_room(data):
+            leave_room(f"event_{data['event_id']}")
+
+        def on_send_message(data):
+            emit('receive_message', data, to=f"event_{data['event_id']}")
+
+        self.socketio.on_event('join_event_room', on_join_event_room)
+        self.socketio.on_event('leave_event_room', on_leave_event_room)
+        self.socketio.on_event('send_message', on_send_message)
+        for event, handler in self._handlers:
+            self.socketio.on_event(event, handler)
@@ -0,0 +1,295 @@
+"""
+Event registration with capacity limits, waitlists and idempotency keys.
+
+A seat at a capped event is taken with a single conditional UPDATE
+(reserved = reserved + 1 WHERE reserved < capacity) in the same
+transaction as the registration INSERT, and a unique (event_id, user_id)
+index rejects duplicate registrations, so concurrent joins can neither
+overbook nor double-register.  Joins that find the event full go to the
+waitlist, which is promoted in order as seats free up.  Events without an
+event_capacity row are unlimited.
+
+A client-supplied idempotency key stores the outcome in the same
+transaction, so a retried request gets the original answer.  SQLite
+writers that hit a lock retry the whole transaction a few times.
+"""
+
+import logging
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from political_events.extensions import db
+from political_events import checkin, revisions, rollups
+from political_events.location_trail import record_point
+from political_events.models import (
+    User, Event, EventRegistration, EventCapacity, WaitlistEntry, RegistrationRequest,
+)
+from political_events.notifications import create_notifications
+
+logger = logging.getLogger(__name__)
+
+REGISTERED = 'registered'
+WAITLISTED = 'waitlisted'
+ALREADY_REGISTERED = 'already_registered'
+ALREADY_WAITLISTED = 'already_waitlisted'
+
+MAX_KEY_LENGTH = 64
+LOCK_RETRIES = 8
+
+JoinResult = namedtuple('JoinResult', 'status replayed')
+CancelResult = namedtuple('CancelResult', 'cancelled promoted attended')
+
+
+def _retry_locked(func):
+    """Run func() as one transaction, retrying when the database reports a lock"""
+    for attempt in range(LOCK_RETRIES):
+        try:
+            return func()
+        except OperationalError as e:
+            db.session.rollback()
+            if 'locked' not in str(e.orig).lower() or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+
+
+def _reserve_seat(event_id):
+    """True if a seat was reserved (or the event is unlimited), False if it is full"""
+    taken = db.session.execute(
+        db.update(EventCapacity)
+        .where(EventCapacity.event_id == event_id, EventCapacity.reserved < EventCapacity.capacity)
+        .values(reserved=EventCapacity.reserved + 1)
+    ).rowcount
+    if taken:
+        return True
+    capped = db.session.execute(
+        db.select(EventCapacity.event_id).where(EventCapacity.event_id == event_id)
+    ).first()
+    return capped is None
+
+
+def _stored_outcome(user_id, key):
+    return db.session.execute(
+        db.select(RegistrationRequest.status)
+        .where(RegistrationRequest.user_id == user_id, RegistrationRequest.key == key)
+    ).scalar()
+
+
+def join_event(event_id, user_id, latitude, longitude, idempotency_key=None):
+    """
+    Register user_id for event_id, or waitlist them when the event is full,
+    recording their location (and appending it to their trail) in the same
+    transaction.  Commits and returns
+    a JoinResult.
+    """
+    key = (idempotency_key or '')[:MAX_KEY_LENGTH] or None
+    
+    def attempt():
+        if key:
+            stored = _stored_outcome(user_id, key)
+            if stored:
+                return JoinResult(stored, True)
+        
+        now = datetime.utcnow()
+        if _reserve_seat(event_id):
+            status = REGISTERED
+            row = EventRegistration(user_id=user_id, event_id=event_id, latitude=latitude, longitude=longitude,
+                                    registered_at=now)
+            db.session.execute(
+                db.delete(WaitlistEntry).where(WaitlistEntry.event_id == event_id, WaitlistEntry.user_id == user_id),
+                execution_options={'synchronize_session': False},
+            )
+        elif _existing_status(event_id, user_id) == ALREADY_REGISTERED:
+            db.session.rollback()
+            return JoinResult(ALREADY_REGISTERED, False)
+        else:
+            status = WAITLISTED
+            row = WaitlistEntry(user_id=user_id, event_id=event_id, latitude=latitude, longitude=longitude)
+        try:
+            with db.session.begin_nested():
+                db.session.add(row)
+                if key:
+                    db.session.add(RegistrationRequest(user_id=user_id, key=key, event_id=event_id, status=status))
+        except IntegrityError:
+            # Already registered/waitlisted, or the same key raced us: undo the seat
+            db.session.rollback()
+            if key:
+                stored = _stored_outcome(user_id, key)
+                if stored:
+                    return JoinResult(stored, True)
+            return JoinResult(_existing_status(event_id, user_id), False)
+        if status == REGISTERED:
+            rollups.registered(event_id, now)
+            revisions.bump([event_id])
+        db.session.execute(
+            db.update(User).where(User.id == user_id)
+            .values(latitude=latitude, longitude=longitude, location_updated_at=now),
+            execution_options={'synchronize_session': False},
+        )
+        record_point(user_id, latitude, longitude, now)
+        db.session.commit()
+        return JoinResult(status, False)
+    
+    return _retry_locked(attempt)
+
+
+def _existing_status(event_id, user_id):
+    registered = db.session.execute(
+        db.select(EventRegistration.id)
+        .where(EventRegistration.event_id == event_id, EventRegistration.user_id == user_id)
+    ).first()
+    return ALREADY_REGISTERED if registered else ALREADY_WAITLISTED
+
+
+def promote_waitlist(event_id):
+    """
+    Fill free seats from the head of the waitlist.  The caller commits;
+    returns the promoted user ids.
+    """
+    promoted = []
+    now = datetime.utcnow()
+    while True:
+        entry = db.session.execute(
+            db.select(WaitlistEntry).where(WaitlistEntry.event_id == event_id)
+            .order_by(WaitlistEntry.id).limit(1)
+        ).scalar()
+        if entry is None or not _reserve_seat(event_id):
+            break
+        db.session.add(EventRegistration(user_id=entry.user_id, event_id=event_id,
+                                         latitude=entry.latitude, longitude=entry.longitude, registered_at=now))
+        db.session.delete(entry)
+        db.session.flush()
+        promoted.append(entry.user_id)
+    
+    if promoted:
+        rollups.record([(event_id, now, len(promoted), 0)])
+        revisions.bump([event_id])
+        title = db.session.execute(db.select(Event.title).where(Event.id == event_id)).scalar()
+        create_notifications(promoted, f'You are in: {title}',
+                             f'A seat opened up at {title} and your registration is confirmed.')
+    return promoted
+
+
+def set_capacity(event_id, capacity):
+    """
+    Set (or with None, remove) an event's seat limit and promote waitlisted
+    users into any new seats.  Commits; returns the promoted user ids.
+    """
+    def attempt():
+        row = db.session.get(EventCapacity, event_id)
+        if capacity is None:
+            if row:
+                db.session.delete(row)
+                db.session.flush()
+        elif row:
+            row.capacity = capacity
+        else:
+            reserved = db.session.execute(
+                db.select(db.func.count(EventRegistration.id)).where(EventRegistration.event_id == event_id)
+            ).scalar()
+            db.session.add(EventCapacity(event_id=event_id, capacity=capacity, reserved=reserved))
+        db.session.flush()
+        promoted = promote_waitlist(event_id)
+        db.session.commit()
+        return promoted
+    
+    return _retry_locked(attempt)
+
+
+def cancel(event_id, user_id):
+    """
+    Withdraw a registration (freeing its seat for the waitlist) or a
+    waitlist entry.  Commits; returns a CancelResult: whether anything was
+    cancelled, the promoted user ids and whether the cancelled registration
+    had been checked in.
+    """
+    def attempt():
+        registration = db.session.execute(
+            db.select(EventRegistration.id, EventRegistration.registered_at, EventRegistration.attended,
+                      EventRegistration.qr_scanned_at)
+            .where(EventRegistration.event_id == event_id, EventRegistration.user_id == user_id)
+        ).first()
+        removed = registration and db.session.execute(
+            db.delete(EventRegistration).where(EventRegistration.id == registration.id),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        promoted, revoked = [], []
+        if removed:
+            revoked.append(registration.id)
+            changes = [(event_id, registration.registered_at or datetime.utcnow(), -1, 0)]
+            if registration.attended and registration.qr_scanned_at:
+                changes.append((event_id, registration.qr_scanned_at, 0, -1))
+            rollups.record(changes)
+            revisions.bump([event_id])
+            db.session.execute(
+                db.update(EventCapacity)
+                .where(EventCapacity.event_id == event_id, EventCapacity.reserved > 0)
+                .values(reserved=EventCapacity.reserved - 1)
+            )
+            promoted = promote_waitlist(event_id)
+        else:
+            removed = db.session.execute(
+                db.delete(WaitlistEntry)
+                .where(WaitlistEntry.event_id == event_id, WaitlistEntry.user_id == user_id),
+                execution_options={'synchronize_session': False},
+            ).rowcount
+        db.session.commit()
+        checkin.event_rosters.revoke(event_id, revoked)
+        return CancelResult(bool(removed), promoted, bool(revoked and registration.attended))
+    
+    return _retry_locked(attempt)
+
+
+def seats(event_id, user_id=None):
+    """Capacity, reserved seats and waitlist length (plus the user's waitlist position)"""
+    row = db.session.get(EventCapacity, event_id)
+    waitlisted = db.session.execute(
+        db.select(db.func.count(WaitlistEntry.id)).where(WaitlistEntry.event_id == event_id)
+    ).scalar()
+    info = {
+        'capacity': row.capacity if row else None,
+        'reserved': row.reserved if row else None,
+        'available': max(row.capacity - row.reserved, 0) if row else None,
+        'waitlisted': waitlisted,
+    }
+    if user_id is not None:
+        entry_id = db.session.execute(
+            db.select(WaitlistEntry.id)
+            .where(WaitlistEntry.event_id == event_id, WaitlistEntry.user_id == user_id)
+        ).scalar()
+        info['waitlist_position'] = db.session.execute(
+            db.select(db.func.count(WaitlistEntry.id))
+            .where(WaitlistEntry.event_id == event_id, WaitlistEntry.id <= entry_id)
+        ).scalar() if entry_id else None
+    return info
+
+
+def remove_duplicate_registrations():
+    """
+    Keep only the earliest registration per (event, user) so the unique
+    index can be built on databases that predate it.  Returns rows removed.
+    """
+    keep = db.select(db.func.min(EventRegistration.id)).group_by(
+        EventRegistration.event_id, EventRegistration.user_id
+    )
+    removed = db.session.execute(
+        db.delete(EventRegistration).where(EventRegistration.id.not_in(keep)),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    if removed:
+        logger.warning('Removed %d duplicate event registrations', removed)
+    return removed
+
+
+def purge_idempotency_keys(older_than_hours=24):
+    """Forget join outcomes older than the retry window; returns rows deleted"""
+    cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+    deleted = db.session.execute(
+        db.delete(RegistrationRequest).where(RegistrationRequest.created_at < cutoff),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    db.session.commit()
+    return deleted
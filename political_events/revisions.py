@@ -0,0 +1,52 @@
+"""
+Per-event revision numbers for caches of registration data.
+
+event_revision holds a counter per event that is bumped in the same
+transaction as every change to the event's registrations: joins, waitlist
+promotions, cancellations and the venue check-in flusher.
+geo_stats and map_points key their caches (and the points ETag) on it, so
+a cancellation followed by a new registration, which leaves the count,
+highest id and attendees as they were, still invalidates them.  Reading a
+revision is one primary-key lookup.
+
+An event without a row is at revision 0.  Archiving drops the rows with
+the events, whose ids are never reused.
+"""
+
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db
+from political_events.models import EventRevision
+
+
+def revision(event_id):
+    """event_id's current revision"""
+    return db.session.execute(
+        db.select(EventRevision.revision).where(EventRevision.event_id == event_id)
+    ).scalar() or 0
+
+
+def _increment(event_ids):
+    return db.session.execute(
+        db.update(EventRevision).where(EventRevision.event_id.in_(event_ids))
+        .values(revision=EventRevision.revision + 1),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+
+
+def bump(event_ids):
+    """Advance the revision of each event in event_ids.  The caller commits"""
+    event_ids = sorted(set(event_ids))
+    if not event_ids or _increment(event_ids) == len(event_ids):
+        return
+
+    existing = set(db.session.execute(
+        db.select(EventRevision.event_id).where(EventRevision.event_id.in_(event_ids))
+    ).scalars())
+    missing = [event_id for event_id in event_ids if event_id not in existing]
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(EventRevision), [{'event_id': event_id, 'revision': 1}
+                                                          for event_id in missing])
+    except IntegrityError:
+        _increment(missing)  # another transaction created them first
@@ -0,0 +1,177 @@
+"""
+Registrations and check-ins per event over time.
+
+event_activity_rollup holds, for each event, how many registrations and
+check-ins fell in each UTC minute, hour and day.  Rows are adjusted in the
+same transaction as the change they count:
+
+- join_event and waitlist promotion add a registration
+- cancel() takes a registration, and its check-in, back out
+- the venue check-in flusher adds check-ins
+
+So a rollup always matches grouping the event's registrations by
+registered_at / qr_scanned_at, and charting arrivals reads a few hundred
+rollup rows instead of every registration.  Archiving an event drops its
+rollups.  backfill() rebuilds them from the registrations
+(`python maintenance.py backfill-rollups`), for data that predates them.
+"""
+
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from political_events.extensions import db
+from political_events.location_trail import to_timestamp
+from political_events.models import Event, EventActivityRollup, EventRegistration
+
+PERIODS = {'minute': 60, 'hour': 3600, 'day': 86400}
+INSERT_RETRIES = 3
+
+
+def _aggregate(changes):
+    """{(event_id, period, bucket): [registrations, checkins]} of (event_id, moment, registrations, checkins) changes"""
+    totals = {}
+    for event_id, moment, registrations, checkins in changes:
+        timestamp = to_timestamp(moment)
+        for period in PERIODS.values():
+            counts = totals.setdefault((event_id, period, timestamp - timestamp % period), [0, 0])
+            counts[0] += registrations
+            counts[1] += checkins
+    return {key: counts for key, counts in totals.items() if counts != [0, 0]}
+
+
+def _rows(totals, keys):
+    rows = []
+    for event_id, period, bucket in keys:
+        registrations, checkins = totals[(event_id, period, bucket)]
+        rows.append({'event_id': event_id, 'period': period, 'bucket': bucket,
+                     'registrations': registrations, 'checkins': checkins})
+    return rows
+
+
+def _existing(keys):
+    rows = db.session.execute(
+        db.select(EventActivityRollup.event_id, EventActivityRollup.period, EventActivityRollup.bucket)
+        .where(EventActivityRollup.event_id.in_({event_id for event_id, _, _ in keys}),
+               EventActivityRollup.bucket.in_({bucket for _, _, bucket in keys}))
+    ).all()
+    return {tuple(row) for row in rows} & set(keys)
+
+
+def record(changes):
+    """
+    Apply (event_id, moment, registrations, checkins) changes, where the
+    counts are signed, to the minute, hour and day rollups.  The caller commits.
+    """
+    totals = _aggregate(changes)
+    if not totals:
+        return
+
+    for attempt in range(INSERT_RETRIES):
+        existing = _existing(totals)
+        missing = [key for key in totals if key not in existing]
+        if not missing:
+            break
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(EventActivityRollup), _rows(totals, missing))
+            break
+        except IntegrityError:
+            # Another transaction created some of these buckets; add to them instead
+            if attempt == INSERT_RETRIES - 1:
+                raise
+
+    if existing:
+        table = EventActivityRollup.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.event_id == db.bindparam('key_event_id'), table.c.period == db.bindparam('key_period'),
+                   table.c.bucket == db.bindparam('key_bucket'))
+            .values(registrations=table.c.registrations + db.bindparam('add_registrations'),
+                    checkins=table.c.checkins + db.bindparam('add_checkins')),
+            [{'key_event_id': row['event_id'], 'key_period': row['period'], 'key_bucket': row['bucket'],
+              'add_registrations': row['registrations'], 'add_checkins': row['checkins']}
+             for row in _rows(totals, existing)],
+        )
+
+
+def registered(event_id, moment):
+    record([(event_id, moment, 1, 0)])
+
+
+def checked_in(event_id, moment):
+    record([(event_id, moment, 0, 1)])
+
+
+def series(event_id, granularity='hour', since=None, until=None):
+    """
+    Non-empty buckets of event_id between datetimes since and until, oldest
+    first, as {'start': [unix_seconds, ...], 'registrations': [...], 'checkins': [...]}.
+    """
+    period = PERIODS[granularity]
+    query = (db.select(EventActivityRollup.bucket, EventActivityRollup.registrations, EventActivityRollup.checkins)
+             .where(EventActivityRollup.event_id == event_id, EventActivityRollup.period == period)
+             .order_by(EventActivityRollup.bucket))
+    if since is not None:
+        query = query.where(EventActivityRollup.bucket >= to_timestamp(since) - to_timestamp(since) % period)
+    if until is not None:
+        query = query.where(EventActivityRollup.bucket <= to_timestamp(until))
+    result = {'start': [], 'registrations': [], 'checkins': []}
+    for bucket, registrations, checkins in db.session.execute(query):
+        if registrations or checkins:
+            result['start'].append(bucket)
+            result['registrations'].append(registrations)
+            result['checkins'].append(checkins)
+    return result
+
+
+def totals(event_id):
+    """{'registrations', 'checkins'} of event_id, summed over its day buckets"""
+    registrations, checkins = db.session.execute(
+        db.select(db.func.coalesce(db.func.sum(EventActivityRollup.registrations), 0),
+                  db.func.coalesce(db.func.sum(EventActivityRollup.checkins), 0))
+        .where(EventActivityRollup.event_id == event_id, EventActivityRollup.period == PERIODS['day'])
+    ).one()
+    return {'registrations': registrations, 'checkins': checkins}
+
+
+def backfill(chunk_size=200):
+    """
+    Rebuild the rollups of every current event from registered_at and
+    qr_scanned_at, chunk_size events per transaction.  Returns
+    {'events', 'rows'}: events rebuilt and rollup rows written.
+    """
+    done = {'events': 0, 'rows': 0}
+    after = 0
+    while True:
+        event_ids = db.session.execute(
+            db.select(Event.id).where(Event.id > after).order_by(Event.id).limit(chunk_size)
+        ).scalars().all()
+        if not event_ids:
+            break
+        changes = []
+        registrations = db.session.execute(
+            db.select(EventRegistration.event_id, EventRegistration.registered_at, EventRegistration.attended,
+                      EventRegistration.qr_scanned_at)
+            .where(EventRegistration.event_id.in_(event_ids))
+        )
+        for event_id, registered_at, attended, scanned_at in registrations:
+            changes.append((event_id, registered_at or datetime.utcnow(), 1, 0))
+            if attended and scanned_at:
+                changes.append((event_id, scanned_at, 0, 1))
+        rows = _aggregate(changes)
+        try:
+            db.session.execute(
+                db.delete(EventActivityRollup).where(EventActivityRollup.event_id.in_(event_ids)),
+                execution_options={'synchronize_session': False},
+            )
+            if rows:
+                db.session.execute(db.insert(EventActivityRollup), _rows(rows, rows))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        done['events'] += len(event_ids)
+        done['rows'] += len(rows)
+        after = event_ids[-1]
+    return done
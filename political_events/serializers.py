@@ -0,0 +1,204 @@
+"""
+Declarative serializers and the application's JSON provider.
+
+A Serializer lists the fields of a JSON object and where each one comes
+from, and compiles that into a plain function building the dict with one
+attribute access per field: no per-field loop, getattr() or isoformat()
+calls.  Datetimes stay datetime objects; the JSON provider writes them as
+ISO 8601, natively when orjson is installed (JSON_BACKEND=auto) and through
+a default= hook on the standard library's json otherwise.  The same
+serializer works on ORM objects and on the read_models rows.
+
+    EVENT(event)                        # one dict
+    REGISTRATION.many(rows)             # a list of dicts, under serializing()
+    REGISTRATION.only('id', 'user_email')
+
+benchmarks/serialization.py measures CPU per serialized registration.
+"""
+
+import dataclasses
+import decimal
+import json
+import keyword
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+from political_events.query_guard import serializing
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library is the fallback
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+
+class Serializer:
+    """
+    Serializer('id', 'title', assigned_to='assignment.admin_id',
+               defaults={'assigned_to': 0})
+
+    Positional fields are read from the attribute of the same name; keyword
+    fields from a dotted path, which yields None as soon as a step is None.
+    defaults replaces None values of the named fields.
+    """
+
+    def __init__(self, *fields, defaults=None, **sources):
+        self.sources = {name: name for name in fields}
+        self.sources.update(sources)
+        self.defaults = dict(defaults or {})
+        for name in self.defaults:
+            if name not in self.sources:
+                raise ValueError(f'Default for unknown field {name!r}')
+        self.encode = self._compile()
+
+    @property
+    def fields(self):
+        return tuple(self.sources)
+
+    def only(self, *names, defaults=None):
+        """A serializer for a subset of these fields, in the order given"""
+        missing = [name for name in names if name not in self.sources]
+        if missing:
+            raise ValueError(f'Unknown fields: {", ".join(missing)}')
+        inherited = {name: value for name, value in self.defaults.items() if name in names}
+        return Serializer(defaults={**inherited, **(defaults or {})},
+                          **{name: self.sources[name] for name in names})
+
+    def __call__(self, obj):
+        with serializing():
+            return self.encode(obj)
+
+    def many(self, objs):
+        with serializing():
+            return list(map(self.encode, objs))
+
+    def _compile(self):
+        namespace = {}
+        items = []
+        for index, (name, path) in enumerate(self.sources.items()):
+            expression = _accessor(path)
+            if name in self.defaults:
+                namespace[f'_default{index}'] = self.defaults[name]
+                expression = f'(_default{index} if (_v := {expression}) is None else _v)'
+            items.append(f'{name!r}: {expression}')
+        source = 'def encode(obj):\n    return {%s}\n' % ', '.join(items)
+        exec(compile(source, f'<serializer {", ".join(self.sources)}>', 'exec'), namespace)
+        return namespace['encode']
+
+
+def _accessor(path):
+    names = path.split('.')
+    for name in names:
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f'Invalid attribute path {path!r}')
+    expression = f'obj.{names[0]}'
+    for depth, name in enumerate(names[1:]):
+        expression = f'(None if (_p{depth} := {expression}) is None else _p{depth}.{name})'
+    return expression
+
+
+EVENT = Serializer(
+    'id', 'title', 'description', 'party_name', 'location', 'latitude', 'longitude', 'event_date', 'created_at',
+)
+
+# Reads user_email, so takes read_models.RegistrationRow rather than EventRegistration
+REGISTRATION = Serializer(
+    'id', 'user_id', 'user_email', 'registered_at', 'attended', 'qr_scanned_at', 'latitude', 'longitude',
+)
+
+TICKET = Serializer(
+    'id', 'user_id', 'subject', 'message', 'status', 'created_at', 'resolved_at', 'admin_response',
+    assigned_to='assignment.admin_id',
+)
+
+NOTIFICATION = Serializer('id', 'title', 'message', 'is_read', 'created_at')
+
+
+def _default(o):
+    """Types the standard library's json cannot write; orjson handles most natively"""
+    if type(o) is datetime:  # by far the most common
+        return o.isoformat()
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider on orjson when available.  Keys are not sorted and
+    non-ASCII text is written as UTF-8; datetimes are ISO 8601 strings with
+    either backend (Flask's default writes HTTP dates).  Anything orjson
+    refuses, such as integers beyond 64 bits, is retried with json.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND') or 'auto'
+        if backend not in BACKENDS:
+            raise ValueError(f'JSON_BACKEND must be one of {", ".join(BACKENDS)}, not {backend!r}')
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError('JSON_BACKEND=orjson but orjson is not installed')
+        self.backend = 'json' if backend == 'json' or orjson is None else 'orjson'
+
+    def _orjson_options(self, kwargs):
+        """orjson options matching json.dumps kwargs, or None when only json can honour them"""
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        kwargs.pop('default', None)
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)  # Jinja's |tojson passes sort_keys=True
+        if kwargs.pop('ensure_ascii', False) or indent not in (None, 2) or kwargs:
+            return None
+        options = orjson.OPT_NON_STR_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps_bytes(self, obj, **kwargs):
+        """UTF-8 encoded JSON"""
+        if self.backend == 'orjson':
+            options = self._orjson_options(dict(kwargs))
+            if options is not None:
+                try:
+                    return orjson.dumps(obj, default=self.default, option=options)
+                except orjson.JSONEncodeError:
+                    pass
+        return self._dumps_json(obj, **kwargs).encode()
+
+    def dumps(self, obj, **kwargs):
+        if self.backend == 'orjson':
+            return self.dumps_bytes(obj, **kwargs).decode()
+        return self._dumps_json(obj, **kwargs)
+
+    def _dumps_json(self, obj, **kwargs):
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = self.dumps_bytes(obj, indent=2)
+        else:
+            body = self.dumps_bytes(obj, separators=(',', ':'))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,254 @@
+"""
+Server-side sessions with lazy expiry refresh.
+
+Flask's cookie sessions are re-signed and re-sent whenever they are
+modified, and the app used to mark every signed-in request modified to keep
+sessions alive, so each API call and location ping carried a Set-Cookie.
+Here the session data lives in the server_session table and the cookie
+holds only a signed "<id>.<revision>".  A response sets the cookie only when:
+
+- the session's contents changed (a new revision is written), or
+- at least SESSION_REFRESH_FRACTION of PERMANENT_SESSION_LIFETIME has passed
+  since the expiry was last extended (only expires_at is updated).
+
+An in-process LRU keyed by session id holds the serialized data of the
+revision it last saw, so most requests do not query the table.  The
+revision in the cookie is what makes the cache safe with several workers: a
+write in another process hands the browser a new revision, which misses the
+stale entry here.  Expired rows are deleted in batches of SESSION_GC_BATCH,
+at most every SESSION_GC_INTERVAL seconds per process, and by
+`python maintenance.py purge-sessions`.
+
+SESSION_STORE=cookie keeps Flask's signed-cookie sessions.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from political_events.extensions import db
+from political_events.models import ServerSession
+
+STORES = ('server', 'cookie')
+
+
+class Session(CallbackDict, SessionMixin):
+    """The session of one request, with the storage state it was loaded with"""
+
+    def __init__(self, initial=None, sid=None, revision=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.revision = revision
+        self.expires_at = expires_at
+        self.user_id = self.get('_user_id')  # who the session belonged to when loaded
+        self.modified = False
+        self.accessed = False
+
+
+class LRUCache:
+    """A thread-safe mapping that drops the least recently used key beyond maxsize"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ServerSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, cache_size=10000, refresh_fraction=0.25, gc_interval=300, gc_batch=1000):
+        if not 0 <= refresh_fraction <= 1:
+            raise ValueError('SESSION_REFRESH_FRACTION must be between 0 and 1')
+        self.cache = LRUCache(cache_size)  # sid -> (revision, serialized data, expires_at)
+        self.refresh_fraction = refresh_fraction
+        self.gc_interval = gc_interval
+        self.gc_batch = gc_batch
+        self._next_gc = time.monotonic() + gc_interval
+        self._gc_lock = threading.Lock()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-session')
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+        value = request.cookies.get(self.get_cookie_name(app))
+        if value:
+            try:
+                sid, revision = self._signer(app).unsign(value).decode().split('.')
+            except (BadSignature, UnicodeDecodeError, ValueError):
+                return Session()
+            record = self._load(sid, revision)
+            if record is not None:
+                revision, data, expires_at = record
+                return Session(self.serializer.loads(data), sid, revision, expires_at)
+        return Session()
+
+    def _load(self, sid, revision):
+        """(revision, data, expires_at) of a live session, from the cache when it holds this revision"""
+        record = self.cache.get(sid)
+        if record is None or record[0] != revision:
+            with db.engine.connect() as conn:
+                row = conn.execute(
+                    db.select(ServerSession.revision, ServerSession.data, ServerSession.expires_at)
+                    .where(ServerSession.id == sid)
+                ).first()
+            if row is None:
+                self.cache.pop(sid)
+                return None
+            record = tuple(row)  # the stored revision wins over an older cookie's
+            self.cache.set(sid, record)
+        if record[2] <= datetime.utcnow():
+            self.cache.pop(sid)
+            return None
+        return record
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.accessed:
+            response.vary.add('Cookie')
+        if not session:
+            if session.sid is not None:
+                self._delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app), httponly=self.get_cookie_httponly(app))
+            return
+
+        now = datetime.utcnow()
+        expires_at = now + app.permanent_session_lifetime
+        if session.sid is None or session.get('_user_id') != session.user_id:
+            # New session, or a sign-in / sign-out: never reuse an id across users
+            if session.sid is not None:
+                self._delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.revision = secrets.token_hex(4)
+            self._write(session, expires_at, insert=True)
+        elif session.modified:
+            session.revision = secrets.token_hex(4)
+            self._write(session, expires_at)
+        elif self._refresh_due(app, session, now):
+            self._write(session, expires_at, touch=True)
+        else:
+            self._collect_garbage()
+            return
+
+        response.set_cookie(
+            name, self._signer(app).sign(f'{session.sid}.{session.revision}').decode(),
+            expires=expires_at if session.permanent else None,
+            httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+            secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app),
+        )
+        self._collect_garbage()
+
+    def _write(self, session, expires_at, insert=False, touch=False):
+        """Store the session (only its expiry when touch) and cache what was stored"""
+        data = self.serializer.dumps(dict(session))
+        with db.engine.begin() as conn:
+            if not insert:
+                values = {'expires_at': expires_at} if touch else {
+                    'revision': session.revision, 'data': data, 'expires_at': expires_at,
+                }
+                updated = conn.execute(
+                    db.update(ServerSession).where(ServerSession.id == session.sid).values(**values)
+                ).rowcount
+                insert = not updated  # collected or signed out elsewhere meanwhile
+            if insert:
+                conn.execute(db.insert(ServerSession).values(
+                    id=session.sid, revision=session.revision, data=data, expires_at=expires_at,
+                ))
+        self.cache.set(session.sid, (session.revision, data, expires_at))
+
+    def _refresh_due(self, app, session, now):
+        lifetime = app.permanent_session_lifetime
+        elapsed = lifetime - (session.expires_at - now)
+        return elapsed >= lifetime * self.refresh_fraction
+
+    def _delete(self, sid):
+        self.cache.pop(sid)
+        with db.engine.begin() as conn:
+            conn.execute(db.delete(ServerSession).where(ServerSession.id == sid))
+
+    def _collect_garbage(self):
+        """Delete one batch of expired sessions, at most every gc_interval seconds per process"""
+        if time.monotonic() < self._next_gc or not self._gc_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_gc = time.monotonic() + self.gc_interval
+            purge_expired_sessions(chunk_size=self.gc_batch, max_chunks=1)
+        finally:
+            self._gc_lock.release()
+
+
+def purge_expired_sessions(chunk_size=1000, max_chunks=None):
+    """
+    Delete expired sessions chunk_size rows per transaction, stopping after
+    max_chunks chunks when given.  Returns rows deleted.
+    """
+    now = datetime.utcnow()
+    deleted = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        with db.engine.begin() as conn:
+            ids = conn.execute(
+                db.select(ServerSession.id).where(ServerSession.expires_at <= now).limit(chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            conn.execute(db.delete(ServerSession).where(ServerSession.id.in_(ids)))
+        deleted += len(ids)
+        chunks += 1
+    return deleted
+
+
+def init_app(app):
+    """Install the store selected by SESSION_STORE"""
+    store = app.config.get('SESSION_STORE') or 'server'
+    if store not in STORES:
+        raise ValueError(f'SESSION_STORE must be one of {", ".join(STORES)}, not {store!r}')
+    if store == 'server':
+        app.session_interface = ServerSessionInterface(
+            cache_size=app.config.get('SESSION_CACHE_SIZE', 10000),
+            refresh_fraction=app.config.get('SESSION_REFRESH_FRACTION', 0.25),
+            gc_interval=app.config.get('SESSION_GC_INTERVAL', 300),
+            gc_batch=app.config.get('SESSION_GC_BATCH', 1000),
+        )
@@ -0,0 +1,192 @@
+"""
+Support ticket queue: status transitions, assignment and full-text search.
+
+Status changes are set-based UPDATEs over the selected ids, so resolving
+or assigning a few hundred tickets is a couple of statements rather than a
+flush per row.  Search uses an SQLite FTS5 index over subject and message
+kept in sync by triggers; the update trigger only fires when the text
+columns change, so status transitions never touch the index.  Databases
+without FTS5 fall back to LIKE.
+"""
+
+import re
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from political_events.extensions import db
+from political_events.models import Ticket, TicketAssignment, User
+
+STATUSES = ('open', 'in_progress', 'resolved')
+
+SEARCH_TABLE = 'ticket_fts'
+
+_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        subject, message, content='ticket', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON ticket BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, subject, message) VALUES (new.id, new.subject, new.message);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON ticket BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, subject, message)
+        VALUES ('delete', old.id, old.subject, old.message);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE OF subject, message ON ticket BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, subject, message)
+        VALUES ('delete', old.id, old.subject, old.message);
+        INSERT INTO {SEARCH_TABLE}(rowid, subject, message) VALUES (new.id, new.subject, new.message);
+    END""",
+]
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# engine -> whether the FTS index exists there
+_search_available = {}
+
+
+def ensure_search_index():
+    """
+    Create the FTS5 index and its sync triggers if the database supports
+    them, populating it from existing tickets on first creation.
+    Returns True when full-text search is available.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        _search_available[engine] = False
+        return False
+    with engine.begin() as conn:
+        existed = conn.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': SEARCH_TABLE},
+        ).first() is not None
+        try:
+            for statement in _SEARCH_DDL:
+                conn.execute(db.text(statement))
+        except OperationalError:
+            # SQLite built without FTS5
+            _search_available[engine] = False
+            return False
+        if not existed:
+            conn.execute(db.text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+    _search_available[engine] = True
+    return True
+
+
+def search_available():
+    engine = db.engine
+    if engine not in _search_available:
+        if engine.dialect.name != 'sqlite':
+            _search_available[engine] = False
+        else:
+            _search_available[engine] = db.session.execute(
+                db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': SEARCH_TABLE},
+            ).first() is not None
+    return _search_available[engine]
+
+
+def match_expression(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    return ' '.join(f'"{term}"*' for term in _TERM_RE.findall(text))
+
+
+def apply_search(query, text):
+    """Restrict a select() over Ticket to tickets whose subject or message match text"""
+    if search_available():
+        expression = match_expression(text)
+        if not expression:
+            return query
+        matches = db.text(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match'
+        ).bindparams(match=expression).columns(rowid=db.Integer)
+        return query.where(Ticket.id.in_(matches))
+    pattern = f'%{text}%'
+    return query.where(db.or_(Ticket.subject.ilike(pattern), Ticket.message.ilike(pattern)))
+
+
+def queue_query(status=None, assignee=None, search=None):
+    """select() of tickets for a queue view; assignee is an admin id or 'unassigned'"""
+    query = db.select(Ticket)
+    if status in STATUSES:
+        query = query.where(Ticket.status == status)
+    if assignee == 'unassigned':
+        query = query.where(~db.exists().where(TicketAssignment.ticket_id == Ticket.id))
+    elif assignee is not None:
+        query = query.where(Ticket.id.in_(
+            db.select(TicketAssignment.ticket_id).where(TicketAssignment.admin_id == assignee)
+        ))
+    if search:
+        query = apply_search(query, search)
+    return query
+
+
+def queue_counts():
+    """Ticket count per status, from one GROUP BY over the status index"""
+    counts = dict(db.session.execute(
+        db.select(Ticket.status, db.func.count()).group_by(Ticket.status)
+    ).all())
+    return {status: counts.get(status, 0) for status in STATUSES}
+
+
+def _count_open(ticket_ids):
+    return db.session.execute(
+        db.select(db.func.count()).select_from(Ticket)
+        .where(Ticket.id.in_(ticket_ids), Ticket.status == 'open')
+    ).scalar()
+
+
+def resolve_tickets(ticket_ids, response=None):
+    """
+    Resolve the given unresolved tickets.  Returns (resolved, were_open) so
+    callers can adjust the open-ticket counter.  The caller commits.
+    """
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids:
+        return 0, 0
+    were_open = _count_open(ticket_ids)
+    resolved = db.session.execute(
+        db.update(Ticket)
+        .where(Ticket.id.in_(ticket_ids), Ticket.status != 'resolved')
+        .values(status='resolved', admin_response=response, resolved_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    return resolved, were_open
+
+
+def assign_tickets(ticket_ids, admin_id):
+    """
+    Assign tickets to an admin, moving open ones to in_progress.  Returns
+    (assigned, were_open).  The caller commits.
+    """
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids:
+        return 0, 0
+    existing = set(db.session.execute(
+        db.select(Ticket.id).where(Ticket.id.in_(ticket_ids))
+    ).scalars())
+    if not existing:
+        return 0, 0
+    now = datetime.utcnow()
+    db.session.execute(
+        db.delete(TicketAssignment).where(TicketAssignment.ticket_id.in_(existing)),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.execute(db.insert(TicketAssignment), [
+        {'ticket_id': ticket_id, 'admin_id': admin_id, 'assigned_at': now} for ticket_id in existing
+    ])
+    were_open = db.session.execute(
+        db.update(Ticket)
+        .where(Ticket.id.in_(existing), Ticket.status == 'open')
+        .values(status='in_progress'),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    return len(existing), were_open
+
+
+def admin_choices():
+    """(id, email) of every admin, for the assignment picker"""
+    return db.session.execute(
+        db.select(User.id, User.email).where(User.role == 'admin').order_by(User.email)
+    ).all()
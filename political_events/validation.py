@@ -0,0 +1,364 @@
+"""
+Input validation shared by the forms, the JSON APIs and the bulk imports.
+
+Patterns are compiled once at import, sanitize() strips the dangerous
+characters in a single regular expression pass, and personal email domains are
+a frozenset.  A Schema is a tuple of Fields (required message, length
+limits, conversion, checks) plus row checks across fields; it is built
+once and reused for every record:
+
+    result = SIGNUP.validate(request.form)
+    if result.missing: ...                      # names of empty required fields
+    if result.errors: ...                       # {field: [message, ...]}
+    result.values                               # cleaned and converted
+
+validate_many() checks a whole batch of import rows in one call.
+benchmarks/validation.py compares it with the previous per-row helpers.
+"""
+
+import re
+from datetime import datetime
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+NON_DIGITS = re.compile(r'\D')
+UPPERCASE = re.compile(r'[A-Z]')
+LOWERCASE = re.compile(r'[a-z]')
+DIGIT = re.compile(r'\d')
+SPECIAL = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+
+# Removed by sanitize()
+UNSAFE_CHARACTERS = re.compile(r'[<>"\'&;(){}\[\]]')
+
+PERSONAL_EMAIL_DOMAINS = frozenset(('gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com', 'icloud.com'))
+
+DATE_FORMATS = ('%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S')
+FORM_DATE_FORMAT = '%Y-%m-%dT%H:%M'  # <input type="datetime-local">
+
+ROW = '_row'  # errors key for records that are not objects at all
+
+
+def is_email(value):
+    return EMAIL_PATTERN.fullmatch(value) is not None
+
+
+def phone_digits(value):
+    return NON_DIGITS.sub('', value)
+
+
+def is_phone(value):
+    """Ten digits, ignoring spaces, dashes and brackets"""
+    return len(phone_digits(value)) == 10
+
+
+def password_problem(password):
+    """Why password is too weak, or None"""
+    if len(password) < 8:
+        return 'Password must be at least 8 characters long'
+    if not UPPERCASE.search(password):
+        return 'Password must contain at least one uppercase letter'
+    if not LOWERCASE.search(password):
+        return 'Password must contain at least one lowercase letter'
+    if not DIGIT.search(password):
+        return 'Password must contain at least one number'
+    if not SPECIAL.search(password):
+        return 'Password must contain at least one special character'
+    return None
+
+
+def sanitize(text):
+    """Drop characters used in markup and script injection, and surrounding whitespace"""
+    if not text:
+        return ''
+    return UNSAFE_CHARACTERS.sub('', text).strip()
+
+
+def is_personal_email(email):
+    return email.rpartition('@')[2].lower() in PERSONAL_EMAIL_DOMAINS
+
+
+def parse_event_date(value):
+    if isinstance(value, datetime):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def rule(predicate, message):
+    """A Field check failing with message when predicate(value) is false"""
+    def check(value):
+        return None if predicate(value) else message
+    return check
+
+
+class Field:
+    """
+    One input field.  Its value is taken from the record, stripped (unless
+    strip=False) and lower-cased when lower=True; strings only, unless
+    text=False.  Then, stopping at the first error: required, max_length,
+    convert (any exception becomes convert's message) and checks,
+    callables returning an error message or None.  sanitize=True passes
+    the valid value through sanitize().
+    """
+
+    __slots__ = ('name', 'required', 'default', 'text', 'strip', 'lower', 'max_length', 'convert', 'checks',
+                 'sanitize')
+
+    def __init__(self, name, required=None, default='', text=True, strip=True, lower=False, max_length=None,
+                 convert=None, checks=(), sanitize=False):
+        self.name = name
+        self.required = required  # message when empty, or None if optional
+        self.default = default  # value when empty; a callable gets the context
+        self.text = text
+        self.strip = strip
+        self.lower = lower
+        self.max_length = max_length  # (length, message)
+        self.convert = convert  # (callable, message)
+        self.checks = tuple(checks)
+        self.sanitize = sanitize
+
+
+class Result:
+    """Cleaned values, {field: [messages]} and the empty required fields of one record"""
+
+    __slots__ = ('values', 'errors', 'missing')
+
+    def __init__(self, values, errors, missing):
+        self.values = values
+        self.errors = errors
+        self.missing = missing
+
+    def __bool__(self):
+        return not self.errors
+
+    def messages(self):
+        """Every error message, in field order"""
+        return [message for messages in self.errors.values() for message in messages]
+
+    def first_error(self):
+        for messages in self.errors.values():
+            return messages[0]
+        return None
+
+
+class Schema:
+    """
+    Fields plus row checks, check(values, add, context), run after the
+    fields to validate combinations; add(field, message) records an error
+    and a check may also adjust values.  Context keyword arguments given to
+    validate() (such as now) are passed through to defaults and row checks.
+    """
+
+    def __init__(self, *fields, checks=()):
+        self.fields = fields
+        self.checks = tuple(checks)
+        # Field attributes unpacked once, so validate() reads locals rather than slots
+        self._plan = tuple(
+            (field.name, field.required, field.default, field.text, field.strip, field.lower, field.max_length,
+             field.convert, field.checks, field.sanitize)
+            for field in fields
+        )
+
+    def validate(self, record, **context):
+        if not hasattr(record, 'get'):
+            message = f'Invalid JSON: {record}' if isinstance(record, Exception) else 'Row is not an object'
+            return Result(None, {ROW: [message]}, [])
+
+        get = record.get
+        values, errors, missing = {}, {}, []
+        for name, required, default, text, strip, lower, max_length, convert, checks, clean in self._plan:
+            value = get(name)
+            if value is None:
+                value = ''
+            elif text and type(value) is not str:
+                value = str(value)
+            if isinstance(value, str):  # text=False keeps numbers and datetimes as given
+                if strip:
+                    value = value.strip()
+                if lower:
+                    value = value.lower()
+            if value == '':
+                if required:
+                    missing.append(name)
+                    errors[name] = [required]
+                values[name] = default(context) if callable(default) else default
+                continue
+
+            error = None
+            if max_length and len(value) > max_length[0]:
+                error = max_length[1]
+            elif convert:
+                try:
+                    value = convert[0](value)
+                except (TypeError, ValueError, OverflowError):
+                    error = convert[1]
+            if error is None:
+                for check in checks:
+                    error = check(value)
+                    if error:
+                        break
+            if error:
+                errors[name] = [error]
+            elif clean:
+                value = sanitize(value)
+            values[name] = value
+
+        if self.checks:
+            def add(name, message):
+                errors.setdefault(name, []).append(message)
+            for check in self.checks:
+                check(values, add, context)
+        return Result(values, errors, missing)
+
+    def validate_many(self, records, **context):
+        """A Result per record, in order"""
+        validate = self.validate
+        return [validate(record, **context) for record in records]
+
+
+def _float(value):
+    if isinstance(value, bool):
+        raise TypeError('not a number')
+    return float(value)
+
+
+def _in_range(low, high, message):
+    return rule(lambda value: low <= value <= high, message)
+
+
+# Forms
+
+LOGIN = Schema(
+    Field('email', required='Email and password are required', lower=True,
+          checks=[rule(is_email, 'Please enter a valid email address')], sanitize=True),
+    Field('password', required='Email and password are required', strip=False),
+)
+
+
+def _signup_checks(values, add, context):
+    if values['password'] and values['confirmPassword'] and values['password'] != values['confirmPassword']:
+        add('confirmPassword', 'Passwords do not match')
+    if values['role'] == 'party':
+        party_name = values['party_name']
+        if not party_name:
+            add('party_name', 'Party name is required for political party registration')
+        elif len(party_name) < 3:
+            add('party_name', 'Party name must be at least 3 characters long')
+        elif len(party_name) > 100:
+            add('party_name', 'Party name must be less than 100 characters')
+        elif values['email'] and is_personal_email(values['email']):
+            add('email', 'Political parties cannot use personal email addresses (Gmail, Yahoo, etc.). '
+                         'Please use a business email.')
+    values['party_name'] = sanitize(values['party_name']) or None
+
+
+SIGNUP = Schema(
+    Field('email', required='Email is required', lower=True,
+          checks=[rule(is_email, 'Please enter a valid email address')], sanitize=True),
+    # Stored as digits only, as USER_ROW does, so duplicates match however they were typed
+    Field('phone', required='Phone number is required',
+          convert=(phone_digits, 'Please enter a valid 10-digit phone number'),
+          checks=[rule(lambda digits: len(digits) == 10, 'Please enter a valid 10-digit phone number')]),
+    Field('password', required='Password is required', strip=False, checks=[password_problem]),
+    Field('confirmPassword', required='Password confirmation is required', strip=False),
+    Field('role', default='user', strip=False, checks=[rule(('user', 'party').__contains__, 'Invalid role selected')]),
+    Field('party_name'),
+    checks=[_signup_checks],
+)
+
+
+def _in_future(message):
+    """A row check that event_date (when valid) is after context['now']"""
+    def check(values, add, context):
+        if isinstance(values['event_date'], datetime) and values['event_date'] <= context['now']:
+            add('event_date', message)
+    return check
+
+
+EVENT_FORM = Schema(
+    Field('title', required='All fields are required'),
+    Field('description', required='All fields are required'),
+    Field('location', required='All fields are required'),
+    Field('latitude', required='All fields are required', convert=(_float, 'Invalid data provided')),
+    Field('longitude', required='All fields are required', convert=(_float, 'Invalid data provided')),
+    Field('event_date', required='All fields are required',
+          convert=(lambda value: datetime.strptime(value, FORM_DATE_FORMAT), 'Invalid data provided')),
+    Field('capacity', default=None, convert=(int, 'Capacity must be a positive number (leave empty for unlimited)'),
+          checks=[rule(lambda value: value >= 1, 'Capacity must be a positive number (leave empty for unlimited)')]),
+    checks=[_in_future('Event date must be in the future')],
+)
+
+# JSON APIs
+
+LOCATION = Schema(
+    Field('latitude', required='latitude is required', text=False, default=None,
+          convert=(_float, 'latitude must be a number'),
+          checks=[_in_range(-90, 90, 'latitude must be between -90 and 90')]),
+    Field('longitude', required='longitude is required', text=False, default=None,
+          convert=(_float, 'longitude must be a number'),
+          checks=[_in_range(-180, 180, 'longitude must be between -180 and 180')]),
+)
+
+# Bulk imports; row errors are reported as flat message lists
+
+PROVISION_ROLES = ('user', 'party')
+
+
+def _user_row_checks(values, add, context):
+    if values['role'] == 'party':
+        if not 3 <= len(values['party_name']) <= 100:
+            add('party_name', 'party_name must be 3-100 characters for party accounts')
+        if values['email'] and is_personal_email(values['email']):
+            add('email', 'Party accounts cannot use personal email addresses (Gmail, Yahoo, etc.)')
+    values['party_name'] = sanitize(values['party_name']) if values['role'] == 'party' else None
+
+
+USER_ROW = Schema(
+    Field('email', required='A valid email is required', lower=True,
+          checks=[rule(is_email, 'A valid email is required')], sanitize=True),
+    Field('phone', default=None, convert=(phone_digits, 'Phone must have 10 digits'),
+          checks=[rule(lambda digits: len(digits) == 10, 'Phone must have 10 digits')]),
+    Field('password', strip=False, checks=[password_problem]),
+    Field('role', lower=True, default=lambda context: context.get('default_role', 'user'),
+          checks=[rule(PROVISION_ROLES.__contains__, f"role must be one of {', '.join(PROVISION_ROLES)}")]),
+    Field('party_name'),
+    checks=[_user_row_checks],
+)
+
+
+def _coordinates(values, add, context):
+    latitude, longitude = values['latitude'], values['longitude']
+    values['latitude'] = values['longitude'] = None
+    if latitude == '' and longitude == '':
+        return  # left for the geocoder
+    try:
+        latitude, longitude = _float(latitude), _float(longitude)
+    except (TypeError, ValueError):
+        add('latitude', 'latitude and longitude must both be numbers')
+        return
+    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+        add('latitude', 'latitude/longitude out of range')
+    values['latitude'], values['longitude'] = latitude, longitude
+
+
+def _parsed_event_date(value):
+    parsed = parse_event_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+EVENT_ROW = Schema(
+    Field('title', required='title is required', max_length=(200, 'title must be at most 200 characters')),
+    Field('description', required='description is required'),
+    Field('location', required='location is required', max_length=(200, 'location must be at most 200 characters')),
+    Field('event_date', required='event_date is required', text=False,
+          convert=(_parsed_event_date, 'event_date must look like YYYY-MM-DDTHH:MM')),
+    Field('latitude', text=False),
+    Field('longitude', text=False),
+    checks=[_in_future('event_date must be in the future'), _coordinates],
+)
+
@@ -0,0 +1,1266 @@
+"""
+HTTP views for the Political Events Platform.
+
+Views are collected with the module-level @route decorator and attached to an
+application by init_app(), which keeps endpoint names (url_for('login'), ...)
+unchanged from the original single-module app.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import (
+    current_app, render_template, request, redirect, url_for, flash, jsonify, session,
+    Response, send_from_directory, stream_with_context,
+)
+from flask_login import login_user, login_required, logout_user, current_user
+from sqlalchemy.orm import joinedload
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from political_events import live_stats
+from political_events.extensions import db, realtime
+from political_events import (
+    archive, checkin, drafts, geo_stats, images, location_trail, map_points, read_models, rollups,
+    serializers, validation,
+)
+from political_events import registrations as seating
+from political_events.checkin import make_token, verify_token, attendance_queue, event_owners
+from political_events.geocoding import get_geocoder
+from political_events.importer import import_events, detect_format
+from political_events.invitations import AUDIENCES, MAX_RADIUS_KM, run_invitation_job, job_progress
+from political_events.jobs import run_in_background
+from political_events.notifications import (
+    push_to_users, inbox_page, mark_read, unread_count, DEFAULT_PAGE_SIZE,
+)
+from political_events.provisioning import provision_users, iter_users_csv, iter_users_jsonl
+from political_events.helpers import format_date, format_datetime, generate_qr_code
+from political_events.models import (
+    User, Event, EventRegistration, Ticket, InvitationJob, ArchivedEvent, ArchivedRegistration, EventSummary,
+    EventCapacity, TicketAssignment,
+)
+from political_events import tickets as ticket_queue
+from political_events.pagination import paginate_from_args, apply_date_range
+from political_events.query_guard import query_budget
+
+# Sortable columns for the paginated admin lists
+ADMIN_USER_SORTS = {'created_at': User.created_at, 'email': User.email}
+ADMIN_EVENT_SORTS = {'event_date': Event.event_date, 'created_at': Event.created_at, 'title': Event.title}
+ADMIN_TICKET_SORTS = {'created_at': Ticket.created_at, 'status': Ticket.status}
+ARCHIVE_SORTS = {'event_date': EventSummary.event_date, 'attendees': EventSummary.attendees}
+
+# Registrations embedded in the party dashboard's events_data
+DASHBOARD_REGISTRATION = serializers.REGISTRATION.only(
+    'id', 'user_email', 'latitude', 'longitude', 'attended', 'registered_at', defaults={'user_email': 'Unknown'},
+)
+
+_routes = []
+
+
+def route(rule, **options):
+    """Register a view function to be attached to the app in init_app()"""
+    def decorator(f):
+        _routes.append((rule, f, options))
+        return f
+    return decorator
+
+
+def init_app(app):
+    """Attach views, filters, hooks and error handlers to app"""
+    for rule, view_func, options in _routes:
+        app.add_url_rule(rule, view_func=view_func, **options)
+    
+    app.add_template_filter(format_date, 'format_date')
+    app.add_template_filter(format_datetime, 'format_datetime')
+    app.context_processor(inject_config)
+    app.before_request(before_request)
+    app.register_error_handler(404, not_found_error)
+    app.register_error_handler(500, internal_error)
+
+
+def _registration_counts(column, ids):
+    """Map each id to its number of registrations with one grouped query"""
+    if not ids:
+        return {}
+    rows = db.session.execute(
+        db.select(column, db.func.count(EventRegistration.id)).where(column.in_(ids)).group_by(column)
+    ).all()
+    return dict(rows)
+
+# Context processor to make config available in templates
+def inject_config():
+    return dict(
+        config=current_app.config,
+        realtime_enabled=realtime.enabled,
+        # Called from base.html only for signed-in users: one primary-key lookup
+        unread_notifications=lambda: unread_count(current_user.id),
+    )
+
+def before_request():
+    """Keep signed-in users' sessions permanent; the session store extends their expiry"""
+    if current_user.is_authenticated and not session.permanent:
+        session.permanent = True
+
+# Health Check Route
+@route('/health')
+def health_check():
+    """Health check endpoint for deployment monitoring."""
+    try:
+        # Test database connection
+        db.session.execute(db.text('SELECT 1'))
+        return jsonify({
+            'status': 'healthy',
+            'database': 'connected',
+            'timestamp': datetime.utcnow().isoformat()
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'unhealthy',
+            'database': 'disconnected',
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }), 500
+
+# Main Routes
+@route('/')
+def index():
+    if current_user.is_authenticated:
+        if current_user.role == 'admin':
+            return redirect(url_for('admin_dashboard'))
+        elif current_user.role == 'party':
+            return redirect(url_for('party_dashboard'))
+        else:
+            return redirect(url_for('user_dashboard'))
+    return render_template('index.html')
+
+@route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        form = validation.LOGIN.validate(request.form)
+        if form.errors:
+            flash(form.first_error(), 'error')
+            return render_template('login.html')
+        email, password = form.values['email'], form.values['password']
+        
+        # Rate limiting check (simple implementation)
+        if 'login_attempts' not in session:
+            session['login_attempts'] = 0
+            session['last_attempt'] = datetime.utcnow()
+        
+        # Check if too many attempts
+        if session['login_attempts'] >= 5:
+            time_diff = datetime.utcnow() - session['last_attempt'].replace(tzinfo=None)
+            if time_diff.total_seconds() < 300:  # 5 minutes lockout
+                flash('Too many login attempts. Please try again in 5 minutes.', 'error')
+                return render_template('login.html')
+            else:
+                # Reset attempts after lockout period
+                session['login_attempts'] = 0
+        
+        # User authentication
+        user = User.query.filter_by(email=email).first()
+        
+        if not user or not check_password_hash(user.password_hash, password):
+            session['login_attempts'] = session.get('login_attempts', 0) + 1
+            session['last_attempt'] = datetime.utcnow()
+            
+            if session['login_attempts'] >= 3:
+                flash(f'Invalid credentials. {5 - session["login_attempts"]} attempts remaining before lockout.', 'error')
+            else:
+                flash('Invalid email or password', 'error')
+            return render_template('login.html')
+        
+        # Successful login - reset attempts
+        session['login_attempts'] = 0
+        session.pop('last_attempt', None)
+        
+        # Make session permanent for persistence across deployments
+        session.permanent = True
+        
+        login_user(user, remember=True)  # Enable remember me functionality
+        flash(f'Welcome back, {user.email}!', 'success')
+        
+        # Redirect based on role
+        if user.role == 'admin':
+            return redirect(url_for('admin_dashboard'))
+        elif user.role == 'party':
+            return redirect(url_for('party_dashboard'))
+        else:
+            return redirect(url_for('user_dashboard'))
+    
+    return render_template('login.html')
+
+@route('/signup', methods=['GET', 'POST'])
+def signup():
+    if request.method == 'POST':
+        form = validation.SIGNUP.validate(request.form)
+        if form.missing:
+            flash('Please fill in all required fields', 'error')
+            return render_template('signup.html')
+        if form.errors:
+            flash(form.first_error(), 'error')
+            return render_template('signup.html')
+        
+        # Sanitized values
+        email, phone, password = form.values['email'], form.values['phone'], form.values['password']
+        role, party_name = form.values['role'], form.values['party_name']
+        
+        # Check for existing user by email
+        if User.query.filter_by(email=email).first():
+            flash('Email already registered', 'error')
+            return render_template('signup.html')
+        
+        # Check for existing user by phone
+        if User.query.filter_by(phone=phone).first():
+            flash('Phone number already registered', 'error')
+            return render_template('signup.html')
+        
+        # Create user
+        try:
+            user = User(
+                email=email,
+                phone=phone,
+                password_hash=generate_password_hash(password),
+                role=role,
+                party_name=party_name,
+                is_business_email=(role == 'party')
+            )
+            
+            db.session.add(user)
+            db.session.commit()
+            live_stats.users_created(parties=int(role == 'party'))
+            
+            # Automatically log in the new user with persistent session
+            session.permanent = True
+            login_user(user, remember=True)
+            
+            flash('Registration successful! Welcome to Political Events!', 'success')
+            
+            # Redirect based on role
+            if user.role == 'party':
+                return redirect(url_for('party_dashboard'))
+            else:
+                return redirect(url_for('user_dashboard'))
+            
+        except Exception as e:
+            db.session.rollback()
+            flash('Registration failed. Please try again.', 'error')
+            return render_template('signup.html')
+    
+    return render_template('signup.html')
+
+@route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Logged out successfully', 'success')
+    return redirect(url_for('index'))
+
+# Admin Routes
+@route('/admin/dashboard')
+@query_budget(11)
+@login_required
+def admin_dashboard():
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    # All counters in one round trip
+    stats = live_stats.load_snapshot('admin')
+    
+    recent_events = Event.query.order_by(Event.created_at.desc(), Event.id.desc()).limit(5).all()
+    recent_users = User.query.order_by(User.created_at.desc(), User.id.desc()).limit(5).all()
+    open_tickets = (Ticket.query.options(joinedload(Ticket.user))
+                    .filter_by(status='open')
+                    .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+                    .limit(5).all())
+    
+    return render_template('admin/dashboard.html', stats=stats, recent_events=recent_events,
+                           recent_users=recent_users, open_tickets=open_tickets)
+
+@route('/admin/events')
+@query_budget(8)
+@login_required
+def admin_events():
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    query = db.select(Event)
+    if request.args.get('party'):
+        query = query.where(Event.party_name == request.args['party'])
+    if request.args.get('status') in ('active', 'inactive'):
+        query = query.where(Event.is_active.is_(request.args['status'] == 'active'))
+    if request.args.get('q'):
+        query = query.where(Event.title.ilike(f"%{request.args['q']}%"))
+    query = apply_date_range(query, Event.event_date, request.args)
+    
+    events = paginate_from_args(query, request.args, ADMIN_EVENT_SORTS, 'event_date', Event.id)
+    registration_counts = _registration_counts(EventRegistration.event_id, [event.id for event in events])
+    parties = db.session.execute(db.select(Event.party_name).distinct().order_by(Event.party_name)).scalars().all()
+    
+    return render_template('admin/events.html', events=events, registration_counts=registration_counts,
+                           parties=parties)
+
+@route('/admin/users')
+@query_budget(7)
+@login_required
+def admin_users():
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    query = db.select(User)
+    if request.args.get('role') in ('admin', 'party', 'user'):
+        query = query.where(User.role == request.args['role'])
+    if request.args.get('party'):
+        query = query.where(User.party_name == request.args['party'])
+    if request.args.get('q'):
+        query = query.where(User.email.ilike(f"%{request.args['q']}%"))
+    query = apply_date_range(query, User.created_at, request.args)
+    
+    users = paginate_from_args(query, request.args, ADMIN_USER_SORTS, 'created_at', User.id)
+    registration_counts = _registration_counts(EventRegistration.user_id, [user.id for user in users])
+    
+    return render_template('admin/users.html', users=users, registration_counts=registration_counts)
+
+@route('/admin/users/import', methods=['POST'])
+@login_required
+def admin_import_users():
+    """Bulk-provision users from an uploaded CSV / JSON / JSON Lines file"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'An import file is required'}), 400
+    
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    try:
+        report = provision_users(
+            upload.stream,
+            fmt,
+            default_role=request.form.get('role', 'user'),
+            batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    live_stats.users_created(report.created, parties=report.created_parties)
+    return jsonify(report.to_dict(include_passwords=True)), 200 if report.created or not report.errors else 422
+
+@route('/admin/users/export')
+@login_required
+def admin_export_users():
+    """Stream all users as CSV (default) or JSON Lines"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    role = request.args.get('role') or None
+    if request.args.get('format') == 'jsonl':
+        body, mimetype, extension = iter_users_jsonl(role), 'application/x-ndjson', 'jsonl'
+    else:
+        body, mimetype, extension = iter_users_csv(role), 'text/csv', 'csv'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=users.{extension}'},
+    )
+
+@route('/admin/tickets')
+@query_budget(8)
+@login_required
+def admin_tickets():
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    assignee = request.args.get('assignee')
+    if assignee == 'me':
+        assignee = current_user.id
+    elif assignee != 'unassigned':
+        assignee = request.args.get('assignee', type=int)
+    
+    query = ticket_queue.queue_query(
+        status=request.args.get('status'),
+        assignee=assignee,
+        search=request.args.get('q', '').strip(),
+    ).options(joinedload(Ticket.user), joinedload(Ticket.assignment).joinedload(TicketAssignment.admin))
+    query = apply_date_range(query, Ticket.created_at, request.args)
+    
+    tickets = paginate_from_args(query, request.args, ADMIN_TICKET_SORTS, 'created_at', Ticket.id)
+    return render_template('admin/tickets.html', tickets=tickets,
+                           queue_counts=ticket_queue.queue_counts(),
+                           admins=ticket_queue.admin_choices())
+
+@route('/admin/tickets/bulk', methods=['POST'])
+@login_required
+def bulk_update_tickets():
+    """Resolve or assign many tickets at once (form post from the queue, or JSON)"""
+    if current_user.role != 'admin':
+        if request.is_json:
+            return jsonify({'error': 'Access denied'}), 403
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    data = request.get_json(silent=True) if request.is_json else request.form
+    data = data or {}
+    raw_ids = data.get('ticket_ids') if request.is_json else request.form.getlist('ticket_ids')
+    try:
+        ticket_ids = [int(value) for value in (raw_ids or [])]
+        assignee_id = int(data['assignee_id']) if data.get('assignee_id') else current_user.id
+    except (TypeError, ValueError):
+        ticket_ids, assignee_id = [], None
+    action = data.get('action')
+    
+    error = None
+    if not ticket_ids:
+        error = 'Select at least one ticket'
+    elif action not in ('resolve', 'assign'):
+        error = 'Unknown action'
+    elif action == 'assign' and not db.session.execute(
+        db.select(User.id).where(User.id == assignee_id, User.role == 'admin')
+    ).first():
+        error = 'Tickets can only be assigned to admins'
+    if error:
+        if request.is_json:
+            return jsonify({'error': error}), 400
+        flash(error, 'error')
+        return redirect(request.referrer or url_for('admin_tickets'))
+    
+    if action == 'resolve':
+        changed, were_open = ticket_queue.resolve_tickets(ticket_ids, data.get('response') or None)
+        message = f'{changed} tickets resolved'
+    else:
+        changed, were_open = ticket_queue.assign_tickets(ticket_ids, assignee_id)
+        message = f'{changed} tickets assigned'
+    db.session.commit()
+    if were_open:
+        live_stats.open_tickets_changed(-were_open)
+    
+    if request.is_json:
+        return jsonify({'action': action, 'updated': changed})
+    flash(message, 'success')
+    return redirect(request.referrer or url_for('admin_tickets'))
+
+@route('/admin/ticket/<int:ticket_id>/resolve', methods=['POST'])
+@login_required
+def resolve_ticket(ticket_id):
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    ticket = Ticket.query.get_or_404(ticket_id)
+    response = request.form.get('response')
+    was_open = ticket.status == 'open'
+    
+    ticket.status = 'resolved'
+    ticket.admin_response = response
+    ticket.resolved_at = datetime.utcnow()
+    
+    db.session.commit()
+    if was_open:
+        live_stats.open_tickets_changed(-1)
+    
+    flash('Ticket resolved successfully!', 'success')
+    return redirect(url_for('admin_tickets'))
+
+# Political Party Routes
+@route('/party/dashboard')
+@query_budget(10)
+@login_required
+def party_dashboard():
+    if current_user.role != 'party':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    events = read_models.party_events(current_user.id)
+    registrations = read_models.registrations_by_event([event.id for event in events])
+    
+    # Convert events to serializable format for JavaScript
+    events_data = []
+    for event in events:
+        event_data = serializers.EVENT(event)
+        event_data['registrations'] = DASHBOARD_REGISTRATION.many(registrations[event.id])
+        events_data.append(event_data)
+    
+    stats = live_stats.load_snapshot(f'party:{current_user.id}')
+    return render_template('party/dashboard.html', events=events, events_data=events_data,
+                           registrations=registrations, stats=stats, now=datetime.utcnow())
+
+@route('/party/create_event', methods=['GET', 'POST'])
+@login_required
+def create_event():
+    if current_user.role != 'party':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    if request.method == 'POST':
+        form = validation.EVENT_FORM.validate(request.form, now=datetime.utcnow())
+        if form.errors:
+            flash('All fields are required' if form.missing else form.first_error(), 'error')
+            return render_template('party/create_event.html')
+        title, description, location = form.values['title'], form.values['description'], form.values['location']
+        latitude, longitude = form.values['latitude'], form.values['longitude']
+        event_date, capacity = form.values['event_date'], form.values['capacity']
+        
+        # Generate QR code
+        qr_code = generate_qr_code(f"event_{datetime.utcnow().timestamp()}")
+        
+        # Create event
+        event = Event(
+            title=title,
+            description=description,
+            party_name=current_user.party_name,
+            party_id=current_user.id,
+            location=location,
+            latitude=latitude,
+            longitude=longitude,
+            event_date=event_date,
+            qr_code=qr_code
+        )
+        
+        db.session.add(event)
+        if capacity:
+            db.session.flush()
+            db.session.add(EventCapacity(event_id=event.id, capacity=capacity, reserved=0))
+        draft = drafts.get_draft(request.form.get('draft_id', ''), current_user.id)
+        if draft:
+            db.session.delete(draft)
+        db.session.commit()
+        live_stats.events_created(current_user.id)
+        
+        flash('Event created successfully!', 'success')
+        return redirect(url_for('party_dashboard'))
+    
+    ttl_hours = current_app.config['EVENT_DRAFT_TTL_HOURS']
+    if request.args.get('draft'):
+        draft = drafts.get_draft(request.args['draft'], current_user.id, ttl_hours)
+    elif request.args.get('new'):
+        draft = None
+    else:
+        draft = drafts.latest_draft(current_user.id, ttl_hours)
+    return render_template('party/create_event.html', draft=drafts.serialize_draft(draft) if draft else None)
+
+@route('/party/drafts', methods=['POST'])
+@login_required
+def create_event_draft():
+    """Start a server-side create_event draft with the fields filled so far"""
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        draft = drafts.create_draft(current_user.id, data.get('changes'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(drafts.serialize_draft(draft)), 201
+
+@route('/party/drafts/<draft_id>', methods=['GET', 'PATCH', 'DELETE'])
+@login_required
+def event_draft(draft_id):
+    """Read a draft, merge changed fields into it, or discard it"""
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    draft = drafts.get_draft(draft_id, current_user.id, current_app.config['EVENT_DRAFT_TTL_HOURS'])
+    if draft is None:
+        return jsonify({'error': 'Draft not found'}), 404
+    
+    if request.method == 'DELETE':
+        db.session.delete(draft)
+        db.session.commit()
+        return '', 204
+    if request.method == 'PATCH':
+        data = request.get_json(silent=True) or {}
+        try:
+            drafts.patch_draft(draft, data.get('changes'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'id': draft.id, 'version': draft.version, 'updated_at': draft.updated_at.isoformat()})
+    return jsonify(drafts.serialize_draft(draft))
+
+@route('/party/drafts/<draft_id>/promote', methods=['POST'])
+@login_required
+def promote_event_draft(draft_id):
+    """Create the event from the stored draft, so submit needs no form upload"""
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    draft = drafts.get_draft(draft_id, current_user.id, current_app.config['EVENT_DRAFT_TTL_HOURS'])
+    if draft is None:
+        return jsonify({'error': 'Draft not found'}), 404
+    
+    event, errors = drafts.promote_draft(draft, current_user, get_geocoder(current_app.config))
+    if errors:
+        return jsonify({'errors': errors}), 422
+    live_stats.events_created(current_user.id)
+    
+    flash('Event created successfully!', 'success')
+    return jsonify({'event_id': event.id, 'redirect': url_for('party_dashboard')}), 201
+
+@route('/party/events/import', methods=['POST'])
+@login_required
+def import_party_events():
+    """Bulk-create events from an uploaded CSV / JSON / JSON Lines file"""
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'An import file is required'}), 400
+    
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    try:
+        report = import_events(
+            upload.stream,
+            fmt,
+            current_user,
+            geocoder=get_geocoder(current_app.config),
+            batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+            qr_workers=current_app.config['IMPORT_QR_WORKERS'],
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    live_stats.events_created(current_user.id, len(report.created_ids))
+    return jsonify(report.to_dict()), 200 if report.created_ids or not report.errors else 422
+
+@route('/party/event/<int:event_id>/invitations', methods=['POST'])
+@login_required
+def create_invitations(event_id):
+    """Queue a background invitation fan-out for one of the party's events"""
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or request.form
+    audience = data.get('audience', 'past_registrants')
+    if audience not in AUDIENCES:
+        return jsonify({'error': f"audience must be one of {', '.join(AUDIENCES)}"}), 400
+    
+    radius_km = None
+    if audience == 'radius':
+        try:
+            radius_km = float(data.get('radius_km', 0))
+        except (TypeError, ValueError):
+            radius_km = 0
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            return jsonify({'error': f'radius_km must be between 0 and {MAX_RADIUS_KM}'}), 400
+    
+    message = (data.get('message') or '').strip() or None
+    job = InvitationJob(
+        party_id=current_user.id,
+        event_id=event.id,
+        audience=audience,
+        radius_km=radius_km,
+        message=validation.sanitize(message) if message else None
+    )
+    db.session.add(job)
+    db.session.commit()
+    
+    run_in_background(current_app._get_current_object(), run_invitation_job, job.id,
+                      current_app.config['INVITATION_BATCH_SIZE'])
+    return jsonify(job_progress(job)), 202
+
+@route('/party/invitations/<int:job_id>')
+@login_required
+def invitation_status(job_id):
+    """Progress of an invitation fan-out"""
+    job = InvitationJob.query.get_or_404(job_id)
+    if job.party_id != current_user.id and current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(job_progress(job))
+
+@route('/party/event/<int:event_id>')
+@query_budget(10)
+@login_required
+def party_event_detail(event_id):
+    if current_user.role != 'party':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    event = Event.query.get_or_404(event_id)
+    if event.party_id != current_user.id:
+        flash('Access denied', 'error')
+        return redirect(url_for('party_dashboard'))
+    
+    registrations = (EventRegistration.query.filter_by(event_id=event_id)
+                     .options(joinedload(EventRegistration.user)).all())
+    return render_template('party/event_detail.html', event=event, registrations=registrations,
+                           seats=seating.seats(event_id), event_images=images.event_images(event_id))
+
+@route('/party/event/<int:event_id>/images', methods=['POST'])
+@login_required
+def upload_event_image(event_id):
+    """Add an image to an event, sent as the raw request body (streamed to disk) or an 'image' form field"""
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if request.mimetype.startswith('multipart/'):
+        upload = request.files.get('image')
+        if upload is None:
+            return jsonify({'error': 'No image uploaded'}), 400
+        stream = upload.stream
+    else:
+        stream = request.stream
+    
+    app = current_app._get_current_object()
+    try:
+        image, new_blob = images.add_event_image(event_id, current_user.id, stream, app)
+        db.session.commit()
+    except ValueError as exc:
+        db.session.rollback()
+        return jsonify({'error': str(exc)}), 400
+    if new_blob:
+        images.schedule_render(app, image.sha256)
+    
+    return jsonify({'id': image.id, 'images': images.event_images(event_id)}), 201
+
+@route('/party/event/<int:event_id>/images/<int:image_id>', methods=['DELETE'])
+@login_required
+def delete_event_image(event_id, image_id):
+    if current_user.role != 'party':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if not images.remove_event_image(event_id, image_id):
+        return jsonify({'error': 'Image not found'}), 404
+    db.session.commit()
+    return jsonify({'images': images.event_images(event_id)})
+
+@route('/party/event/<int:event_id>/capacity', methods=['POST'])
+@login_required
+def set_event_capacity(event_id):
+    """Set or clear an event's seat limit; new seats are filled from the waitlist"""
+    if current_user.role != 'party':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    event = Event.query.get_or_404(event_id)
+    if event.party_id != current_user.id:
+        flash('Access denied', 'error')
+        return redirect(url_for('party_dashboard'))
+    
+    value = request.form.get('capacity', '').strip()
+    try:
+        capacity = int(value) if value else None
+    except ValueError:
+        capacity = 0
+    if capacity is not None and capacity < 1:
+        flash('Capacity must be a positive number (leave empty for unlimited)', 'error')
+        return redirect(url_for('party_event_detail', event_id=event_id))
+    
+    promoted = seating.set_capacity(event_id, capacity)
+    for user_id in promoted:
+        live_stats.registration_created(event.party_id, user_id)
+    push_to_users(promoted, 'notification', {'title': f'You are in: {event.title}', 'event_id': event_id})
+    
+    flash(f'Capacity updated; {len(promoted)} waitlisted attendees promoted' if promoted else 'Capacity updated', 'success')
+    return redirect(url_for('party_event_detail', event_id=event_id))
+
+@route('/party/archive')
+@query_budget(7)
+@login_required
+def event_archive():
+    """Read-only list of archived events with their attendance summaries"""
+    if current_user.role not in ['admin', 'party']:
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    party_id = current_user.id if current_user.role == 'party' else request.args.get('party_id', type=int)
+    query = apply_date_range(archive.summary_query(party_id), EventSummary.event_date, request.args)
+    summaries = paginate_from_args(query, request.args, ARCHIVE_SORTS, 'event_date', EventSummary.event_id)
+    return render_template('party/archive.html', summaries=summaries, totals=archive.summary_totals(party_id))
+
+@route('/party/archive/<int:event_id>')
+@login_required
+def archived_event_detail(event_id):
+    """Read-only view of an archived event and its registrations"""
+    if current_user.role not in ['admin', 'party']:
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    event = ArchivedEvent.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        flash('Access denied', 'error')
+        return redirect(url_for('event_archive'))
+    
+    summary = db.session.get(EventSummary, event_id)
+    registrations = (ArchivedRegistration.query.options(joinedload(ArchivedRegistration.user))
+                     .filter_by(event_id=event_id).order_by(ArchivedRegistration.registered_at).all())
+    return render_template('party/archived_event.html', event=event, summary=summary, registrations=registrations)
+
+@route('/party/event/<int:event_id>/map')
+@query_budget(6)
+@login_required
+def party_event_map(event_id):
+    """Show map page for a specific event"""
+    if current_user.role != 'party':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    event = Event.query.get_or_404(event_id)
+    if event.party_id != current_user.id:
+        flash('Access denied', 'error')
+        return redirect(url_for('party_dashboard'))
+    
+    registrations = read_models.event_registrations(event_id)
+    return render_template('party/event_map.html', event=event, registrations=registrations)
+
+# User Routes
+@route('/user/dashboard')
+@query_budget(9)
+@login_required
+def user_dashboard():
+    if current_user.role != 'user':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    events = Event.query.filter(Event.event_date > datetime.utcnow()).all()
+    user_registrations = EventRegistration.query.filter_by(user_id=current_user.id).all()
+    registered_event_ids = [reg.event_id for reg in user_registrations]
+    stats = {
+        'upcoming_events': len(events),
+        'registered': len(user_registrations),
+        'attended': sum(1 for reg in user_registrations if reg.attended),
+    }
+    
+    return render_template('user/dashboard.html', events=events, registered_event_ids=registered_event_ids,
+                           stats=stats, covers=images.covers([event.id for event in events]))
+
+@route('/user/event/<int:event_id>')
+@query_budget(11)
+@login_required
+def user_event_detail(event_id):
+    if current_user.role != 'user':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    event = Event.query.get_or_404(event_id)
+    registration = EventRegistration.query.filter_by(
+        user_id=current_user.id, 
+        event_id=event_id
+    ).first()
+    is_registered = registration is not None
+    
+    checkin_qr = None
+    if registration:
+        checkin_qr = generate_qr_code(make_token(current_app.config, registration.id, event_id, current_user.id,
+                                                 checkin.token_expiry(current_app.config, event.event_date)))
+    
+    return render_template('user/event_detail.html', event=event, is_registered=is_registered,
+                           checkin_qr=checkin_qr, seats=seating.seats(event_id, current_user.id),
+                           event_images=images.event_images(event_id))
+
+@route('/user/my-events')
+@query_budget(5)
+@login_required
+def user_my_events():
+    """Show all events the user is registered for"""
+    if current_user.role != 'user':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    rows = db.session.execute(
+        db.select(EventRegistration, Event).join(Event, Event.id == EventRegistration.event_id)
+        .where(EventRegistration.user_id == current_user.id)
+        .order_by(Event.event_date)  # upcoming first
+    ).all()
+    now = datetime.utcnow()
+    registered_events = [
+        {'event': event, 'registration': registration, 'is_past': event.event_date < now}
+        for registration, event in rows
+    ]
+    
+    return render_template('user/my_events.html', registered_events=registered_events)
+
+JOIN_MESSAGES = {
+    seating.REGISTERED: ('Successfully registered for event! Your personal check-in code is on the event page.', 'success'),
+    seating.WAITLISTED: ('This event is full, so you have been added to the waitlist.', 'info'),
+    seating.ALREADY_REGISTERED: ('Already registered for this event', 'info'),
+    seating.ALREADY_WAITLISTED: ('You are already on the waitlist for this event', 'info'),
+}
+
+@route('/user/join_event/<int:event_id>', methods=['POST'])
+@login_required
+def join_event(event_id):
+    """Register for an event (or join its waitlist); also accepts JSON with an Idempotency-Key header"""
+    wants_json = request.is_json
+    
+    def fail(message, code):
+        if wants_json:
+            return jsonify({'error': message}), code
+        flash(message, 'error')
+        return redirect(url_for('user_event_detail', event_id=event_id) if code == 400 else url_for('index'))
+    
+    if current_user.role != 'user':
+        return fail('Access denied', 403)
+    
+    event = Event.query.get_or_404(event_id)
+    
+    # Get location from request
+    data = (request.get_json(silent=True) or {}) if wants_json else request.form
+    position = validation.LOCATION.validate(data)
+    latitude, longitude = position.values['latitude'], position.values['longitude']
+    
+    # Missing, or 0,0 from a browser that refused to locate
+    if position.missing or (not position.errors and latitude == 0.0 and longitude == 0.0):
+        return fail('Location access is required to register for this event. Please enable location access and try again.', 400)
+    if position.errors:
+        return fail('Invalid location coordinates. Please try getting your location again.', 400)
+    
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    result = seating.join_event(event_id, current_user.id, latitude, longitude, idempotency_key)
+    
+    if result.status == seating.REGISTERED and not result.replayed:
+        live_stats.registration_created(event.party_id, current_user.id)
+    
+    if wants_json:
+        return jsonify({'status': result.status, 'replayed': result.replayed, 'event_id': event_id}), \
+            201 if result.status == seating.REGISTERED and not result.replayed else 200
+    message, category = JOIN_MESSAGES[result.status]
+    flash(message, category)
+    if result.status in (seating.WAITLISTED, seating.ALREADY_WAITLISTED):
+        return redirect(url_for('user_event_detail', event_id=event_id))
+    return redirect(url_for('user_dashboard'))
+
+@route('/user/event/<int:event_id>/cancel', methods=['POST'])
+@login_required
+def cancel_registration(event_id):
+    """Withdraw from an event or its waitlist; a freed seat goes to the next waitlisted user"""
+    if current_user.role != 'user':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    
+    event = Event.query.get_or_404(event_id)
+    cancelled, promoted, attended = seating.cancel(event_id, current_user.id)
+    if not cancelled:
+        flash('You are not registered for this event', 'info')
+        return redirect(url_for('user_event_detail', event_id=event_id))
+    
+    live_stats.registration_removed(event.party_id, current_user.id, attended)
+    for user_id in promoted:
+        live_stats.registration_created(event.party_id, user_id)
+    push_to_users(promoted, 'notification', {'title': f'You are in: {event.title}', 'event_id': event_id})
+    flash('Your registration has been cancelled', 'success')
+    return redirect(url_for('user_event_detail', event_id=event_id))
+
+@route('/party/event/<int:event_id>/checkin', methods=['POST'])
+@login_required
+def checkin_attendee(event_id):
+    """Venue scanner: admit an attendee by their signed check-in token; the write is batched"""
+    if current_user.role != 'party' or event_owners.get(event_id) != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    claim = verify_token(current_app.config, data.get('token'))
+    if claim is None:
+        return jsonify({'status': 'invalid'}), 400
+    if claim.event_id != event_id:
+        return jsonify({'status': 'wrong_event', 'event_id': claim.event_id}), 409
+    if checkin.is_expired(claim):
+        return jsonify({'status': 'expired', 'registration_id': claim.registration_id}), 410
+    
+    attended = checkin.registration_state(claim)
+    if attended is None:
+        return jsonify({'status': 'not_registered', 'registration_id': claim.registration_id}), 404
+    if attended or not attendance_queue.append(claim):
+        return jsonify({'status': 'already_checked_in', 'registration_id': claim.registration_id})
+    attendance_queue.start(current_app._get_current_object())
+    if len(attendance_queue) >= current_app.config['CHECKIN_FLUSH_BATCH_SIZE']:
+        attendance_queue.wake()
+    
+    realtime.emit('attendance_update', {
+        'event_id': event_id,
+        'user_id': claim.user_id,
+        'attended': True
+    }, room=f'event_{event_id}')
+    return jsonify({'status': 'checked_in', 'registration_id': claim.registration_id, 'user_id': claim.user_id})
+
+# Ticket Routes
+@route('/tickets')
+@query_budget(6)
+@login_required
+def tickets():
+    """Support tickets page for users"""
+    if current_user.role == 'admin':
+        return redirect(url_for('admin_tickets'))
+    
+    user_tickets = (Ticket.query.filter_by(user_id=current_user.id)
+                    .order_by(Ticket.created_at.desc()).all())
+    return render_template('tickets.html', tickets=user_tickets)
+
+@route('/create_ticket', methods=['GET', 'POST'])
+@login_required
+def create_ticket():
+    """Create a new support ticket"""
+    if request.method == 'POST':
+        subject = request.form.get('subject', '').strip()
+        message = request.form.get('message', '').strip()
+        
+        if not subject or not message:
+            flash('Subject and message are required', 'error')
+            return render_template('create_ticket.html')
+        
+        ticket = Ticket(
+            user_id=current_user.id,
+            subject=subject,
+            message=message
+        )
+        
+        db.session.add(ticket)
+        db.session.commit()
+        live_stats.open_tickets_changed(1)
+        
+        flash('Support ticket created successfully!', 'success')
+        return redirect(url_for('tickets'))
+    
+    return render_template('create_ticket.html')
+
+# API Routes
+@route('/api/events')
+@query_budget(3)
+def api_events():
+    return jsonify(serializers.EVENT.many(read_models.upcoming_events()))
+
+@route('/api/event/<int:event_id>/registrations')
+@query_budget(4)
+@login_required
+def api_event_registrations(event_id):
+    if current_user.role not in ['admin', 'party']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify(serializers.REGISTRATION.many(read_models.event_registrations(event_id)))
+
+@route('/api/user/location', methods=['POST'])
+@login_required
+def update_user_location():
+    position = validation.LOCATION.validate(request.get_json(silent=True) or {})
+    if position.errors:
+        return jsonify({'error': 'Invalid location', 'fields': position.errors}), 400
+    
+    now = datetime.utcnow()
+    current_user.latitude = position.values['latitude']
+    current_user.longitude = position.values['longitude']
+    current_user.location_updated_at = now
+    location_trail.record_point(current_user.id, position.values['latitude'], position.values['longitude'], now)
+    
+    db.session.commit()
+    
+    return jsonify({'success': True})
+
+@route('/api/user/location/trail')
+@query_budget(3)
+@login_required
+def api_user_location_trail():
+    """The signed-in user's trail over ?since= / ?until= (default the last day) at ?resolution= seconds"""
+    now = datetime.utcnow()
+    try:
+        since, until, resolution = location_trail.parse_window(request.args, now - timedelta(days=1), now)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    
+    points = location_trail.user_trail(current_user.id, since, until, resolution)
+    return jsonify({'user_id': current_user.id, 'since': since, 'until': until, 'resolution': resolution,
+                    'points': points})
+
+@route('/api/event/<int:event_id>/trails')
+@query_budget(4)
+@login_required
+def api_event_trails(event_id):
+    """Registrants' trails around an event, by default from three hours before its start to three after"""
+    if current_user.role not in ['admin', 'party']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    try:
+        since, until, resolution = location_trail.parse_window(
+            request.args, event.event_date - location_trail.EVENT_WINDOW, event.event_date + location_trail.EVENT_WINDOW,
+        )
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    
+    trails = location_trail.event_trails(event_id, since, until, resolution)
+    return jsonify({'event_id': event_id, 'since': since, 'until': until, 'resolution': resolution,
+                    'trails': [{'user_id': user_id, 'points': points} for user_id, points in trails.items()]})
+
+@route('/api/event/<int:event_id>/analytics')
+@query_budget(5)
+@login_required
+def api_event_analytics(event_id):
+    """Registrations and check-ins per ?granularity= minute, hour or day, between optional ?since= / ?until="""
+    if current_user.role not in ['admin', 'party']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    granularity = request.args.get('granularity', 'hour')
+    if granularity not in rollups.PERIODS:
+        return jsonify({'error': f"granularity must be one of {', '.join(rollups.PERIODS)}"}), 400
+    try:
+        since = location_trail.parse_moment(request.args['since']) if request.args.get('since') else None
+        until = location_trail.parse_moment(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO 8601 dates or Unix seconds'}), 400
+    
+    return jsonify({
+        'event_id': event_id,
+        'granularity': granularity,
+        'totals': rollups.totals(event_id),
+        'series': rollups.series(event_id, granularity, since, until),
+    })
+
+@route('/api/event/<int:event_id>/geo_stats')
+@query_budget(4)
+@login_required
+def api_event_geo_stats(event_id):
+    """Distance percentiles, rings, sectors, catchment and hotspots of an event's registrants"""
+    if current_user.role not in ['admin', 'party']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify(geo_stats.event_stats(event))
+
+@route('/api/event/<int:event_id>/points')
+@query_budget(4)
+@login_required
+def api_event_points(event_id):
+    """Marker positions of an event's registrations, ?format=polyline (default) or float32 (binary)"""
+    if current_user.role not in ['admin', 'party']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    encoding = request.args.get('format', 'polyline')
+    if encoding not in map_points.ENCODINGS:
+        return jsonify({'error': f"format must be one of {', '.join(map_points.ENCODINGS)}"}), 400
+    
+    etag, count, payload = map_points.event_points(event_id, encoding)
+    if encoding == 'float32':
+        response = Response(payload, mimetype='application/octet-stream')
+    else:
+        response = jsonify({'event_id': event_id, 'count': count, 'encoding': encoding,
+                            'fields': list(map_points.FIELDS), 'points': payload})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@route('/api/event/<int:event_id>/registrations/<int:registration_id>')
+@query_budget(3)
+@login_required
+def api_event_registration(event_id, registration_id):
+    """One registration's details, loaded when its map marker is opened"""
+    if current_user.role not in ['admin', 'party']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    event = Event.query.get_or_404(event_id)
+    if current_user.role == 'party' and event.party_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    registration = read_models.registration(event_id, registration_id)
+    if registration is None:
+        return jsonify({'error': 'Registration not found'}), 404
+    return jsonify(serializers.REGISTRATION(registration))
+
+@route('/api/event/<int:event_id>/images')
+@query_budget(3)
+@login_required
+def api_event_images(event_id):
+    """An event's images in display order, with original and WebP variant URLs"""
+    Event.query.get_or_404(event_id)
+    return jsonify({'event_id': event_id, 'images': images.event_images(event_id)})
+
+@route('/images/<sha256>/<name>')
+def image_file(sha256, name):
+    """A stored image or variant; its URL names its content, so browsers may cache it for good"""
+    if not images.SHA256_PATTERN.fullmatch(sha256) or name not in images.FILE_NAMES:
+        return jsonify({'error': 'Not found'}), 404
+    directory = images.blob_directory(images.storage_root(current_app), sha256)
+    response = send_from_directory(directory, name, max_age=31536000)
+    response.headers['Cache-Control'] = images.CACHE_CONTROL
+    return response
+
+@route('/api/ticket/<int:ticket_id>')
+@query_budget(3)
+@login_required
+def api_ticket(ticket_id):
+    """A single ticket, for its owner or an admin"""
+    ticket = Ticket.query.options(joinedload(Ticket.assignment)).filter_by(id=ticket_id).first_or_404()
+    if current_user.role != 'admin' and ticket.user_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(serializers.TICKET(ticket))
+
+# Notification inbox
+@route('/api/notifications')
+@query_budget(5)  # a user's first call also counts and stores their unread counter
+@login_required
+def api_notifications():
+    """Newest-first inbox page; pass next_cursor back as ?cursor= for the next one"""
+    before_id = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    unread_only = request.args.get('unread') in ('1', 'true')
+    
+    items, next_cursor = inbox_page(current_user.id, before_id=before_id, limit=limit, unread_only=unread_only)
+    return jsonify({
+        'notifications': serializers.NOTIFICATION.many(items),
+        'next_cursor': next_cursor,
+        'unread_count': unread_count(current_user.id),
+    })
+
+@route('/api/notifications/unread_count')
+@login_required
+def api_notifications_unread_count():
+    return jsonify({'unread_count': unread_count(current_user.id)})
+
+@route('/api/notifications/mark_read', methods=['POST'])
+@login_required
+def api_notifications_mark_read():
+    """Mark read by explicit ids, by id range (from_id/to_id), or everything"""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    from_id = data.get('from_id')
+    to_id = data.get('to_id')
+    try:
+        if ids is not None:
+            if not isinstance(ids, list):
+                raise ValueError
+            ids = [int(value) for value in ids]
+        from_id = int(from_id) if from_id is not None else None
+        to_id = int(to_id) if to_id is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'ids must be a list of integers; from_id/to_id must be integers'}), 400
+    
+    changed = mark_read(current_user.id, ids=ids, from_id=from_id, to_id=to_id)
+    return jsonify({'marked': changed, 'unread_count': unread_count(current_user.id)})
+
+# Error Handlers
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+def internal_error(error):
+    db.session.rollback()
+    return render_template('errors/500.html'), 500
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Bulk User Provisioning Script for Political Events App
+Creates user accounts from a CSV, JSON or JSON Lines file, or exports them.
+
+Usage:
+    python provision_users.py import volunteers.csv
+    python provision_users.py import volunteers.csv --role user --passwords-out passwords.json
+    python provision_users.py export users.csv [--role party] [--format jsonl]
+
+Import fields: email, phone (10 digits), password (optional - a random one is
+generated when missing), role (user/party), party_name (party accounts).
+"""
+
+import argparse
+import json
+import sys
+
+def run_import(app, args):
+    from political_events.importer import detect_format
+    from political_events.provisioning import provision_users
+    
+    with app.app_context(), open(args.file, 'rb') as fh:
+        report = provision_users(
+            fh,
+            args.format or detect_format(args.file),
+            default_role=args.role,
+            batch_size=args.batch_size or app.config['IMPORT_BATCH_SIZE'],
+            hash_workers=args.workers,
+        )
+    
+    result = report.to_dict(include_passwords=True)
+    print(f"✅ Created {result['created']} of {result['total']} users")
+    if result['generated_passwords']:
+        if args.passwords_out:
+            with open(args.passwords_out, 'w') as fh:
+                json.dump(result['generated_passwords'], fh, indent=2)
+            print(f"🔑 Generated passwords written to {args.passwords_out}")
+        else:
+            print(f"🔑 {len(result['generated_passwords'])} passwords generated (use --passwords-out to save them)")
+    if result['errors']:
+        print(f"⚠️  {result['failed']} rows rejected:")
+        for error in result['errors']:
+            print(f"   row {error['row']}: {'; '.join(error['errors'])}")
+        sys.exit(2 if not result['created'] else 0)
+
+def run_export(app, args):
+    from political_events.provisioning import iter_users_csv, iter_users_jsonl
+    
+    export = iter_users_jsonl if args.format == 'jsonl' else iter_users_csv
+    with app.app_context(), open(args.file, 'w', newline='') as fh:
+        for chunk in export(args.role):
+            fh.write(chunk)
+    print(f"✅ Users exported to {args.file}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk provision or export user accounts')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    import_parser = subparsers.add_parser('import', help='create users from a file')
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=['csv', 'json', 'jsonl'])
+    import_parser.add_argument('--role', default='user', help='role for rows without one')
+    import_parser.add_argument('--batch-size', type=int)
+    import_parser.add_argument('--workers', type=int, help='password hashing threads (default: CPU count)')
+    import_parser.add_argument('--passwords-out', help='write generated passwords to this JSON file')
+    
+    export_parser = subparsers.add_parser('export', help='write users to a file')
+    export_parser.add_argument('file')
+    export_parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    export_parser.add_argument('--role', help='only export this role')
+    
+    args = parser.parse_args()
+    
+    from political_events import create_app
+    app = create_app()
+    if args.command == 'import':
+        run_import(app, args)
+    else:
+        run_export(app, args)
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,7 @@ def check_database():
         print("📊 Database not found, initializing...")
         try:
             import init_db
+            init_db.init_database()
             print("✅ Database initialized successfully")
         except Exception as e:
             print(f"❌ Failed to initialize database: {e}")
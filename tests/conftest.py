@@ -0,0 +1,28 @@
+"""
+Fixtures for the test suite.
+
+Each test gets a fresh in-memory database under TestingConfig, so the
+query budgets and the lazy-load guard raise.  Clients are signed in by
+writing the Flask-Login session directly, as the benchmarks do; rows are
+made with the helpers in factories.py.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    from config import TestingConfig
+    from political_events import checkin, create_app
+    from political_events.extensions import db
+    
+    # Ids start again in every test database
+    checkin.event_owners.clear()
+    checkin.event_rosters.clear()
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
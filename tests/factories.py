@@ -0,0 +1,44 @@
+"""Helpers that add rows for tests; call them inside an app context, except sign_in()"""
+
+import itertools
+from datetime import datetime, timedelta
+
+from political_events.extensions import db
+from political_events.models import Event, EventRegistration, User
+
+_numbers = itertools.count(1)
+
+
+def sign_in(app, user_id):
+    """A test client signed in as user_id; make requests outside any app context"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def add_user(role='user', email=None, **values):
+    user = User(email=email or f'{role}{next(_numbers)}@example.org', password_hash='x', role=role,
+                party_name='Test Party' if role == 'party' else None, **values)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_event(party, days=7, **values):
+    """An event of party's days from now (negative for past events)"""
+    event = Event(title=values.pop('title', 'Rally'), description='A test event', party_name=party.party_name,
+                  party_id=party.id, location='Bengaluru', latitude=12.9716, longitude=77.5946,
+                  event_date=datetime.utcnow() + timedelta(days=days), qr_code='x', **values)
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def add_registration(event, user, latitude=12.95, longitude=77.6, **values):
+    registration = EventRegistration(event_id=event.id, user_id=user.id, latitude=latitude, longitude=longitude,
+                                     **values)
+    db.session.add(registration)
+    db.session.commit()
+    return registration
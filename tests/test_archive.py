@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from factories import add_event, add_registration, add_user
+from political_events import archive, checkin, rollups
+from political_events.extensions import db
+from political_events.models import (
+    ArchivedEvent, ArchivedRegistration, Event, EventActivityRollup, EventImage, EventRegistration, ImageBlob,
+)
+
+
+def _archivable_event(party, user):
+    event = add_event(party, days=-200)
+    registration = add_registration(event, user, attended=True, qr_scanned_at=datetime.utcnow())
+    rollups.registered(event.id, datetime.utcnow())
+    db.session.add(ImageBlob(sha256='a' * 64, extension='png', content_type='image/png', size=1, width=1,
+                             height=1, status='ready'))
+    db.session.add(EventImage(event_id=event.id, sha256='a' * 64, position=0, uploaded_by=party.id))
+    db.session.commit()
+    return event.id, registration.id
+
+
+def test_archive_then_new_event_then_archive_again(app):
+    with app.app_context():
+        party, user = add_user('party'), add_user()
+        event_id, registration_id = _archivable_event(party, user)
+        token_claim = checkin.CheckinClaim(registration_id, event_id, user.id, 0)
+
+        assert archive.archive_events(older_than_days=90) == {'events': 1, 'registrations': 1}
+
+        # The archived event was the newest; its id must not be handed out again
+        newer = add_event(party, days=-150)
+        newer_registration = add_registration(newer, user)
+        assert newer.id > event_id
+        assert newer_registration.id > registration_id
+        assert not rollups.totals(newer.id)['registrations']
+        assert db.session.execute(db.select(EventImage.id).where(EventImage.event_id == newer.id)).first() is None
+        assert checkin.registration_state(token_claim) is None
+
+        assert archive.archive_events(older_than_days=90) == {'events': 1, 'registrations': 1}
+        assert db.session.execute(db.select(db.func.count(ArchivedEvent.id))).scalar() == 2
+        assert db.session.execute(db.select(db.func.count(ArchivedRegistration.id))).scalar() == 2
+        assert db.session.execute(db.select(db.func.count(Event.id))).scalar() == 0
+        assert db.session.execute(db.select(db.func.count(EventRegistration.id))).scalar() == 0
+
+
+def test_archive_drops_rollups_and_image_links(app):
+    with app.app_context():
+        party, user = add_user('party'), add_user()
+        event_id, _ = _archivable_event(party, user)
+        current_id = add_event(party).id
+        rollups.registered(current_id, datetime.utcnow())
+        db.session.commit()
+
+        archive.archive_events(older_than_days=90)
+
+        remaining = db.session.execute(db.select(EventActivityRollup.event_id).distinct()).scalars().all()
+        assert remaining == [current_id]
+        assert db.session.execute(db.select(EventImage.id).where(EventImage.event_id == event_id)).first() is None
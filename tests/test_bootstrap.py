@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from sqlalchemy.schema import CreateTable
+
+from factories import add_event, add_registration, add_user
+from political_events import archive, bootstrap
+from political_events.extensions import db
+from political_events.models import Event, EventImage, EventRegistration
+
+
+def _use_pre_autoincrement_tables():
+    """Recreate the AUTOINCREMENT tables as databases from before this series have them"""
+    with db.engine.begin() as conn:
+        for table in (EventImage.__table__, EventRegistration.__table__, Event.__table__):
+            table.drop(conn)
+        for table in (Event.__table__, EventRegistration.__table__, EventImage.__table__):
+            create = str(CreateTable(table).compile(dialect=conn.dialect))
+            conn.exec_driver_sql(create.replace(' AUTOINCREMENT', ''))
+
+
+def _table_sql(name):
+    return db.session.execute(
+        db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}
+    ).scalar()
+
+
+def test_upgraded_database_never_reuses_archived_ids(app):
+    with app.app_context():
+        _use_pre_autoincrement_tables()
+        party, user = add_user('party'), add_user()
+        current = add_event(party)
+        current_registration_id = add_registration(current, user, attended=True).id
+        past = add_event(party, days=-200)
+        add_registration(past, user, qr_scanned_at=datetime.utcnow())
+        current_id, past_id = current.id, past.id
+        assert archive.archive_events(older_than_days=90) == {'events': 1, 'registrations': 1}
+
+        result = bootstrap.bootstrap()
+
+        assert result['created_tables']
+        for table in ('event', 'event_registration', 'event_image'):
+            assert 'AUTOINCREMENT' in _table_sql(table)
+        kept = db.session.get(EventRegistration, current_registration_id)
+        assert (kept.event_id, kept.user_id, kept.attended) == (current_id, user.id, True)
+        with db.engine.connect() as conn:
+            assert 'uq_event_registration_event_id_user_id' in {
+                index['name'] for index in db.inspect(conn).get_indexes('event_registration')
+            }
+
+        # The archived event and registration had the highest ids
+        newer = add_event(party, days=-150)
+        newer_registration = add_registration(newer, user)
+        assert newer.id > past_id
+        assert newer_registration.id > current_registration_id + 1
+        assert archive.archive_events(older_than_days=90) == {'events': 1, 'registrations': 1}
+        assert bootstrap.ensure_autoincrement() == []
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from factories import add_event, add_registration, add_user, sign_in
+from political_events import checkin, registrations
+from political_events.extensions import db
+from political_events.models import EventRegistration
+
+
+@pytest.fixture
+def venue(app, monkeypatch):
+    """A party's event with two registrants and their check-in tokens; scans are flushed by the test"""
+    monkeypatch.setattr(checkin.attendance_queue, 'start', lambda app: None)
+    with app.app_context():
+        party, first, second = add_user('party'), add_user(), add_user()
+        event = add_event(party)
+        tokens = [
+            checkin.make_token(app.config, add_registration(event, user).id, event.id, user.id,
+                               checkin.token_expiry(app.config, event.event_date))
+            for user in (first, second)
+        ]
+        ids = {'event': event.id, 'party': party.id, 'second': second.id, 'tokens': tokens}
+    yield ids
+    with app.app_context():
+        checkin.attendance_queue.flush()
+
+
+@contextmanager
+def count_queries(app):
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa_event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        sa_event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_attendees_cannot_mark_their_own_attendance(app):
+    with app.app_context():
+        party, user = add_user('party'), add_user()
+        event = add_event(party)
+        registration_id = add_registration(event, user).id
+        event_id, user_id = event.id, user.id
+
+    response = sign_in(app, user_id).post(f'/user/scan_qr/{event_id}')
+
+    assert response.status_code == 404
+    with app.app_context():
+        assert not db.session.get(EventRegistration, registration_id).attended
+
+
+def test_scans_stay_off_the_database(app, venue):
+    scanner = sign_in(app, venue['party'])
+    url = f"/party/event/{venue['event']}/checkin"
+    first, second = venue['tokens']
+    assert scanner.post(url, json={'token': first}).get_json()['status'] == 'checked_in'
+
+    with count_queries(app) as statements:
+        assert scanner.post(url, json={'token': second}).get_json()['status'] == 'checked_in'
+        assert scanner.post(url, json={'token': second}).get_json()['status'] == 'already_checked_in'
+    assert [statement for statement in statements if 'event_registration' in statement] == []
+
+
+def test_cancelled_and_admitted_registrations_are_answered_from_the_roster(app, venue):
+    scanner = sign_in(app, venue['party'])
+    url = f"/party/event/{venue['event']}/checkin"
+    first, second = venue['tokens']
+    assert scanner.post(url, json={'token': first}).status_code == 200
+    with app.app_context():
+        checkin.attendance_queue.flush()
+        registrations.cancel(venue['event'], venue['second'])
+
+    with count_queries(app) as statements:
+        response = scanner.post(url, json={'token': second})
+        assert (response.status_code, response.get_json()['status']) == (404, 'not_registered')
+        assert scanner.post(url, json={'token': first}).get_json()['status'] == 'already_checked_in'
+    assert [statement for statement in statements if 'event_registration' in statement] == []
@@ -0,0 +1,60 @@
+import io
+from datetime import datetime, timedelta
+
+from factories import add_event, add_user
+from political_events import images
+from political_events.extensions import db
+from political_events.models import EventImage, ImageBlob
+
+OLD = datetime.utcnow() - timedelta(days=30)
+
+
+def _blob(sha256, event_id, uploaded_by):
+    db.session.add(ImageBlob(sha256=sha256, extension='png', content_type='image/png', size=1, width=1, height=1,
+                             status='ready', created_at=OLD))
+    db.session.add(EventImage(event_id=event_id, sha256=sha256, position=0, uploaded_by=uploaded_by))
+    db.session.commit()
+    return db.session.execute(db.select(EventImage.id).where(EventImage.sha256 == sha256)).scalar()
+
+
+def test_grace_period_counts_from_unlinking(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    with app.app_context():
+        party = add_user('party')
+        event_id = add_event(party).id
+        recent = _blob('c' * 64, event_id, party.id)
+        stale = _blob('d' * 64, event_id, party.id)
+        images.remove_event_image(event_id, recent)
+        images.remove_event_image(event_id, stale)
+        db.session.execute(db.update(ImageBlob).where(ImageBlob.sha256 == 'd' * 64).values(unlinked_at=OLD))
+        db.session.commit()
+
+        # Both blobs were stored a month ago; only the one unlinked a month ago goes
+        assert images.prune_images(grace_hours=24) == {'rendered': 0, 'deleted': 1}
+        assert db.session.execute(db.select(ImageBlob.sha256)).scalars().all() == ['c' * 64]
+
+
+def test_uploading_again_clears_unlinked_at(app, tmp_path):
+    from PIL import Image
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    picture = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(picture, 'PNG')
+    with app.app_context():
+        party = add_user('party')
+        event_id = add_event(party).id
+        image, new_blob = images.add_event_image(event_id, party.id, io.BytesIO(picture.getvalue()), app)
+        db.session.commit()
+        image_id, sha256 = image.id, image.sha256
+        assert new_blob
+        images.remove_event_image(event_id, image_id)
+        db.session.commit()
+        assert db.session.get(ImageBlob, sha256).unlinked_at is not None
+
+        again, new_blob = images.add_event_image(event_id, party.id, io.BytesIO(picture.getvalue()), app)
+        db.session.commit()
+        db.session.expire_all()
+        assert not new_blob
+        assert db.session.get(ImageBlob, sha256).unlinked_at is None
+        # A stale DELETE .../images/<image_id> cannot reach the new link
+        assert again.id > image_id
@@ -0,0 +1,30 @@
+from factories import add_event, add_registration, add_user
+from political_events import archive, invitations
+from political_events.extensions import db
+from political_events.models import InvitationJob, Notification
+
+
+def test_past_registrants_include_archived_events(app):
+    with app.app_context():
+        party, other_party = add_user('party'), add_user('party')
+        archived_only, current_only, both, registered, elsewhere = (add_user() for _ in range(5))
+        last_year = add_event(party, days=-200)
+        for user in (archived_only, both):
+            add_registration(last_year, user)
+        add_registration(add_event(other_party, days=-200), elsewhere)
+        archive.archive_events(older_than_days=90)
+
+        recent, upcoming = add_event(party, days=-1), add_event(party)
+        for user in (current_only, both, registered):
+            add_registration(recent, user)
+        add_registration(upcoming, registered)
+        job = InvitationJob(party_id=party.id, event_id=upcoming.id, audience='past_registrants')
+        db.session.add(job)
+        db.session.commit()
+        expected = sorted([archived_only.id, current_only.id, both.id])
+
+        job = invitations.run_invitation_job(job.id, batch_size=2)
+
+        assert (job.status, job.total, job.sent) == ('completed', 3, 3)
+        invited = db.session.execute(db.select(Notification.user_id).order_by(Notification.user_id)).scalars()
+        assert list(invited) == expected
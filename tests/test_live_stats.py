@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from factories import add_event, add_registration, add_user, sign_in
+from political_events import live_stats
+from political_events.extensions import realtime
+
+
+def test_cancelling_a_checked_in_registration_takes_back_the_check_in(app, monkeypatch):
+    with app.app_context():
+        party, user = add_user('party'), add_user()
+        checked_in, registered = add_event(party), add_event(party)
+        add_registration(checked_in, user, attended=True, qr_scanned_at=datetime.utcnow())
+        add_registration(registered, user)
+        party_id, user_id, checked_in_id, registered_id = party.id, user.id, checked_in.id, registered.id
+    applied = []
+    monkeypatch.setattr(realtime, 'socketio', object())  # enabled, without a server
+    monkeypatch.setattr(live_stats.tracker, 'apply', lambda channel, delta: applied.append((channel, delta)))
+    client = sign_in(app, user_id)
+
+    assert client.post(f'/user/event/{checked_in_id}/cancel').status_code == 302
+    assert applied == [
+        ('admin', {'registrations': -1, 'checkins': -1}),
+        (f'party:{party_id}', {'registrations': -1, 'attendees': -1}),
+        (f'user:{user_id}', {'registered': -1, 'attended': -1}),
+    ]
+
+    applied.clear()
+    assert client.post(f'/user/event/{registered_id}/cancel').status_code == 302
+    assert [delta for _, delta in applied] == [
+        {'registrations': -1, 'checkins': 0},
+        {'registrations': -1, 'attendees': 0},
+        {'registered': -1, 'attended': 0},
+    ]
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+
+from factories import add_user, sign_in
+from political_events.location_trail import parse_moment
+
+
+def test_parse_moment():
+    assert parse_moment('86400') == datetime(1970, 1, 2)
+    assert parse_moment('2026-03-01T10:00:00+05:30') == datetime(2026, 3, 1, 4, 30)
+
+
+@pytest.mark.parametrize('value', ['9' * 20, '9' * 5000, '0001-01-01T00:00:00+01:00', 'yesterday'])
+def test_parse_moment_rejects_out_of_range(value):
+    with pytest.raises(ValueError):
+        parse_moment(value)
+
+
+def test_trail_with_huge_epoch_is_bad_request(app):
+    with app.app_context():
+        user_id = add_user().id
+    client = sign_in(app, user_id)
+    response = client.get('/api/user/location/trail?since=' + '9' * 20)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,30 @@
+from factories import add_event, add_user, sign_in
+from political_events import map_points, registrations
+
+
+def test_points_round_trip():
+    rows = [(3, 1295000, 7760000, 1), (7, 1297160, 7759460, 0)]
+    assert map_points.decode_polyline(map_points.encode_polyline(rows), 4) == rows
+
+
+def test_etag_changes_on_cancel_and_rejoin(app):
+    with app.app_context():
+        party, near, far = add_user('party'), add_user(), add_user()
+        party_id, event_id = party.id, add_event(party).id
+        far_id = far.id
+        registrations.join_event(event_id, near.id, 12.97, 77.59)
+        registrations.join_event(event_id, far.id, 13.0, 77.6)
+    client = sign_in(app, party_id)
+    url = f'/api/event/{event_id}/points'
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert client.get(url, headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    with app.app_context():
+        registrations.cancel(event_id, far_id)
+        registrations.join_event(event_id, far_id, 28.61, 77.21)
+    second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.get_json()['points'] != first.get_json()['points']
@@ -0,0 +1,41 @@
+from factories import add_user
+from political_events import notifications
+from political_events.extensions import db
+from political_events.models import NotificationCounter
+
+
+def _counter_created_meanwhile(monkeypatch, user_id, unread):
+    """Store user_id's counter right after the unread notifications are counted, as a concurrent request would"""
+    count_unread = notifications._count_unread
+
+    def racing(user_ids):
+        counts = count_unread(user_ids)
+        monkeypatch.setattr(notifications, '_count_unread', count_unread)
+        db.session.execute(db.insert(NotificationCounter).values(user_id=user_id, unread=unread))
+        return counts
+
+    monkeypatch.setattr(notifications, '_count_unread', racing)
+
+
+def _counters():
+    return dict(db.session.execute(db.select(NotificationCounter.user_id, NotificationCounter.unread)).all())
+
+
+def test_unread_count_uses_a_counter_stored_meanwhile(app, monkeypatch):
+    with app.app_context():
+        user_id = add_user().id
+        _counter_created_meanwhile(monkeypatch, user_id, 3)
+
+        assert notifications.unread_count(user_id) == 3
+        assert _counters() == {user_id: 3}
+
+
+def test_create_notifications_adds_to_a_counter_stored_meanwhile(app, monkeypatch):
+    with app.app_context():
+        racing_id, other_id = add_user().id, add_user().id
+        _counter_created_meanwhile(monkeypatch, racing_id, 5)
+
+        notifications.create_notifications([racing_id, other_id, racing_id], 'Reminder', 'See you there')
+        db.session.commit()
+
+        assert _counters() == {racing_id: 7, other_id: 1}
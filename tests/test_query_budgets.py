@@ -0,0 +1,97 @@
+"""
+The hot pages and APIs stay within their @query_budget.  TestingConfig
+sets QUERY_BUDGETS = 'raise', so a view over budget fails its request;
+each list holds several rows so a per-row query would show.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from factories import add_event, add_registration, add_user, sign_in
+from political_events import archive, location_trail, notifications, rollups
+from political_events.extensions import db
+from political_events.models import EventImage, EventRegistration, ImageBlob, Ticket
+from political_events.query_guard import QueryBudgetExceeded
+
+ROWS = 5
+
+
+@pytest.fixture
+def dataset(app):
+    """Ids of a party with current and archived events, its registrants and an admin"""
+    with app.app_context():
+        admin, party = add_user('admin'), add_user('party')
+        users = [add_user() for _ in range(ROWS)]
+        events = [add_event(party, days=day) for day in range(1, ROWS + 1)]
+        add_event(party, days=-200, title='Last year')
+        event = events[0]
+        now = datetime.utcnow()
+        for number, user in enumerate(users):
+            for other in events:
+                add_registration(other, user, latitude=12.95 + number / 100, attended=number % 2 == 0,
+                                 qr_scanned_at=now if number % 2 == 0 else None)
+            rollups.registered(event.id, now)
+            location_trail.record_point(user.id, 12.95, 77.6, now - timedelta(minutes=number))
+            db.session.add(Ticket(user_id=user.id, subject='Parking', message='Where do we park?'))
+        notifications.create_notifications([user.id for user in users] * 2, 'Reminder', 'See you there')
+        db.session.add(ImageBlob(sha256='b' * 64, extension='png', content_type='image/png', size=1, width=1,
+                                 height=1, status='ready'))
+        db.session.add(EventImage(event_id=event.id, sha256='b' * 64, position=0, uploaded_by=party.id))
+        db.session.commit()
+        archive.archive_events(older_than_days=90)
+        registration_id = db.session.execute(
+            db.select(db.func.min(EventRegistration.id)).where(EventRegistration.event_id == event.id)
+        ).scalar()
+        ticket_id = db.session.execute(db.select(db.func.min(Ticket.id))).scalar()
+        return {'admin': admin.id, 'party': party.id, 'user': users[0].id, 'event': event.id,
+                'registration': registration_id, 'ticket': ticket_id}
+
+
+HOT_PAGES = [
+    ('admin', '/admin/dashboard'),
+    ('admin', '/admin/events'),
+    ('admin', '/admin/users'),
+    ('admin', '/admin/tickets'),
+    ('admin', '/api/ticket/{ticket}'),
+    ('admin', '/api/notifications'),  # no unread counter yet
+    ('party', '/party/dashboard'),
+    ('party', '/party/event/{event}'),
+    ('party', '/party/event/{event}/map'),
+    ('party', '/party/archive'),
+    ('party', '/api/event/{event}/registrations'),
+    ('party', '/api/event/{event}/registrations/{registration}'),
+    ('party', '/api/event/{event}/trails'),
+    ('party', '/api/event/{event}/analytics'),
+    ('party', '/api/event/{event}/geo_stats'),
+    ('party', '/api/event/{event}/points'),
+    ('party', '/api/event/{event}/points?format=float32'),
+    ('party', '/api/event/{event}/images'),
+    ('user', '/user/dashboard'),
+    ('user', '/user/event/{event}'),
+    ('user', '/user/my-events'),
+    ('user', '/tickets'),
+    ('user', '/api/events'),
+    ('user', '/api/user/location/trail'),
+    ('user', '/api/notifications'),
+]
+
+
+@pytest.mark.parametrize('role, url', HOT_PAGES)
+def test_hot_page_within_budget(app, dataset, role, url):
+    client = sign_in(app, dataset[role])
+    url = url.format(**dataset)
+    view = app.view_functions[app.url_map.bind('').match(url.partition('?')[0])[0]]
+    assert getattr(view, 'query_budget', None) is not None, f'{url} has no @query_budget'
+
+    # Twice: the second request reads whatever the first one cached
+    for _ in range(2):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+
+
+def test_over_budget_raises(app, dataset, monkeypatch):
+    client = sign_in(app, dataset['user'])
+    monkeypatch.setattr(app.view_functions['api_events'], 'query_budget', 0)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get('/api/events')
@@ -0,0 +1,29 @@
+from factories import add_event, add_user
+from political_events import geo_stats, registrations, revisions
+from political_events.extensions import db
+
+
+def test_bump_creates_and_increments(app):
+    with app.app_context():
+        assert revisions.revision(1) == 0
+        revisions.bump([1, 2, 2])
+        revisions.bump([2])
+        db.session.commit()
+        assert (revisions.revision(1), revisions.revision(2)) == (1, 2)
+
+
+def test_geo_stats_follow_cancel_and_rejoin(app):
+    with app.app_context():
+        party, near, far = add_user('party'), add_user(), add_user()
+        event = add_event(party)
+        registrations.join_event(event.id, near.id, 12.97, 77.59)
+        registrations.join_event(event.id, far.id, 13.0, 77.6)
+        before = geo_stats.event_stats(event)['distance_km']['max']
+
+        # The same number of registrations and attendees afterwards, one of them elsewhere
+        registrations.cancel(event.id, far.id)
+        registrations.join_event(event.id, far.id, 28.61, 77.21)
+        after = geo_stats.event_stats(event)['distance_km']['max']
+
+        assert before < 10
+        assert after > 1500